@@ -0,0 +1,60 @@
+"""
+벌크 대본 파서 벤치마크: 기존 DOTALL 정규식 vs 줄 단위 스트리밍 파서.
+
+    python benchmarks/bench_script_parser.py [장면수]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script_parser import iter_scenes, iter_text_lines, make_scene  # noqa: E402
+
+
+def legacy_parse(text: str):
+    # 기존 pages/5_bulk_page.py 의 parse_script 와 동일 (장면 dict 까지 생성)
+    pattern = r'(\d+)\s*\n(.+?)(?=\n\d+\s*\n|\Z)'
+    matches = re.findall(pattern, text, flags=re.DOTALL)
+    return [make_scene(int(num), block) for num, block in matches]
+
+
+def make_script(n_scenes: int, stray_digits: bool = False) -> str:
+    parts = []
+    for i in range(1, n_scenes + 1):
+        body = (
+            f"{i}번째 장면의 한국어 내레이션 문장입니다. 사건의 배경과 결과를 설명합니다.\n"
+            "Shot on 35mm film, wide cinematic framing, soft documentary lighting, "
+            "a crowd gathering in a rainy city square at dusk."
+        )
+        if stray_digits:
+            # 숫자로 시작하는 줄이 섞인 본문
+            body += f"\n{i * 7} people in frame, 2 cars, 3 umbrellas"
+        parts.append(f"{i}\n{body}\n")
+    return "\n".join(parts)
+
+
+def bench(label: str, fn, repeat: int = 3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    print(f"  {label:<22} {best * 1000:9.1f} ms   ({len(result)} scenes)")
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    for stray in (False, True):
+        text = make_script(n, stray_digits=stray)
+        print(f"{n} scenes, {len(text) / 1e6:.1f} MB, stray digit lines={stray}")
+        t_regex = bench("regex (legacy)", lambda: legacy_parse(text))
+        t_stream = bench("streaming parser", lambda: list(iter_scenes(iter_text_lines(text))))
+        print(f"  speedup x{t_regex / t_stream:.2f}\n")
+
+
+if __name__ == "__main__":
+    main()
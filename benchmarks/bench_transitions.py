@@ -0,0 +1,94 @@
+"""
+장면 전환 엔진 벤치마크 (30장면 프로젝트, 초당 프레임 수).
+
+    python benchmarks/bench_transitions.py [장면수] [가로x세로]
+
+- 계산만: 인코더 없이 프레임 생성 속도
+- 전체: ffmpeg(libx264) 파이프까지 포함
+- 비교용: 프레임마다 PIL Image 로 crop/resize/blend 후 tobytes 하는 단순 구현
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transitions  # noqa: E402
+from video_utils import get_ffmpeg_exe  # noqa: E402
+
+SECONDS_PER_SCENE = 3.0
+FPS = 30
+
+
+class NullWriter:
+    def write_batch(self, frames):
+        pass
+
+
+def make_images(tmp_dir: str, n: int, size: tuple[int, int]) -> list[str]:
+    w, h = size
+    rng = np.random.default_rng(0)
+    yy, xx = np.mgrid[0:h, 0:w]
+    paths = []
+    for i in range(n):
+        base = rng.integers(0, 255, 3)
+        img = np.stack([(xx * (c + 1) + yy + base[c] + i * 17) % 256 for c in range(3)], axis=-1)
+        path = os.path.join(tmp_dir, f"scene_{i:03d}.png")
+        Image.fromarray(img.astype(np.uint8)).save(path, compress_level=1)
+        paths.append(path)
+    return paths
+
+
+def naive_pil(paths: list[str], mode: str, max_frames: int) -> float:
+    """프레임마다 PIL crop + resize (+ blend). max_frames 만 돌리고 fps 반환."""
+    kenburns = mode in (transitions.TRANSITION_KENBURNS, transitions.TRANSITION_KENBURNS_FADE)
+    imgs = [Image.open(p).convert("RGB") for p in paths[:2]]
+    w, h = imgs[0].size
+    n = int(SECONDS_PER_SCENE * FPS)
+    t0 = time.perf_counter()
+    for f in range(max_frames):
+        z = 1 + 0.08 * (f % n) / n if kenburns else 1.0
+        bw, bh = w / z, h / z
+        box = ((w - bw) / 2, (h - bh) / 2, (w + bw) / 2, (h + bh) / 2)
+        frame = imgs[0].resize((w, h), Image.Resampling.BILINEAR, box=box)
+        if mode != transitions.TRANSITION_KENBURNS:
+            frame = Image.blend(frame, imgs[1], 0.5)
+        np.asarray(frame).tobytes()
+    return max_frames / (time.perf_counter() - t0)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    size = tuple(int(v) for v in sys.argv[2].split("x")) if len(sys.argv) > 2 else (1280, 720)
+    durations = [SECONDS_PER_SCENE] * n
+    has_ffmpeg = get_ffmpeg_exe() is not None
+
+    with tempfile.TemporaryDirectory(prefix="bench_transitions_") as tmp_dir:
+        paths = make_images(tmp_dir, n, size)
+        total_frames = int(round(SECONDS_PER_SCENE * FPS)) * n
+        print(f"{n} scenes x {SECONDS_PER_SCENE:.0f}s @ {FPS}fps = {total_frames} frames, {size[0]}x{size[1]}\n")
+
+        for label, mode in transitions.TRANSITION_MODES.items():
+            if mode == transitions.TRANSITION_NONE:
+                continue
+            print(f"[{label}]")
+            for batch in (1, 4, 8):
+                stats = transitions.render_slideshow(
+                    paths, durations, "", fps=FPS, mode=mode, batch=batch, writer=NullWriter()
+                )
+                print(f"  엔진 batch={batch:<2}   계산만   {stats['fps']:8.1f} fps")
+
+            if has_ffmpeg:
+                out_path = os.path.join(tmp_dir, f"{mode}.mp4")
+                stats = transitions.render_slideshow(paths, durations, out_path, fps=FPS, mode=mode)
+                print(f"  엔진 batch=4    + x264   {stats['fps']:8.1f} fps  ({stats['seconds']:.1f}s)")
+
+            print(f"  PIL 프레임 단위 계산만   {naive_pil(paths, mode, 120):8.1f} fps\n")
+
+
+if __name__ == "__main__":
+    main()
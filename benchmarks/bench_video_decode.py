@@ -0,0 +1,107 @@
+"""
+영상 응답(b64_json) 디코딩 메모리 벤치마크.
+
+    python benchmarks/bench_video_decode.py [영상MB ...]
+
+로컬 대역 서버(fake_video_api.py --sync)를 별도 프로세스로 띄우고,
+같은 응답을 두 방식으로 받아 tracemalloc 최대 할당량을 비교한다.
+- 기존: r.read() → json.loads → b64 문자열 → b64decode → 파일
+- 스트리밍: video_jobs.read_video_response 로 청크 단위 디코딩 → 파일
+"""
+import base64
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import video_jobs  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake(size_mb: float):
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "fake_video_api.py"), "--sync", "--port", str(port), "--size-mb", str(size_mb)],
+        stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}/v1/videos/generations"
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return proc, url
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("fake server did not start")
+
+
+def post(url: str):
+    req = urllib.request.Request(
+        url,
+        data=json.dumps({"prompt": "bench"}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    return urllib.request.urlopen(req, timeout=300)
+
+
+def legacy(url: str, out_path: str):
+    with post(url) as r:
+        raw = r.read().decode("utf-8")
+    data = json.loads(raw)
+    b64 = data["data"][0]["b64_json"]
+    with open(out_path, "wb") as f:
+        f.write(base64.b64decode(b64))
+
+
+def streaming(url: str, out_path: str):
+    with open(out_path, "wb") as f, post(url) as r:
+        video_jobs.read_video_response(r, f)
+
+
+def measure(fn, url: str, out_path: str):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn(url, out_path)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def main():
+    sizes = [float(a) for a in sys.argv[1:]] or [8.0, 32.0]
+    for size_mb in sizes:
+        proc, url = start_fake(size_mb)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                a, b = os.path.join(tmp, "legacy.mp4"), os.path.join(tmp, "stream.mp4")
+                peak_a, t_a = measure(legacy, url, a)
+                peak_b, t_b = measure(streaming, url, b)
+                with open(a, "rb") as fa, open(b, "rb") as fb:
+                    same = fa.read() == fb.read()
+        finally:
+            proc.kill()
+            proc.wait()
+
+        print(f"영상 {size_mb:.0f} MB (일치: {same})")
+        print(f"  기존      최대 {peak_a / 1e6:8.1f} MB  {t_a:6.2f}s")
+        print(f"  스트리밍  최대 {peak_b / 1e6:8.1f} MB  {t_b:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+영상 생성 API 로컬 대역 서버 (video_jobs 테스트 / 벤치마크용).
+
+    python benchmarks/fake_video_api.py [--port 8765] [--video 파일.mp4] [--size-mb 8]
+                                        [--render-seconds 6] [--sync] [--fail-every 0]
+
+    VIDEO_API_BASE=http://127.0.0.1:8765/v1 streamlit run app.py
+
+- 기본: 비동기 작업. POST 는 바로 {"id", "status": "queued"}, render-seconds 뒤 completed
+- --sync: 예전 방식처럼 POST 응답에 b64_json 으로 영상 전체를 담아 돌려준다
+- --fail-every N: N 번째 요청마다 503 + Retry-After 로 일시적 오류 흉내
+- 같은 Idempotency-Key 로 다시 POST 하면 새 작업을 만들지 않고 처음 만든 작업을 돌려준다
+"""
+import argparse
+import base64
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from uuid import uuid4
+
+
+class FakeVideoApi:
+    def __init__(self, video_bytes: bytes, render_seconds: float = 6.0, sync: bool = False, fail_every: int = 0):
+        self.video_bytes = video_bytes
+        self.render_seconds = render_seconds
+        self.sync = sync
+        self.fail_every = fail_every
+        self.jobs = {}
+        self.idempotency = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            return bool(self.fail_every) and self.requests % self.fail_every == 0
+
+    def create(self, idempotency_key: str | None = None) -> dict:
+        with self._lock:
+            job_id = self.idempotency.get(idempotency_key) if idempotency_key else None
+            if job_id is None:
+                job_id = f"video_{uuid4().hex[:12]}"
+                self.jobs[job_id] = time.time()
+                if idempotency_key:
+                    self.idempotency[idempotency_key] = job_id
+        return {"id": job_id, "status": "queued"}
+
+    def status(self, job_id: str) -> dict | None:
+        with self._lock:
+            created = self.jobs.get(job_id)
+        if created is None:
+            return None
+        progress = min(1.0, (time.time() - created) / max(0.001, self.render_seconds))
+        if progress >= 1.0:
+            return {"id": job_id, "status": "completed", "progress": 100}
+        status = "queued" if progress < 0.2 else "in_progress"
+        return {"id": job_id, "status": status, "progress": int(progress * 100)}
+
+
+def make_handler(api: FakeVideoApi):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, code: int, body: bytes, content_type: str = "application/json", headers=None):
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _json(self, code: int, data: dict, headers=None):
+            self._send(code, json.dumps(data).encode("utf-8"), headers=headers)
+
+        def _unavailable(self) -> bool:
+            if api.should_fail():
+                self._json(503, {"error": "fake overload"}, headers={"Retry-After": "1"})
+                return True
+            return False
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path.rstrip("/") != "/v1/videos/generations":
+                return self._json(404, {"error": "not found"})
+            if self._unavailable():
+                return
+            if api.sync:
+                b64 = base64.b64encode(api.video_bytes).decode("ascii")
+                return self._json(200, {"data": [{"b64_json": b64}]})
+            self._json(200, api.create(self.headers.get("Idempotency-Key")))
+
+        def do_GET(self):
+            parts = self.path.strip("/").split("/")
+            # v1 / videos / generations / {id} [/ content]
+            if len(parts) < 4 or parts[:3] != ["v1", "videos", "generations"]:
+                return self._json(404, {"error": "not found"})
+            if self._unavailable():
+                return
+            status = api.status(parts[3])
+            if status is None:
+                return self._json(404, {"error": "unknown job"})
+            if len(parts) == 4:
+                return self._json(200, status)
+            if parts[4] == "content" and status["status"] == "completed":
+                return self._send(200, api.video_bytes, content_type="video/mp4")
+            self._json(409, {"error": "not ready"})
+
+    return Handler
+
+
+def start_server(api: FakeVideoApi, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """백그라운드 스레드로 띄우고 서버 반환 (port=0 이면 빈 포트). base URL 은 base_url(server)."""
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="영상 생성 API 로컬 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--video", help="돌려줄 MP4 파일 (없으면 임의 바이트)")
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--render-seconds", type=float, default=6.0)
+    parser.add_argument("--sync", action="store_true")
+    parser.add_argument("--fail-every", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.video:
+        with open(args.video, "rb") as f:
+            video_bytes = f.read()
+    else:
+        video_bytes = os.urandom(int(args.size_mb * 1024 * 1024))
+
+    api = FakeVideoApi(video_bytes, args.render_seconds, args.sync, args.fail_every)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(api))
+    print(f"fake video api: http://{args.host}:{args.port}/v1 ({len(video_bytes) / 1e6:.1f} MB)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
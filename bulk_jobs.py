@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import time
+from uuid import UUID, uuid4
+
+# =========================
+# 벌크 생성 작업 매니페스트 (장면별 상태 체크포인트)
+# =========================
+JOBS_DIR = os.path.join(".ikapp_media", "jobs")
+
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# 이 기간 동안 갱신되지 않은 매니페스트는 새 작업을 만들 때 지운다
+JOB_RETENTION_SECONDS = 14 * 24 * 3600
+
+
+def is_valid_job_id(job_id) -> bool:
+    """new_job 이 만든 uuid4 문자열만 허용 (?job= 으로 들어온 값이 경로가 되지 않도록)."""
+    try:
+        return isinstance(job_id, str) and str(UUID(job_id)) == job_id
+    except ValueError:
+        return False
+
+
+def _job_path(job_id: str) -> str:
+    if not is_valid_job_id(job_id):
+        raise ValueError(f"INVALID_JOB_ID: {str(job_id)[:64]}")
+    return os.path.join(JOBS_DIR, f"{job_id}.json")
+
+
+def _is_job(job, job_id: str) -> bool:
+    if not isinstance(job, dict) or job.get("job_id") != job_id or not isinstance(job.get("raw_script", ""), str):
+        return False
+    scenes = job.get("scenes")
+    return isinstance(scenes, list) and all(isinstance(s, dict) and "id" in s for s in scenes)
+
+
+def new_job(raw_script: str, scenes: list) -> dict:
+    now = time.time()
+    for scene in scenes:
+        scene.setdefault("status", STATUS_DONE if scene.get("image_id") else STATUS_PENDING)
+    job = {
+        "job_id": str(uuid4()),
+        "created_at": now,
+        "updated_at": now,
+        "raw_script": raw_script,
+        "scenes": scenes,
+    }
+    save_job(job)
+    prune_jobs()
+    return job
+
+
+def save_job(job: dict):
+    """매 장면 완료마다 호출되므로 임시파일 → rename 으로 원자적으로 저장."""
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    job["updated_at"] = time.time()
+    fd, tmp_path = tempfile.mkstemp(dir=JOBS_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, _job_path(job["job_id"]))
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_job(job_id: str | None) -> dict | None:
+    """올바른 id 이고 매니페스트 모양(job_id 가 맞고 scenes 가 장면 dict 목록)일 때만 반환."""
+    if not is_valid_job_id(job_id) or not os.path.exists(_job_path(job_id)):
+        return None
+    try:
+        with open(_job_path(job_id), "r", encoding="utf-8") as f:
+            job = json.load(f)
+    except Exception:
+        return None
+    return job if _is_job(job, job_id) else None
+
+
+def list_jobs(limit: int = 10) -> list[dict]:
+    if not os.path.isdir(JOBS_DIR):
+        return []
+    jobs = []
+    for name in os.listdir(JOBS_DIR):
+        if name.endswith(".json"):
+            job = load_job(name[:-5])
+            if job:
+                jobs.append(job)
+    jobs.sort(key=lambda j: j.get("updated_at", 0), reverse=True)
+    return jobs[:limit]
+
+
+def prune_jobs(max_age: float = JOB_RETENTION_SECONDS):
+    """오래된 작업 매니페스트 삭제 (이미지는 내용 해시 저장소에 있으므로 그대로 둔다)."""
+    if not os.path.isdir(JOBS_DIR):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(JOBS_DIR):
+        path = os.path.join(JOBS_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def remaining_indices(job: dict) -> list[int]:
+    return [
+        i for i, s in enumerate(job.get("scenes", []))
+        if s.get("status") != STATUS_DONE and s.get("prompt_en")
+    ]
+
+
+def job_summary(job: dict) -> dict:
+    counts = {STATUS_PENDING: 0, STATUS_DONE: 0, STATUS_FAILED: 0}
+    for s in job.get("scenes", []):
+        counts[s.get("status", STATUS_PENDING)] = counts.get(s.get("status", STATUS_PENDING), 0) + 1
+    counts["total"] = len(job.get("scenes", []))
+    return counts
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# =========================
+# 채팅 응답 캐시 (scriptking / visualking)
+#   key = hash(model, system 지침, user 메시지, max_tokens) → 응답 텍스트
+#   디스크(SQLite)에 두고, 전체 크기가 한도를 넘으면 가장 오래 안 쓴 항목부터 지운다 (LRU)
+# =========================
+CHAT_CACHE_DB_PATH = os.path.join(".ikapp_media", "chat_cache.db")
+
+MAX_ENTRIES = 5000
+MAX_BYTES = 50 * 1024 * 1024
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _db():
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(CHAT_CACHE_DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(CHAT_CACHE_DB_PATH, check_same_thread=False)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chat_cache(
+                cache_key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_cache_last_used ON chat_cache(last_used)")
+        conn.commit()
+        _conn = conn
+    return _conn
+
+
+def make_key(model: str, system_text: str, user_text: str, max_tokens: int) -> str:
+    raw = json.dumps([model, system_text or "", user_text or "", int(max_tokens)], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def lookup(cache_key: str) -> str | None:
+    with _lock:
+        conn = _db()
+        row = conn.execute("SELECT response FROM chat_cache WHERE cache_key=?", (cache_key,)).fetchone()
+        if not row:
+            return None
+        conn.execute(
+            "UPDATE chat_cache SET hits = hits + 1, last_used = ? WHERE cache_key=?",
+            (time.time(), cache_key),
+        )
+        conn.commit()
+        return row[0]
+
+
+def _evict(conn):
+    count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM chat_cache").fetchone()
+    if count <= MAX_ENTRIES and total <= MAX_BYTES:
+        return
+    # 오래 안 쓴 순서로 한도 안에 들어올 때까지
+    for cache_key, size in conn.execute("SELECT cache_key, size FROM chat_cache ORDER BY last_used").fetchall():
+        if count <= MAX_ENTRIES and total <= MAX_BYTES:
+            break
+        conn.execute("DELETE FROM chat_cache WHERE cache_key=?", (cache_key,))
+        count -= 1
+        total -= size
+
+
+def put(cache_key: str, model: str, response: str | None):
+    """같은 키로 다시 생성하면 최신 응답으로 덮어쓴다."""
+    if not response:
+        return
+    now = time.time()
+    with _lock:
+        conn = _db()
+        conn.execute(
+            "INSERT INTO chat_cache(cache_key, model, response, size, created_at, last_used) VALUES(?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(cache_key) DO UPDATE SET response=excluded.response, size=excluded.size, "
+            "created_at=excluded.created_at, last_used=excluded.last_used",
+            (cache_key, model, response, len(response.encode("utf-8")), now, now),
+        )
+        _evict(conn)
+        conn.commit()
+
+
+def get_stats() -> dict:
+    with _lock:
+        count, total, hits = _db().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM chat_cache"
+        ).fetchone()
+    return {"entries": count, "bytes": total, "hits": hits}
@@ -0,0 +1,113 @@
+import time
+
+import chat_cache
+
+# =========================
+# 채팅 응답 스트리밍 (scriptking / visualking 공용)
+#   st.write_stream 에 그대로 넘길 수 있는 이터러블.
+#   다 돌고 나면 첫 토큰까지 걸린 시간(TTFT), 토큰 수, 초당 토큰 수가 채워진다
+#   같은 (모델, 지침, 입력, max_tokens) 는 chat_cache 에서 바로 돌려준다 (force_new=True 면 건너뜀)
+# =========================
+
+
+class ChatStream:
+    def __init__(
+        self,
+        client,
+        model: str,
+        system_text: str,
+        user_text: str,
+        max_tokens: int,
+        force_new: bool = False,
+    ):
+        self.client = client
+        self.model = model
+        self.messages = [
+            {"role": "system", "content": system_text},
+            {"role": "user", "content": user_text},
+        ]
+        self.max_tokens = max_tokens
+        self.force_new = force_new
+        self.cache_key = chat_cache.make_key(model, system_text, user_text, max_tokens)
+
+        self.from_cache = False
+        self.text = ""
+        self.ttft = None
+        self.elapsed = 0.0
+        self.tokens = 0
+
+    def __iter__(self):
+        t0 = time.perf_counter()
+        if not self.force_new:
+            cached = chat_cache.lookup(self.cache_key)
+            if cached:
+                self.from_cache = True
+                self.text = cached
+                self.ttft = self.elapsed = time.perf_counter() - t0
+                yield cached
+                return
+
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=self.messages,
+            max_tokens=self.max_tokens,
+            stream=True,
+            # 마지막 청크에 usage(정확한 토큰 수)를 받는다
+            stream_options={"include_usage": True},
+        )
+        parts = []
+        chunks = 0
+        usage_tokens = None
+        finished = False
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage_tokens = chunk.usage.completion_tokens
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if self.ttft is None:
+                    self.ttft = time.perf_counter() - t0
+                chunks += 1
+                parts.append(delta)
+                yield delta
+            finished = True
+        finally:
+            self.elapsed = time.perf_counter() - t0
+            self.text = "".join(parts)
+            # usage 가 없으면 콘텐츠 청크 수(대략 토큰 1개씩)로 대신한다
+            self.tokens = usage_tokens if usage_tokens is not None else chunks
+
+        # 중간에 끊긴 응답은 캐시에 남기지 않는다
+        if finished:
+            chat_cache.put(self.cache_key, self.model, self.text)
+
+    @property
+    def tokens_per_second(self) -> float:
+        # 첫 토큰 이후의 생성 속도
+        gen_time = self.elapsed - (self.ttft or 0.0)
+        return self.tokens / gen_time if gen_time > 0 else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "from_cache": self.from_cache,
+            "ttft": self.ttft,
+            "elapsed": self.elapsed,
+            "tokens": self.tokens,
+            "tokens_per_second": self.tokens_per_second,
+        }
+
+
+def format_stats(stats: dict | None) -> str:
+    if not stats:
+        return ""
+    if stats.get("from_cache"):
+        return "⚡ 캐시에서 불러온 결과입니다. (API 호출 없음)"
+    ttft = stats.get("ttft")
+    ttft_text = f"첫 토큰 {ttft:.2f}s" if ttft is not None else "첫 토큰 -"
+    return (
+        f"⏱ {ttft_text} · 전체 {stats.get('elapsed', 0):.1f}s · "
+        f"{stats.get('tokens', 0)} 토큰 · {stats.get('tokens_per_second', 0):.0f} 토큰/s"
+    )
@@ -0,0 +1,130 @@
+import io
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+import image_store
+
+# =========================
+# 스토리보드 콘택트 시트 (장면 썸네일을 한 장의 이미지로 타일링)
+#   저장소의 WebP 썸네일 → 타일 배열로 한 번에 쌓고, reshape/transpose 로 시트 배열을 만든 뒤
+#   번호 + 한국어 문장 일부만 PIL 로 그린다
+# =========================
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "NanumGothicLight.ttf")
+
+BACKGROUND = (250, 250, 250)
+TILE_BACKGROUND = (30, 30, 30)
+TEXT_COLOR = (40, 40, 40)
+MISSING_COLOR = (200, 200, 200)
+
+DEFAULT_TILE = (200, 200)
+CAPTION_HEIGHT = 46
+GAP = 10
+
+
+@lru_cache(maxsize=4)
+def _font(size: int):
+    try:
+        return ImageFont.truetype(FONT_PATH, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1024)
+def load_tile(image_id: str | None, tile: tuple[int, int]) -> np.ndarray:
+    """썸네일을 타일 크기에 레터박스로 맞춘 (h, w, 3) 배열. 이미지가 없으면 회색 타일."""
+    tw, th = tile
+    out = np.empty((th, tw, 3), dtype=np.uint8)
+
+    if not image_store.exists(image_id):
+        out[:] = MISSING_COLOR
+        out.setflags(write=False)
+        return out
+
+    path = image_store.thumb_path(image_id)
+    if not os.path.exists(path):
+        path = image_store.original_path(image_id)
+
+    out[:] = TILE_BACKGROUND
+    with Image.open(path) as img:
+        img.draft("RGB", tile)
+        img = img.convert("RGB")
+        img.thumbnail(tile, Image.Resampling.BILINEAR, reducing_gap=2.0)
+        arr = np.asarray(img)
+    h, w = arr.shape[:2]
+    y, x = (th - h) // 2, (tw - w) // 2
+    out[y:y + h, x:x + w] = arr
+    out.setflags(write=False)
+    return out
+
+
+def page_count(total: int, per_page: int) -> int:
+    return max(1, math.ceil(total / per_page))
+
+
+def _fit_text(draw: ImageDraw.ImageDraw, text: str, font, max_width: int) -> str:
+    text = " ".join((text or "").split())
+    if draw.textlength(text, font=font) <= max_width:
+        return text
+    # 이진 탐색으로 "…" 까지 들어가는 가장 긴 앞부분
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if draw.textlength(text[:mid] + "…", font=font) <= max_width:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + "…"
+
+
+def build_contact_sheet(
+    entries: list[tuple],
+    columns: int = 6,
+    tile: tuple[int, int] = DEFAULT_TILE,
+    caption_height: int = CAPTION_HEIGHT,
+    gap: int = GAP,
+) -> Image.Image:
+    """
+    entries: [(장면 번호, 한국어 문장, image_id), ...] 한 페이지 분량.
+    """
+    tw, th = tile
+    n = max(1, len(entries))
+    columns = max(1, min(columns, n))
+    rows = math.ceil(n / columns)
+    cell_w, cell_h = tw + gap, th + caption_height + gap
+
+    # 1) 모든 타일을 (n, th, tw, 3) 로 쌓아서 셀 버퍼에 한 번에 복사
+    cells = np.empty((rows * columns, cell_h, cell_w, 3), dtype=np.uint8)
+    cells[:] = BACKGROUND
+    if entries:
+        tiles = np.stack([load_tile(image_id, tile) for _, _, image_id in entries])
+        top, left = gap // 2, gap // 2
+        cells[: len(entries), top:top + th, left:left + tw] = tiles
+
+    # 2) (rows, cols, cell_h, cell_w) → (rows*cell_h, cols*cell_w) 시트로 재배치
+    sheet = (
+        cells.reshape(rows, columns, cell_h, cell_w, 3)
+        .transpose(0, 2, 1, 3, 4)
+        .reshape(rows * cell_h, columns * cell_w, 3)
+    )
+
+    # 3) 캡션만 PIL 로 그리기
+    img = Image.fromarray(sheet)
+    draw = ImageDraw.Draw(img)
+    num_font = _font(15)
+    text_font = _font(13)
+    for k, (number, korean, _) in enumerate(entries):
+        x = (k % columns) * cell_w + gap // 2
+        y = (k // columns) * cell_h + gap // 2 + th + 4
+        draw.text((x, y), f"#{number}", fill=TEXT_COLOR, font=num_font)
+        draw.text((x, y + 20), _fit_text(draw, korean, text_font, tw), fill=TEXT_COLOR, font=text_font)
+    return img
+
+
+def to_png_bytes(img: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=False, compress_level=3)
+    return buf.getvalue()
@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import threading
+import time
+
+import image_store
+
+# =========================
+# 프롬프트 단위 이미지 캐시
+#   key = hash(full_prompt, model, size, quality) → image_store 핸들
+# =========================
+CACHE_DB_PATH = os.path.join(".ikapp_media", "image_cache.db")
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _db():
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(CACHE_DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(CACHE_DB_PATH, check_same_thread=False)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS image_cache(
+                cache_key TEXT PRIMARY KEY,
+                image_id TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_counters(
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+            """
+        )
+        conn.commit()
+        _conn = conn
+    return _conn
+
+
+def _bump(conn, name: str, n: int = 1):
+    conn.execute(
+        "INSERT INTO cache_counters(name, value) VALUES(?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+        (name, n),
+    )
+
+
+def lookup(cache_key: str) -> str | None:
+    """적중하면 image_id, 아니면 None. 적중/미스 횟수를 누적 기록한다."""
+    with _lock:
+        conn = _db()
+        row = conn.execute(
+            "SELECT image_id FROM image_cache WHERE cache_key=?", (cache_key,)
+        ).fetchone()
+
+        if row and image_store.exists(row[0]):
+            conn.execute("UPDATE image_cache SET hits = hits + 1 WHERE cache_key=?", (cache_key,))
+            _bump(conn, "hits")
+            conn.commit()
+            return row[0]
+
+        _bump(conn, "misses")
+        conn.commit()
+        return None
+
+
+def put(cache_key: str, image_id: str | None):
+    """같은 키로 새 변형을 만들면 최신 이미지로 덮어쓴다."""
+    if not image_id:
+        return
+    with _lock:
+        conn = _db()
+        conn.execute(
+            "INSERT INTO image_cache(cache_key, image_id, created_at) VALUES(?, ?, ?) "
+            "ON CONFLICT(cache_key) DO UPDATE SET image_id=excluded.image_id, created_at=excluded.created_at",
+            (cache_key, image_id, time.time()),
+        )
+        conn.commit()
+
+
+def put_if_absent(cache_key: str, image_id: str | None):
+    """번들 가져오기 등: 이미 있는 항목(더 최근 변형일 수 있음)은 건드리지 않는다."""
+    if not image_id:
+        return
+    with _lock:
+        conn = _db()
+        conn.execute(
+            "INSERT OR IGNORE INTO image_cache(cache_key, image_id, created_at) VALUES(?, ?, ?)",
+            (cache_key, image_id, time.time()),
+        )
+        conn.commit()
+
+
+def get_stats() -> dict:
+    with _lock:
+        conn = _db()
+        counters = dict(conn.execute("SELECT name, value FROM cache_counters").fetchall())
+        entries = conn.execute("SELECT COUNT(*) FROM image_cache").fetchone()[0]
+
+    hits = counters.get("hits", 0)
+    misses = counters.get("misses", 0)
+    total = hits + misses
+    return {
+        "entries": entries,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": (hits / total) if total else 0.0,
+    }
+
+
+def cached_generate(cache_key: str, generate_fn, force_new: bool = False):
+    """
+    단건 생성용: (image_id, from_cache) 반환.
+    force_new=True 면 캐시를 건너뛰고 새 변형을 만든 뒤 캐시를 갱신한다.
+    """
+    if not force_new:
+        image_id = lookup(cache_key)
+        if image_id:
+            return image_id, True
+
+    image_id = generate_fn()
+    put(cache_key, image_id)
+    return image_id, False
@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import threading
+import time
+
+import image_store
+
+# =========================
+# imageking 생성 기록 (갤러리 인덱스)
+#   이미지 자체는 image_store(원본 PNG + WebP 썸네일)에 있고,
+#   여기에는 프롬프트 / 옵션 / 소요 시간 / 핸들만 SQLite 로 남긴다
+# =========================
+GALLERY_DB_PATH = os.path.join(".ikapp_media", "gallery.db")
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _db():
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(GALLERY_DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(GALLERY_DB_PATH, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS generations(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                image_id TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                model TEXT NOT NULL,
+                size TEXT NOT NULL,
+                quality TEXT NOT NULL,
+                latency REAL,
+                source TEXT NOT NULL DEFAULT 'single'
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_generations_image ON generations(image_id)")
+        conn.commit()
+        _conn = conn
+    return _conn
+
+
+def record(request, image_id: str | None, latency: float | None = None, source: str = "single") -> int | None:
+    """새로 생성한 이미지 한 장을 기록. request 는 image_jobs.ImageRequest."""
+    if not image_id:
+        return None
+    with _lock:
+        conn = _db()
+        cur = conn.execute(
+            "INSERT INTO generations(created_at, image_id, prompt, model, size, quality, latency, source) "
+            "VALUES(?, ?, ?, ?, ?, ?, ?, ?)",
+            (time.time(), image_id, request.prompt, request.model, request.size, request.quality, latency, source),
+        )
+        conn.commit()
+        return cur.lastrowid
+
+
+def _where(search: str | None):
+    if search and search.strip():
+        return " WHERE prompt LIKE ?", (f"%{search.strip()}%",)
+    return "", ()
+
+
+def count(search: str | None = None) -> int:
+    where, args = _where(search)
+    with _lock:
+        return _db().execute(f"SELECT COUNT(*) FROM generations{where}", args).fetchone()[0]
+
+
+def list_page(page: int, per_page: int, search: str | None = None) -> list[dict]:
+    """최신순 한 페이지. 페이지 번호는 1부터."""
+    where, args = _where(search)
+    offset = max(0, page - 1) * per_page
+    with _lock:
+        rows = _db().execute(
+            f"SELECT * FROM generations{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+            (*args, per_page, offset),
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def get(entry_id: int) -> dict | None:
+    with _lock:
+        row = _db().execute("SELECT * FROM generations WHERE id=?", (entry_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def delete(entry_id: int):
+    """기록만 지운다 (이미지 파일은 내용 해시로 공유되므로 그대로 둔다)."""
+    with _lock:
+        conn = _db()
+        conn.execute("DELETE FROM generations WHERE id=?", (entry_id,))
+        conn.commit()
+
+
+def thumbnail(entry: dict) -> str | None:
+    if not image_store.exists(entry.get("image_id")):
+        return None
+    return image_store.ensure_thumbnail(entry["image_id"])
@@ -0,0 +1,346 @@
+import hashlib
+import json
+import random
+import threading
+import time
+import unicodedata
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+import image_cache
+import image_store
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+
+# =========================
+# 이미지 요청 스펙 (스크립트 스레드에서 한 번 만들어 워커로 넘김)
+# =========================
+def normalize_prompt(text: str) -> str:
+    """공백/줄바꿈 차이만 있는 프롬프트는 같은 것으로 본다."""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+@dataclass(frozen=True)
+class ImageRequest:
+    """
+    워커가 st.session_state 를 읽지 않도록 필요한 값을 모두 담은 불변 스펙.
+    pickle 가능하므로 스레드/프로세스/백그라운드 작업 어디로든 넘길 수 있다.
+    """
+
+    prompt: str
+    style_wrapper: str = ""
+    model: str = "gpt-image-1"
+    size: str = "1024x1024"
+    quality: str = "low"
+
+    @property
+    def full_prompt(self) -> str:
+        if self.style_wrapper:
+            return self.style_wrapper + "\nScene:\n" + self.prompt
+        return self.prompt
+
+    @property
+    def cache_key(self) -> str:
+        """같은 그림을 두 번 요청하지 않도록 (정규화된 full_prompt, model, size, quality) 로 만든 키."""
+        raw = json.dumps(
+            [normalize_prompt(self.full_prompt), self.model, self.size, self.quality],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def generate_image_b64(request: ImageRequest, api_client) -> str | None:
+    if not request.prompt:
+        return None
+    resp = api_client.images.generate(
+        model=request.model,
+        prompt=request.full_prompt,
+        size=request.size,
+        quality=request.quality,
+        n=1,
+    )
+    return resp.data[0].b64_json
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key: str, max_retries: int = 0):
+    """스레드/프로세스마다 OpenAI 클라이언트를 한 번만 만든다 (클라이언트 자체는 pickle 불가)."""
+    key = (api_key, max_retries)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = openai.OpenAI(api_key=api_key, max_retries=max_retries)
+        return _clients[key]
+
+
+def run_image_request(request: ImageRequest, api_key: str) -> str | None:
+    """
+    모듈 최상위 함수라 ProcessPoolExecutor 나 작업 큐에도 그대로 넘길 수 있다.
+    재시도는 스케줄러가 담당하므로 SDK 재시도는 끈다.
+    """
+    return generate_image_b64(request, get_client(api_key, max_retries=0))
+
+
+def run_image_request_to_store(request: ImageRequest, api_key: str) -> str | None:
+    """생성 결과를 워커 안에서 바로 이미지 저장소에 쓰고 핸들만 돌려준다."""
+    return image_store.put_b64(run_image_request(request, api_key))
+
+
+def run_image_request_cached(request: ImageRequest, api_key: str) -> str | None:
+    """
+    저장 + 캐시 등록까지 워커에서 끝낸다.
+    스크립트 실행이 중간에 끊겨도 이미 끝난 이미지는 캐시에 남아 이어하기에서 재사용된다.
+    """
+    image_id = run_image_request_to_store(request, api_key)
+    image_cache.put(request.cache_key, image_id)
+    return image_id
+
+
+# =========================
+# AIMD 동시성 제어
+# =========================
+class AimdController:
+    """
+    성공하면 동시 요청 수를 조금씩 늘리고(additive increase),
+    429/5xx 를 받으면 절반으로 줄이면서(multiplicative decrease) Retry-After 동안 새 요청을 멈춘다.
+    줄이는 것은 혼잡 한 번에 한 번: 마지막으로 줄인 뒤에 시작한 요청이 실패했을 때만 다시 줄인다.
+    (동시에 나가 있던 N 개가 한꺼번에 429 를 받아도 decrease**N 으로 바닥까지 떨어지지 않게)
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 16,
+        decrease: float = 0.5,
+    ):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.decrease = decrease
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        with self._lock:
+            return int(self._limit)
+
+    def pause_remaining(self) -> float:
+        with self._lock:
+            return max(0.0, self._paused_until - time.monotonic())
+
+    def on_success(self):
+        with self._lock:
+            # 한 "라운드"(limit 개 성공)마다 +1
+            self._limit = min(self.maximum, self._limit + 1.0 / max(1.0, self._limit))
+
+    def on_throttle(self, retry_after: float | None = None, started_at: float | None = None):
+        """started_at: 실패한 요청을 보낸 시각 (time.monotonic). 없으면 항상 줄인다."""
+        with self._lock:
+            if started_at is None or started_at >= self._last_decrease:
+                self._limit = max(self.minimum, self._limit * self.decrease)
+                self._last_decrease = time.monotonic()
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+
+# =========================
+# 오류 분류 / Retry-After
+# =========================
+def error_status(err: Exception) -> int | None:
+    status = getattr(err, "status_code", None)
+    if status is None:
+        response = getattr(err, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_throttle_error(err: Exception) -> bool:
+    status = error_status(err)
+    return status == 429 or (status is not None and status >= 500)
+
+
+def is_retryable_error(err: Exception) -> bool:
+    if is_throttle_error(err):
+        return True
+    if openai is not None and isinstance(err, openai.APIConnectionError):
+        # APITimeoutError 도 여기에 포함
+        return True
+    return False
+
+
+def retry_after_seconds(err: Exception) -> float | None:
+    response = getattr(err, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return max(0.0, float(ms) / 1000.0)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            # HTTP-date 형식은 무시하고 지수 백오프 사용
+            return None
+    return None
+
+
+def backoff_seconds(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    # full jitter
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+# =========================
+# 스케줄러
+# =========================
+def iter_scheduled(
+    items,
+    fn,
+    controller: AimdController | None = None,
+    max_attempts: int = 4,
+):
+    """
+    items: [(key, arg), ...] 를 fn(arg) 로 병렬 실행하고
+    끝나는 순서대로 (key, result, error, attempts) 를 yield 한다.
+
+    - 항목마다 독립적으로 재시도 예산(max_attempts)을 가진다.
+    - 한 항목이 실패해도 나머지는 계속 진행된다.
+    - 제너레이터는 호출한 스레드(Streamlit 스크립트 스레드)에서 돌기 때문에
+      yield 받은 쪽에서 바로 UI 를 갱신해도 안전하다.
+    """
+    controller = controller or AimdController()
+
+    # (key, arg, attempt, not_before)
+    pending = deque((key, arg, 1, 0.0) for key, arg in items)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=controller.maximum) as ex:
+        while pending or running:
+            now = time.monotonic()
+
+            # 1) 여유가 있으면 준비된 항목 제출
+            if controller.pause_remaining() <= 0:
+                while len(running) < controller.limit:
+                    ready = next((p for p in pending if p[3] <= now), None)
+                    if ready is None:
+                        break
+                    pending.remove(ready)
+                    key, arg, attempt, _ = ready
+                    running[ex.submit(fn, arg)] = (key, arg, attempt, time.monotonic())
+
+            # 2) 다음에 깨어날 시점 계산
+            # 이미 준비된 항목(슬롯을 기다리는 중)은 빼야 timeout 0.05s 로 바쁘게 돌지 않는다
+            wake_at = [p[3] for p in pending if p[3] > now]
+            if controller.pause_remaining() > 0:
+                wake_at.append(now + controller.pause_remaining())
+            timeout = max(0.05, min(wake_at) - now) if wake_at else None
+
+            if not running:
+                time.sleep(timeout or 0.05)
+                continue
+
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            # 3) 끝난 작업 처리
+            for fut in done:
+                key, arg, attempt, started_at = running.pop(fut)
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    if is_retryable_error(e) and attempt < max_attempts:
+                        delay = retry_after_seconds(e)
+                        if is_throttle_error(e):
+                            controller.on_throttle(delay, started_at)
+                        if delay is None:
+                            delay = backoff_seconds(attempt)
+                        pending.append((key, arg, attempt + 1, time.monotonic() + delay))
+                        continue
+                    yield key, None, e, attempt
+                    continue
+
+                controller.on_success()
+                yield key, result, None, attempt
+
+
+class BackgroundBatch:
+    """
+    iter_scheduled 를 백그라운드 스레드에서 돌리는 배치.
+    결과는 내부 dict 에만 쌓이고, 스크립트 스레드가 rerun 때마다 drain() 으로 가져가 반영한다.
+    (워커/백그라운드 스레드는 st.session_state 를 건드리지 않는다)
+    """
+
+    def __init__(self, items, fn, controller: AimdController | None = None, max_attempts: int = 4):
+        self.total = len(items)
+        self.done = 0
+        self.finished = False
+        self._results = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, args=(list(items), fn, controller, max_attempts), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, items, fn, controller, max_attempts):
+        try:
+            for key, result, err, _ in iter_scheduled(items, fn, controller=controller, max_attempts=max_attempts):
+                with self._lock:
+                    self._results[key] = (result, err)
+                    self.done += 1
+        finally:
+            self.finished = True
+
+    def progress(self) -> tuple[int, int]:
+        with self._lock:
+            return self.done, self.total
+
+    def drain(self) -> dict:
+        """지난 drain 이후 끝난 항목 {key: (result, error)}."""
+        with self._lock:
+            results, self._results = self._results, {}
+        return results
+
+
+# =========================
+# 공유 작업 풀 (행 단위 재생성 등 낱개 요청)
+#   Streamlit rerun / 세션과 상관없이 프로세스에 하나만 두고 같이 쓴다
+# =========================
+SHARED_POOL_WORKERS = 4
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool() -> ThreadPoolExecutor:
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ThreadPoolExecutor(max_workers=SHARED_POOL_WORKERS, thread_name_prefix="ikapp-shared")
+        return _shared_pool
+
+
+def call_with_retry(fn, arg, max_attempts: int = 4):
+    """스케줄러 없이 낱개로 실행할 때의 재시도 (retry-after 우선, 없으면 full jitter 백오프)."""
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return fn(arg)
+        except Exception as e:
+            if not is_retryable_error(e) or attempt >= max_attempts:
+                raise
+            delay = retry_after_seconds(e)
+            time.sleep(delay if delay is not None else backoff_seconds(attempt))
@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+import image_store
+
+# =========================
+# 영상용 프레임 정규화 (모든 장면을 같은 캔버스 크기로 한 번만 맞춤)
+#   결과는 (이미지 해시, 캔버스, 모드) 별로 디스크에 캐시
+# =========================
+FRAMES_DIR = os.path.join(".ikapp_media", "frames")
+
+FIT_LETTERBOX = "letterbox"
+FIT_COVER = "cover"
+
+NORMALIZE_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+def frame_path(image_id: str, canvas: tuple[int, int], mode: str) -> str:
+    w, h = canvas
+    return os.path.join(FRAMES_DIR, image_id[:2], f"{image_id}_{w}x{h}_{mode}.png")
+
+
+def fit_image(img: Image.Image, canvas: tuple[int, int], mode: str = FIT_LETTERBOX) -> Image.Image:
+    cw, ch = canvas
+    iw, ih = img.size
+
+    if (iw, ih) == (cw, ch):
+        return img.convert("RGB")
+
+    # JPEG 등은 draft 로 디코딩 단계에서 바로 줄여 읽는다 (PNG 는 무시됨)
+    img.draft("RGB", (cw, ch))
+    img = img.convert("RGB")
+    iw, ih = img.size
+
+    if mode == FIT_COVER:
+        # 캔버스를 꽉 채우도록 원본에서 가운데를 잘라낸 영역만 리샘플링
+        scale = max(cw / iw, ch / ih)
+        bw, bh = cw / scale, ch / scale
+        left, top = (iw - bw) / 2, (ih - bh) / 2
+        # reducing_gap: Image.reduce 로 정수배 축소를 먼저 해서 LANCZOS 비용을 줄임
+        return img.resize((cw, ch), Image.Resampling.LANCZOS, box=(left, top, left + bw, top + bh), reducing_gap=2.0)
+
+    scale = min(cw / iw, ch / ih)
+    fw, fh = max(1, round(iw * scale)), max(1, round(ih * scale))
+    fitted = img.resize((fw, fh), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    canvas_img = Image.new("RGB", (cw, ch), (0, 0, 0))
+    canvas_img.paste(fitted, ((cw - fw) // 2, (ch - fh) // 2))
+    return canvas_img
+
+
+def normalize_image(image_id: str, canvas: tuple[int, int], mode: str = FIT_LETTERBOX) -> str:
+    """정규화된 프레임 경로 반환. 이미 있으면 바로 반환 (프로세스 풀에서 실행 가능)."""
+    out_path = frame_path(image_id, canvas, mode)
+    if os.path.exists(out_path):
+        return out_path
+
+    with Image.open(image_store.original_path(image_id)) as img:
+        frame = fit_image(img, canvas, mode)
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(out_path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        # 인코더 입력용 중간 파일이라 압축은 최소로
+        frame.save(f, format="PNG", compress_level=1)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def make_pool(max_workers: int = NORMALIZE_WORKERS) -> ProcessPoolExecutor:
+    # Streamlit 프로세스는 여러 스레드가 돌고 있으므로 fork 대신 spawn 사용
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def normalize_many(image_ids: list[str], canvas: tuple[int, int], mode: str = FIT_LETTERBOX) -> list[str]:
+    """캐시에 없는 것만 프로세스 풀에서 처리하고, 입력 순서대로 경로 리스트 반환."""
+    missing = sorted({i for i in image_ids if not os.path.exists(frame_path(i, canvas, mode))})
+
+    if len(missing) > 1:
+        try:
+            with make_pool(min(NORMALIZE_WORKERS, len(missing))) as pool:
+                list(pool.map(normalize_image, missing, [canvas] * len(missing), [mode] * len(missing)))
+        except Exception:
+            # 프로세스를 띄울 수 없는 환경이면 현재 프로세스에서 처리
+            pass
+
+    return [normalize_image(i, canvas, mode) for i in image_ids]
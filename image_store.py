@@ -0,0 +1,94 @@
+import base64
+import hashlib
+import io
+import os
+import re
+import tempfile
+
+from PIL import Image
+
+# =========================
+# 디스크 기반 이미지 저장소 (내용 해시 = 핸들)
+# =========================
+STORE_DIR = os.path.join(".ikapp_media", "images")
+THUMB_SIZE = (320, 320)
+
+_IMAGE_ID_RE = re.compile(r"[0-9a-f]{64}")
+
+
+def is_valid_id(image_id) -> bool:
+    """핸들은 sha256 hex 64자. 번들 / 작업 파일에서 온 값이 경로가 되지 않도록 확인한다."""
+    return isinstance(image_id, str) and _IMAGE_ID_RE.fullmatch(image_id) is not None
+
+
+def _shard_dir(image_id: str) -> str:
+    if not is_valid_id(image_id):
+        raise ValueError(f"INVALID_IMAGE_ID: {str(image_id)[:80]}")
+    return os.path.join(STORE_DIR, image_id[:2])
+
+
+def original_path(image_id: str) -> str:
+    return os.path.join(_shard_dir(image_id), f"{image_id}.png")
+
+
+def thumb_path(image_id: str) -> str:
+    return os.path.join(_shard_dir(image_id), f"{image_id}_thumb.webp")
+
+
+def exists(image_id: str | None) -> bool:
+    return is_valid_id(image_id) and os.path.exists(original_path(image_id))
+
+
+def _atomic_write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def make_thumbnail(png_bytes: bytes, size=THUMB_SIZE) -> bytes:
+    img = Image.open(io.BytesIO(png_bytes))
+    # reducing_gap 을 주면 Image.reduce 로 먼저 크게 줄인 뒤 리샘플링해서 빠르다
+    img.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, format="WEBP", quality=80, method=4)
+    return buf.getvalue()
+
+
+def put_bytes(png_bytes: bytes) -> str:
+    """원본 PNG 와 썸네일을 저장하고 핸들(sha256)을 반환. 같은 내용은 한 번만 저장된다."""
+    image_id = hashlib.sha256(png_bytes).hexdigest()
+
+    if not os.path.exists(original_path(image_id)):
+        _atomic_write(original_path(image_id), png_bytes)
+    if not os.path.exists(thumb_path(image_id)):
+        _atomic_write(thumb_path(image_id), make_thumbnail(png_bytes))
+
+    return image_id
+
+
+def put_b64(b64_str: str | None) -> str | None:
+    if not b64_str:
+        return None
+    return put_bytes(base64.b64decode(b64_str))
+
+
+def read_bytes(image_id: str) -> bytes:
+    with open(original_path(image_id), "rb") as f:
+        return f.read()
+
+
+def ensure_thumbnail(image_id: str) -> str:
+    """썸네일이 없으면(예전 항목 등) 이때 만들어 두고 경로 반환. 갤러리는 보이는 페이지 것만 부른다."""
+    path = thumb_path(image_id)
+    if not os.path.exists(path) and exists(image_id):
+        _atomic_write(path, make_thumbnail(read_bytes(image_id)))
+    return path
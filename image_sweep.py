@@ -0,0 +1,134 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+import openai
+
+import image_cache
+import image_gallery
+import image_store
+from image_jobs import ImageRequest
+
+# =========================
+# 이미지 스타일 스윕 (프롬프트 변형 × 비율 × 품질 을 asyncio 로 동시에)
+# =========================
+SWEEP_CONCURRENCY = 4
+
+# gpt-image-1 이미지 1장당 대략적인 출력 비용 (USD, 품질 / 크기별)
+IMAGE_PRICES_USD = {
+    ("low", "1024x1024"): 0.011,
+    ("low", "1536x1024"): 0.016,
+    ("low", "1024x1536"): 0.016,
+    ("medium", "1024x1024"): 0.042,
+    ("medium", "1536x1024"): 0.063,
+    ("medium", "1024x1536"): 0.063,
+    ("high", "1024x1024"): 0.167,
+    ("high", "1536x1024"): 0.25,
+    ("high", "1024x1536"): 0.25,
+}
+
+
+def estimate_cost(request: ImageRequest) -> float:
+    return IMAGE_PRICES_USD.get((request.quality, request.size), 0.0)
+
+
+def split_variants(text: str) -> list[str]:
+    """'---' 만 있는 줄로 프롬프트 변형을 나눈다 (프롬프트 자체가 여러 줄일 수 있으므로)."""
+    variants, buf = [], []
+    for line in (text or "").splitlines():
+        if line.strip() == "---":
+            variants.append("\n".join(buf).strip())
+            buf = []
+        else:
+            buf.append(line)
+    variants.append("\n".join(buf).strip())
+    return [v for v in variants if v]
+
+
+def build_sweep(prompts: list[str], sizes: list[str], qualities: list[str], model: str = "gpt-image-1"):
+    """[(라벨, ImageRequest), ...] — 순서는 그리드 표시 순서와 같다."""
+    cells = []
+    for p_idx, prompt in enumerate(prompts, 1):
+        for size in sizes:
+            for quality in qualities:
+                label = f"변형 {p_idx} · {size} · {quality}"
+                cells.append((label, ImageRequest(prompt=prompt, model=model, size=size, quality=quality)))
+    return cells
+
+
+@dataclass
+class SweepResult:
+    index: int
+    label: str
+    request: ImageRequest
+    image_id: str | None = None
+    latency: float = 0.0
+    cost: float = 0.0
+    from_cache: bool = False
+    error: str | None = None
+
+
+async def _run_cell(index, label, request, client, semaphore, force_new: bool) -> SweepResult:
+    result = SweepResult(index=index, label=label, request=request)
+
+    if not force_new:
+        cached_id = image_cache.lookup(request.cache_key)
+        if cached_id:
+            result.image_id = cached_id
+            result.from_cache = True
+            return result
+
+    async with semaphore:
+        t0 = time.perf_counter()
+        try:
+            resp = await client.images.generate(
+                model=request.model,
+                prompt=request.full_prompt,
+                size=request.size,
+                quality=request.quality,
+                n=1,
+            )
+            # base64 디코딩 + PNG/썸네일 저장은 이벤트 루프를 막지 않도록 스레드에서
+            image_id = await asyncio.to_thread(image_store.put_b64, resp.data[0].b64_json)
+        except Exception as e:
+            result.latency = time.perf_counter() - t0
+            result.error = f"{type(e).__name__}: {e}"[:300]
+            return result
+        result.latency = time.perf_counter() - t0
+
+    image_cache.put(request.cache_key, image_id)
+    image_gallery.record(request, image_id, result.latency, source="sweep")
+    result.image_id = image_id
+    result.cost = estimate_cost(request)
+    return result
+
+
+async def run_sweep(
+    cells,
+    api_key: str,
+    concurrency: int = SWEEP_CONCURRENCY,
+    force_new: bool = False,
+    on_result=None,
+) -> list[SweepResult]:
+    """
+    cells 를 동시에 실행 (동시 요청 수는 세마포어로 제한).
+    on_result(SweepResult) 는 끝나는 순서대로, 이 코루틴을 돌리는 스레드에서 호출된다.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    client = openai.AsyncOpenAI(api_key=api_key, max_retries=2)
+    results = []
+    try:
+        tasks = [
+            asyncio.create_task(_run_cell(i, label, request, client, semaphore, force_new))
+            for i, (label, request) in enumerate(cells)
+        ]
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            results.append(result)
+            if on_result:
+                on_result(result)
+    finally:
+        await client.close()
+
+    results.sort(key=lambda r: r.index)
+    return results
@@ -0,0 +1,238 @@
+import hashlib
+import hmac
+import mimetypes
+import os
+import re
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from uuid import uuid4
+
+# =========================
+# 렌더링된 미디어(MP4 등) 관리 디렉터리
+#   세션 상태에는 바이트 대신 경로만 두고, 파일은 여기서 바로 서빙한다
+# =========================
+MEDIA_DIR = os.path.join(".ikapp_media", "media")
+
+# 만든 지 이 시간이 지난 파일만 지운다.
+# 세션끼리 디렉터리를 같이 쓰므로 "최근 N개" 로 지우면 다른 사용자가 보고 있는 영상이 지워질 수 있다
+MEDIA_RETENTION_SECONDS = 24 * 3600
+
+CHUNK_SIZE = 256 * 1024
+
+
+def new_media_path(prefix: str, ext: str = ".mp4") -> str:
+    os.makedirs(MEDIA_DIR, exist_ok=True)
+    return os.path.join(MEDIA_DIR, f"{prefix}_{int(time.time())}_{uuid4().hex[:8]}{ext}")
+
+
+def publish_file(src_path: str, prefix: str) -> str:
+    """다른 곳에서 만든 파일을 미디어 디렉터리로 옮기고 새 경로 반환."""
+    dest = new_media_path(prefix, os.path.splitext(src_path)[1] or ".mp4")
+    shutil.move(src_path, dest)
+    prune(prefix)
+    return dest
+
+
+def publish_bytes(data: bytes, prefix: str, ext: str = ".mp4") -> str:
+    dest = new_media_path(prefix, ext)
+    fd, tmp_path = tempfile.mkstemp(dir=MEDIA_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, dest)
+    prune(prefix)
+    return dest
+
+
+def prune(prefix: str, max_age: float = MEDIA_RETENTION_SECONDS):
+    if not os.path.isdir(MEDIA_DIR):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(MEDIA_DIR):
+        if not name.startswith(prefix + "_"):
+            continue
+        path = os.path.join(MEDIA_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def exists(path: str | None) -> bool:
+    return bool(path) and os.path.exists(path)
+
+
+# =========================
+# Range 요청을 지원하는 작은 미디어 서버 (기본으로 켜짐)
+#   기본은 127.0.0.1:MEDIA_SERVER_PORT(8599). MEDIA_SERVER_PORT=0 이면 끈다.
+#   원격 브라우저에서 쓰려면 MEDIA_SERVER_HOST=0.0.0.0 으로 바인딩하거나, 프록시 뒤라면 MEDIA_PUBLIC_URL 로
+#   공개 주소를 지정한다. 브라우저가 닿을 수 없는 경우에만 페이지가 Streamlit 을 거쳐 보낸다.
+#   URL 에는 파일 이름의 HMAC 서명(?t=)이 붙고, 서명이 없거나 틀리면 403 (프로세스마다 새 키)
+# =========================
+DEFAULT_MEDIA_SERVER_PORT = 8599
+_URL_KEY = secrets.token_bytes(32)
+_LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+def sign_name(name: str) -> str:
+    return hmac.new(_URL_KEY, name.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def parse_range(header: str | None, size: int):
+    """(start, end) 포함 범위. 헤더가 없으면 None, 만족할 수 없으면 ValueError."""
+    if not header:
+        return None
+    m = _RANGE_RE.match(header.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        raise ValueError("BAD_RANGE")
+
+    if m.group(1):
+        start = int(m.group(1))
+        end = int(m.group(2)) if m.group(2) else size - 1
+    else:
+        # bytes=-N : 마지막 N 바이트
+        start = max(0, size - int(m.group(2)))
+        end = size - 1
+
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        raise ValueError("BAD_RANGE")
+    return start, end
+
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _resolve(self):
+        parts = urlsplit(self.path)
+        # 미디어 디렉터리 바로 아래 파일만 (경로 조작 차단)
+        name = os.path.basename(unquote(parts.path))
+        path = os.path.join(MEDIA_DIR, name)
+        if not name or name.endswith(".tmp") or not os.path.isfile(path):
+            return None, parts
+        return path, parts
+
+    def _authorized(self, parts) -> bool:
+        token = parse_qs(parts.query).get("t", [""])[0]
+        name = os.path.basename(unquote(parts.path))
+        return hmac.compare_digest(token, sign_name(name))
+
+    def _send_headers(self):
+        path, parts = self._resolve()
+        if not self._authorized(parts):
+            self.send_error(403)
+            return None
+        if path is None:
+            self.send_error(404)
+            return None
+
+        size = os.path.getsize(path)
+        try:
+            byte_range = parse_range(self.headers.get("Range"), size)
+        except ValueError:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        start, end = byte_range if byte_range else (0, size - 1)
+        self.send_response(206 if byte_range else 200)
+        self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        # 파일명이 매번 새로 만들어지므로 오래 캐시해도 된다 (서명 URL 이라 공유 캐시에는 두지 않음)
+        self.send_header("Cache-Control", "private, max-age=86400, immutable")
+        if "download" in parse_qs(parts.query):
+            self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(path)}"')
+        self.end_headers()
+        return path, start, end
+
+    def do_HEAD(self):
+        self._send_headers()
+
+    def do_GET(self):
+        sent = self._send_headers()
+        if sent is None:
+            return
+        path, start, end = sent
+        remaining = end - start + 1
+        try:
+            with open(path, "rb") as f:
+                f.seek(start)
+                while remaining > 0:
+                    chunk = f.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            # 탐색(seek) 시 브라우저가 이전 요청을 끊는 것은 정상
+            pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def ensure_media_server():
+    """(프로세스당 한 번) 서버를 띄운다. MEDIA_SERVER_PORT=0 으로 꺼 두었거나 포트를 못 열면 None."""
+    global _server
+    port = os.getenv("MEDIA_SERVER_PORT", str(DEFAULT_MEDIA_SERVER_PORT)).strip()
+    if port in ("", "0"):
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((os.getenv("MEDIA_SERVER_HOST", "127.0.0.1"), int(port)), MediaRequestHandler)
+            except (OSError, ValueError):
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+        return _server
+
+
+def public_base_url(server, request_host: str | None = None) -> str | None:
+    """
+    브라우저가 접근할 주소.
+    1) MEDIA_PUBLIC_URL (리버스 프록시 뒤 등)
+    2) 외부 인터페이스에 바인딩했으면 페이지를 연 호스트 이름 + 미디어 포트
+    3) 루프백 바인딩이면 localhost — 페이지도 같은 머신(localhost)에서 열었을 때만. 아니면 None
+    """
+    configured = os.getenv("MEDIA_PUBLIC_URL")
+    if configured:
+        return configured.rstrip("/")
+    bind_host, port = server.server_address[:2]
+    hostname = urlsplit(f"//{request_host}").hostname if request_host else None
+    if bind_host not in _LOOPBACK_HOSTS:
+        if hostname:
+            return f"http://{hostname}:{port}"
+    elif hostname and hostname not in _LOOPBACK_HOSTS:
+        # 원격 브라우저의 localhost 는 이 서버가 아니다
+        return None
+    return f"http://localhost:{port}"
+
+
+def media_url(path: str, download: bool = False, request_host: str | None = None) -> str | None:
+    """
+    브라우저가 닿을 수 있는 미디어 서버가 있으면 서명된 URL, 아니면 None.
+    request_host 에는 페이지 요청의 Host 헤더(st.context.headers["Host"])를 넘긴다.
+    """
+    server = ensure_media_server()
+    base = public_base_url(server, request_host) if server is not None else None
+    if base is None:
+        return None
+    name = os.path.basename(path)
+    url = f"{base}/{name}?t={sign_name(name)}"
+    return url + "&download=1" if download else url
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import tempfile
+import wave
+from dataclasses import dataclass
+
+from image_jobs import get_client
+
+# =========================
+# 장면별 TTS 내레이션
+#   OpenAI TTS 의 pcm 출력 = 24kHz / 16bit / mono (헤더 없음)
+# =========================
+AUDIO_DIR = os.path.join(".ikapp_media", "audio")
+
+PCM_RATE = 24000
+PCM_WIDTH = 2
+PCM_CHANNELS = 1
+
+VOICE_OPTIONS = [
+    "alloy",
+    "ash",
+    "ballad",
+    "coral",
+    "echo",
+    "fable",
+    "onyx",
+    "nova",
+    "sage",
+    "shimmer",
+    "verse",
+]
+
+
+@dataclass(frozen=True)
+class TtsRequest:
+    text: str
+    voice: str = "alloy"
+    model: str = "gpt-4o-mini-tts"
+
+    @property
+    def audio_id(self) -> str:
+        raw = json.dumps([" ".join(self.text.split()), self.voice, self.model], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def pcm_path(audio_id: str) -> str:
+    return os.path.join(AUDIO_DIR, f"{audio_id}.pcm")
+
+
+def pcm_seconds(num_bytes: int) -> float:
+    return num_bytes / float(PCM_RATE * PCM_WIDTH * PCM_CHANNELS)
+
+
+def synthesize(request: TtsRequest, api_key: str) -> tuple[str, float]:
+    """
+    (audio_id, 길이(초)) 반환. 같은 문장/목소리는 디스크에 있는 결과를 재사용한다.
+    모듈 최상위 함수라 스레드/프로세스 풀 어디서든 실행 가능.
+    """
+    audio_id = request.audio_id
+    path = pcm_path(audio_id)
+
+    if not os.path.exists(path):
+        response = get_client(api_key, max_retries=2).audio.speech.create(
+            model=request.model,
+            voice=request.voice,
+            input=request.text,
+            response_format="pcm",
+        )
+        os.makedirs(AUDIO_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=AUDIO_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(response.read())
+        os.replace(tmp_path, path)
+
+    return audio_id, pcm_seconds(os.path.getsize(path))
+
+
+def build_narration_track(audio_ids: list[str | None], durations: list[float], output_path: str):
+    """
+    장면 순서대로 내레이션을 이어붙인 WAV 작성.
+    각 장면은 영상 길이(durations)에 맞춰 뒤를 무음으로 채우므로 화면과 소리가 어긋나지 않는다.
+    """
+    frame_bytes = PCM_WIDTH * PCM_CHANNELS
+    with wave.open(output_path, "wb") as out:
+        out.setnchannels(PCM_CHANNELS)
+        out.setsampwidth(PCM_WIDTH)
+        out.setframerate(PCM_RATE)
+
+        for audio_id, dur in zip(audio_ids, durations):
+            target = int(round(dur * PCM_RATE)) * frame_bytes
+            written = 0
+            if audio_id and os.path.exists(pcm_path(audio_id)):
+                with open(pcm_path(audio_id), "rb") as f:
+                    data = f.read(target)
+                data = data[: len(data) - (len(data) % frame_bytes)]
+                out.writeframes(data)
+                written = len(data)
+            if written < target:
+                out.writeframes(b"\x00" * (target - written))
+
+
+def scene_duration(audio_seconds: float | None, fallback: float, tail: float = 0.4) -> float:
+    """내레이션이 있으면 (음성 길이 + 여유), 없으면 기본 장면 길이."""
+    if audio_seconds:
+        return round(audio_seconds + tail, 3)
+    return fallback
+
+
+class SceneDuration:
+    """TTS Future 를 감싸서, 인코더가 result() 로 장면 길이(초)를 받아가게 한다."""
+
+    def __init__(self, future, fallback: float):
+        self.future = future
+        self.fallback = fallback
+
+    def result(self) -> float:
+        if self.future is None:
+            return self.fallback
+        try:
+            _, seconds = self.future.result()
+        except Exception:
+            return self.fallback
+        return scene_duration(seconds, self.fallback)
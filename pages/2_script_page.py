@@ -2,9 +2,16 @@ import streamlit as st
 from openai import OpenAI
 import os
 import json
+import asyncio
+import time
 from json import JSONDecodeError
 from uuid import uuid4
 
+import pandas as pd
+
+import script_batch
+from chat_stream import ChatStream, format_stats
+
 st.set_page_config(page_title="scriptking", page_icon="📝", layout="centered")
 
 api_key = os.getenv("GPT_API_KEY")
@@ -47,6 +54,10 @@ DEFAULT_INSTRUCTION_TEXT = "\n\n".join(
 st.session_state.setdefault("history", [])
 st.session_state.setdefault("current_input", "")
 st.session_state.setdefault("last_output", "")
+st.session_state.setdefault("last_stats", None)
+st.session_state.setdefault("pending_generation", None)
+st.session_state.setdefault("last_request", None)
+st.session_state.setdefault("batch_results", [])
 st.session_state.setdefault("model_choice", "gpt-4o-mini")
 
 # ✅ 단일 지침 텍스트
@@ -167,6 +178,8 @@ def reset_config():
         "history",
         "current_input",
         "last_output",
+        "last_stats",
+        "last_request",
         "model_choice",
         "instruction_text",
         "instruction_sets",
@@ -210,19 +223,14 @@ def run_generation():
     if not system_text:
         system_text = DEFAULT_INSTRUCTION_TEXT
 
-    user_text = f"다음 주제에 맞는 다큐멘터리 내레이션을 작성해줘.\n\n주제: {topic}"
-
-    with st.spinner("🎬 대본을 작성하는 중입니다..."):
-        res = client.chat.completions.create(
-            model=st.session_state.model_choice,
-            messages=[
-                {"role": "system", "content": system_text},
-                {"role": "user", "content": user_text},
-            ],
-            max_tokens=600,
-        )
+    user_text = script_batch.build_user_text(topic)
 
-    st.session_state.last_output = res.choices[0].message.content
+    # 콜백 안에서는 결과 영역에 그릴 수 없으므로, 요청만 남겨두고 아래 "생성 결과" 에서 스트리밍
+    st.session_state.pending_generation = {
+        "model": st.session_state.model_choice,
+        "system": system_text,
+        "user": user_text,
+    }
 
 
 # ============================
@@ -641,11 +649,40 @@ st.markdown("<div style='margin-top:0.6rem;'></div>", unsafe_allow_html=True)
 # ============================
 # 생성 결과
 # ============================
+pending = st.session_state.pending_generation
+if pending:
+    st.session_state.pending_generation = None
+    st.markdown(
+        "<h3 style='text-align:center; margin-bottom:0.75rem;'>📄 생성된 내레이션</h3>",
+        unsafe_allow_html=True,
+    )
+    stream = ChatStream(
+        client,
+        pending["model"],
+        pending["system"],
+        pending["user"],
+        max_tokens=600,
+        force_new=pending.get("force_new", False),
+    )
+    # 토큰이 오는 대로 그리고, 끝나면 rerun 으로 편집 가능한 텍스트 영역으로 바꾼다
+    st.write_stream(stream)
+    st.session_state.last_output = stream.text
+    st.session_state.last_stats = stream.stats()
+    st.session_state.last_request = {k: v for k, v in pending.items() if k != "force_new"}
+    st.rerun()
+
 if st.session_state.last_output:
     st.markdown(
         "<h3 style='text-align:center; margin-bottom:0.75rem;'>📄 생성된 내레이션</h3>",
         unsafe_allow_html=True,
     )
+    col_stats, col_regen = st.columns([3, 1])
+    if st.session_state.last_stats:
+        col_stats.caption(format_stats(st.session_state.last_stats))
+    if st.session_state.last_request and col_regen.button("🔁 다시 생성", use_container_width=True):
+        # 같은 주제 / 지침이라도 캐시를 건너뛰고 새로 생성
+        st.session_state.pending_generation = {**st.session_state.last_request, "force_new": True}
+        st.rerun()
     output_text = st.text_area(
         "",
         value=st.session_state.last_output,
@@ -654,3 +691,93 @@ if st.session_state.last_output:
         label_visibility="collapsed",
     )
     st.session_state.last_output = output_text
+
+# ============================
+# 일괄 생성 (주제 여러 개를 현재 지침 set 으로 한 번에)
+# ============================
+def batch_table(results) -> pd.DataFrame:
+    rows = []
+    for r in results:
+        if r.error:
+            status = f"❌ {r.error}"
+        elif r.from_cache:
+            status = "⚡ 캐시"
+        else:
+            status = f"✅ {r.latency:.1f}s · {r.tokens} 토큰"
+        rows.append({"#": r.index + 1, "주제": r.topic, "상태": status, "대본": r.text})
+    return pd.DataFrame(rows, columns=["#", "주제", "상태", "대본"])
+
+
+st.markdown("<div style='margin-top:0.6rem;'></div>", unsafe_allow_html=True)
+with st.expander("📚 일괄 생성 (주제 여러 개)", expanded=False):
+    batch_text = st.text_area(
+        "주제 목록 (한 줄에 하나)",
+        height=160,
+        key="batch_topics_text",
+        placeholder="타이타닉 침몰\n체르노빌 원전 사고\n...",
+    )
+    batch_file = st.file_uploader("또는 CSV 업로드 ('주제' 열 또는 첫 번째 열)", type=["csv"], key="batch_topics_csv")
+
+    topics = script_batch.parse_topics(batch_text)
+    if batch_file is not None:
+        topics = script_batch.parse_topics_csv(batch_file.getvalue()) + topics
+        topics = script_batch.parse_topics("\n".join(topics))
+
+    col_b1, col_b2 = st.columns([2, 1])
+    batch_concurrency = col_b1.slider("동시 요청", min_value=1, max_value=16, value=script_batch.BATCH_CONCURRENCY)
+    batch_force_new = col_b2.checkbox("캐시 무시", value=False)
+    st.caption(f"주제 {len(topics)}개 · 지침 set: {active_name} · 모델: {st.session_state.model_choice}")
+
+    if st.button("🚀 일괄 생성", type="primary", disabled=not topics, use_container_width=True):
+        system_text = (st.session_state.instruction_text or "").strip() or DEFAULT_INSTRUCTION_TEXT
+        table = st.empty()
+        progress = st.progress(0.0, text="일괄 생성 중...")
+        finished = []
+
+        def _on_result(result):
+            # 끝나는 순서대로 표를 다시 그린다 (요청 수에 비해 그리는 비용은 무시할 만함)
+            finished.append(result)
+            table.dataframe(batch_table(sorted(finished, key=lambda r: r.index)), use_container_width=True, hide_index=True)
+            progress.progress(len(finished) / len(topics), text=f"일괄 생성 중... {len(finished)}/{len(topics)}")
+
+        t0 = time.perf_counter()
+        results = asyncio.run(
+            script_batch.run_batch(
+                topics,
+                api_key,
+                model=st.session_state.model_choice,
+                system_text=system_text,
+                concurrency=batch_concurrency,
+                force_new=batch_force_new,
+                on_result=_on_result,
+            )
+        )
+        elapsed = time.perf_counter() - t0
+        progress.empty()
+        table.empty()
+        st.session_state.batch_results = results
+
+        failed = sum(1 for r in results if r.error)
+        st.success(
+            f"✅ {len(results) - failed}/{len(results)}개 완료 · 전체 {elapsed:.1f}s "
+            f"(개별 요청 합계 {sum(r.latency for r in results):.1f}s) · 캐시 {sum(r.from_cache for r in results)}개"
+        )
+
+    results = st.session_state.batch_results
+    if results:
+        st.dataframe(batch_table(results), use_container_width=True, hide_index=True)
+        col_e1, col_e2 = st.columns(2)
+        col_e1.download_button(
+            "⬇️ CSV 내보내기",
+            data=script_batch.to_csv_bytes(results),
+            file_name="scriptking_batch.csv",
+            mime="text/csv",
+            use_container_width=True,
+        )
+        col_e2.download_button(
+            "⬇️ JSONL 내보내기",
+            data=script_batch.to_jsonl_bytes(results),
+            file_name="scriptking_batch.jsonl",
+            mime="application/json",
+            use_container_width=True,
+        )
@@ -4,6 +4,8 @@ import os, json
 from json import JSONDecodeError
 from uuid import uuid4
 
+from chat_stream import ChatStream, format_stats
+
 # =================================================
 # 기본 설정
 # =================================================
@@ -42,6 +44,7 @@ DEFAULT_INSTRUCTION = """너는 감성적이고 스토리텔링이 뛰어난 다
 # =================================================
 st.session_state.setdefault(K("input"), "")
 st.session_state.setdefault(K("output"), "")
+st.session_state.setdefault(K("stats"), None)
 st.session_state.setdefault(K("model"), "gpt-4o-mini")
 
 st.session_state.setdefault(K("instruction"), DEFAULT_INSTRUCTION)
@@ -241,22 +244,34 @@ st.text_area(
     placeholder="대본을 붙여넣고 지침 수행을 누르세요.",
 )
 
-if st.button("지침 수행", use_container_width=True):
-    with st.spinner("변환 중..."):
-        res = client.chat.completions.create(
-            model=st.session_state[K("model")],
-            messages=[
-                {"role": "system", "content": st.session_state[K("instruction")]},
-                {"role": "user", "content": st.session_state[K("input")]},
-            ],
-            max_tokens=800,
-        )
-    st.session_state[K("output")] = res.choices[0].message.content
+col_run, col_regen = st.columns([3, 1])
+clicked_run = col_run.button("지침 수행", use_container_width=True)
+# 같은 대본 / 지침이면 캐시된 결과가 바로 나오므로, 새 결과가 필요할 때만 다시 생성
+clicked_regen = col_regen.button("🔁 다시 생성", use_container_width=True)
+
+if clicked_run or clicked_regen:
+    stream = ChatStream(
+        client,
+        st.session_state[K("model")],
+        st.session_state[K("instruction")],
+        st.session_state[K("input")],
+        max_tokens=800,
+        force_new=clicked_regen,
+    )
+    # 토큰이 오는 대로 보여주고, 끝나면 아래 결과 텍스트 영역으로 대체
+    placeholder = st.empty()
+    with placeholder.container():
+        st.write_stream(stream)
+    placeholder.empty()
+    st.session_state[K("output")] = stream.text
+    st.session_state[K("stats")] = stream.stats()
 
 # =================================================
 # 출력
 # =================================================
 if st.session_state[K("output")]:
+    if st.session_state[K("stats")]:
+        st.caption(format_stats(st.session_state[K("stats")]))
     st.text_area(
         "결과",
         value=st.session_state[K("output")],
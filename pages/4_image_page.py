@@ -1,13 +1,19 @@
 import os
-import json
-import base64
-import urllib.request
-import urllib.error
+import asyncio
+import time
 
 import streamlit as st
 from openai import OpenAI
 from dotenv import load_dotenv
 
+import image_cache
+import image_gallery
+import image_store
+import image_sweep
+import media_store
+import video_jobs
+from image_jobs import ImageRequest, generate_image_b64
+
 load_dotenv()
 
 st.set_page_config(page_title="imageking", page_icon="🎬", layout="wide")
@@ -51,25 +57,33 @@ if not GPT_API_KEY:
 
 client = OpenAI(api_key=GPT_API_KEY)
 
+# 디스크에 남아 있는 영상 작업(이전 세션/재시작 전 제출분)도 이어서 폴링
+video_jobs.ensure_runner(GPT_API_KEY)
+
 IMAGE_MODELS = {"OpenAI gpt-image-1": "gpt-image-1"}
 VIDEO_MODELS = {"OpenAI gpt-video-1": "gpt-video-1"}
 
 st.session_state.setdefault("prompt_text", "")
-st.session_state.setdefault("image_b64", None)
+st.session_state.setdefault("image_id", None)
+st.session_state.setdefault("image_from_cache", False)
+st.session_state.setdefault("force_new_variant", False)
 st.session_state.setdefault("image_model_label", "OpenAI gpt-image-1")
 st.session_state.setdefault("image_orientation", "정사각형 1:1 (1024x1024)")
 st.session_state.setdefault("image_quality", "low")
 
-st.session_state.setdefault("video_bytes", None)
+st.session_state.setdefault("sweep_results", [])
+
+st.session_state.setdefault("video_path", None)
 st.session_state.setdefault("video_error_msg", None)
+if "video_job_id" not in st.session_state:
+    # 새 세션(새로고침/재접속)이면 이 브라우저 주소(?video_job=)에 기록된 작업만 이어서 지켜본다
+    resumed = video_jobs.load_job(st.query_params.get("video_job"))
+    st.session_state["video_job_id"] = resumed["job_id"] if resumed else None
 st.session_state.setdefault("video_model_label", "OpenAI gpt-video-1")
 st.session_state.setdefault("video_size", "9:16 (1080x1920)")
 st.session_state.setdefault("video_duration", 5)
 st.session_state.setdefault("video_fps", 24)
 
-def b64_to_bytes(b64_str: str) -> bytes:
-    return base64.b64decode(b64_str)
-
 def get_image_params():
     orientation = st.session_state.get("image_orientation", "정사각형 1:1 (1024x1024)")
     quality = st.session_state.get("image_quality", "low")
@@ -97,24 +111,29 @@ def get_video_params():
     fps = max(12, min(fps, 60))
     return size, duration, fps
 
-def generate_image(prompt: str):
+def generate_image(prompt: str, force_new: bool = False):
+    """(image_id, 캐시적중여부) 반환. 같은 요청은 캐시에서 바로 가져온다."""
     if not prompt:
-        return None
+        return None, False
     size, quality = get_image_params()
     label = st.session_state.get("image_model_label", list(IMAGE_MODELS.keys())[0])
     model = IMAGE_MODELS.get(label, "gpt-image-1")
-    resp = client.images.generate(model=model, prompt=prompt, size=size, quality=quality, n=1)
-    return resp.data[0].b64_json
+    request = ImageRequest(prompt=prompt, model=model, size=size, quality=quality)
 
-def generate_video_from_prompt_rest(prompt: str):
-    if not prompt:
-        return None, "EMPTY_PROMPT"
+    def _generate():
+        # 새로 만든 이미지만 갤러리에 기록 (캐시 적중은 이미 기록돼 있다)
+        t0 = time.perf_counter()
+        image_id = image_store.put_b64(generate_image_b64(request, client))
+        image_gallery.record(request, image_id, time.perf_counter() - t0)
+        return image_id
+
+    return image_cache.cached_generate(request.cache_key, _generate, force_new=force_new)
 
+def build_video_payload(prompt: str) -> dict:
     label = st.session_state.get("video_model_label", list(VIDEO_MODELS.keys())[0])
     model = VIDEO_MODELS.get(label, "gpt-video-1")
     size, duration, fps = get_video_params()
-
-    payload = {
+    return {
         "model": model,
         "prompt": prompt,
         "size": size,
@@ -123,37 +142,41 @@ def generate_video_from_prompt_rest(prompt: str):
         "response_format": "b64_json",
     }
 
-    req = urllib.request.Request(
-        "https://api.openai.com/v1/videos/generations",
-        data=json.dumps(payload).encode("utf-8"),
-        headers={
-            "Authorization": f"Bearer {GPT_API_KEY}",
-            "Content-Type": "application/json",
-        },
-        method="POST",
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=300) as r:
-            raw = r.read().decode("utf-8")
-        data = json.loads(raw)
-        b64 = None
-        if isinstance(data, dict):
-            if "data" in data and isinstance(data["data"], list) and data["data"]:
-                b64 = data["data"][0].get("b64_json")
-            if not b64 and "b64_json" in data:
-                b64 = data["b64_json"]
-        if not b64:
-            return None, f"VIDEO_B64_NOT_FOUND: {str(data)[:300]}"
-        return base64.b64decode(b64), None
-    except urllib.error.HTTPError as e:
-        try:
-            detail = e.read().decode("utf-8", errors="ignore")
-        except Exception:
-            detail = str(e)
-        return None, f"HTTPError {e.code}: {detail[:500]}"
-    except Exception as e:
-        return None, str(e)
+VIDEO_STATUS_LABELS = {
+    video_jobs.STATUS_SUBMITTING: "요청 전송 중",
+    video_jobs.STATUS_QUEUED: "대기열",
+    video_jobs.STATUS_IN_PROGRESS: "생성 중",
+    video_jobs.STATUS_DOWNLOADING: "결과 받는 중",
+}
+
+def merge_video_job():
+    """끝난 영상 작업 결과를 세션에 반영 (스크립트 스레드에서만)."""
+    job = video_jobs.load_job(st.session_state.get("video_job_id"))
+    if not job or video_jobs.is_active(job):
+        return
+    st.session_state["video_job_id"] = None
+    if job["status"] == video_jobs.STATUS_COMPLETED and media_store.exists(job.get("video_path")):
+        st.session_state["video_path"] = job["video_path"]
+        st.session_state["video_error_msg"] = None
+    else:
+        st.session_state["video_path"] = None
+        st.session_state["video_error_msg"] = f"영상 생성 실패: {job.get('error')}"
+
+@st.fragment(run_every=2)
+def video_job_status():
+    """진행 중인 영상 작업 상태. 끝나면 전체 rerun 으로 미리보기에 반영."""
+    job = video_jobs.load_job(st.session_state.get("video_job_id"))
+    if not job:
+        return
+    if not video_jobs.is_active(job):
+        st.rerun()
+    elapsed = int(time.time() - job.get("created_at", time.time()))
+    text = f"🎬 영상 작업: {VIDEO_STATUS_LABELS.get(job['status'], job['status'])} · {elapsed}초 경과"
+    if job.get("progress") is not None:
+        text += f" · {job['progress']}%"
+    st.caption(text)
+    if job.get("error"):
+        st.caption(f"⚠️ 재시도 대기 중: {job['error'][:120]}")
 
 with st.sidebar:
     with st.expander("🖼 이미지 옵션", expanded=True):
@@ -182,6 +205,15 @@ with st.sidebar:
             horizontal=True,
         )
 
+        st.session_state["force_new_variant"] = st.checkbox(
+            "캐시 무시하고 새 변형 생성",
+            value=st.session_state.get("force_new_variant", False),
+        )
+        cache_stats = image_cache.get_stats()
+        st.caption(
+            f"이미지 캐시: {cache_stats['entries']}개 · 누적 적중률 {cache_stats['hit_rate'] * 100:.0f}%"
+        )
+
     st.markdown("")
 
     with st.expander("🎬 동영상 생성 (모델/옵션)", expanded=True):
@@ -259,10 +291,14 @@ with st.expander("🧪 이미지 / 영상 생성", expanded=False):
             st.warning("프롬프트를 먼저 입력해주세요.")
         else:
             with st.spinner("이미지를 생성하는 중입니다..."):
-                new_b64 = generate_image(prompt_text.strip())
-            if new_b64:
-                st.session_state["image_b64"] = new_b64
-                st.session_state["video_bytes"] = None
+                new_id, from_cache = generate_image(
+                    prompt_text.strip(),
+                    force_new=st.session_state.get("force_new_variant", False),
+                )
+            if new_id:
+                st.session_state["image_id"] = new_id
+                st.session_state["image_from_cache"] = from_cache
+                st.session_state["video_path"] = None
                 st.session_state["video_error_msg"] = None
                 st.success("✅ 이미지가 생성되었습니다.")
             else:
@@ -272,48 +308,159 @@ with st.expander("🧪 이미지 / 영상 생성", expanded=False):
         if not prompt_text.strip():
             st.warning("프롬프트를 먼저 입력해주세요.")
         else:
-            with st.spinner("영상을 생성하는 중입니다..."):
-                video_bytes, err = generate_video_from_prompt_rest(prompt_text.strip())
-            if video_bytes:
-                st.session_state["video_bytes"] = video_bytes
-                st.session_state["video_error_msg"] = None
-                st.success("🎬 영상이 생성되었습니다.")
-            else:
-                st.session_state["video_bytes"] = None
-                st.session_state["video_error_msg"] = f"영상 생성 실패: {err}"
+            # 요청은 백그라운드 러너가 보내고, 페이지는 작업 파일만 확인한다
+            job = video_jobs.submit_video_job(build_video_payload(prompt_text.strip()), GPT_API_KEY)
+            st.session_state["video_job_id"] = job["job_id"]
+            st.query_params["video_job"] = job["job_id"]
+            st.session_state["video_error_msg"] = None
+            st.info("🎬 영상 생성 작업을 제출했습니다. 완료되면 아래에 자동으로 표시됩니다.")
 
-    if st.session_state.get("image_b64"):
+    merge_video_job()
+    video_job_status()
+
+    if image_store.exists(st.session_state.get("image_id")):
         st.markdown("---")
         st.markdown("#### 🖼 생성된 이미지")
-        img_bytes = b64_to_bytes(st.session_state["image_b64"])
-        st.image(img_bytes, use_container_width=True)
+        if st.session_state.get("image_from_cache"):
+            st.caption("⚡ 캐시에서 불러온 이미지입니다. (API 호출 없음)")
+        st.image(image_store.original_path(st.session_state["image_id"]), use_container_width=True)
 
         if st.button("🔁 이 프롬프트로 다시 이미지 생성"):
             if not st.session_state.get("prompt_text", "").strip():
                 st.warning("프롬프트가 비어 있습니다.")
             else:
                 with st.spinner("이미지를 다시 생성하는 중입니다..."):
-                    new_b64 = generate_image(st.session_state["prompt_text"].strip())
-                if new_b64:
-                    st.session_state["image_b64"] = new_b64
-                    st.session_state["video_bytes"] = None
+                    new_id, _ = generate_image(st.session_state["prompt_text"].strip(), force_new=True)
+                if new_id:
+                    st.session_state["image_id"] = new_id
+                    st.session_state["image_from_cache"] = False
+                    st.session_state["video_path"] = None
                     st.session_state["video_error_msg"] = None
                     st.success("✅ 이미지가 재생성되었습니다.")
                 else:
                     st.error("이미지 재생성에 실패했습니다.")
             st.rerun()
 
-    if st.session_state.get("video_bytes"):
+    if media_store.exists(st.session_state.get("video_path")):
         st.markdown("---")
         st.markdown("#### 🎬 생성된 영상 미리보기")
-        st.video(st.session_state["video_bytes"])
-        st.download_button(
-            label="📥 영상 다운로드 (MP4)",
-            data=st.session_state["video_bytes"],
-            file_name="imageking_output.mp4",
-            mime="video/mp4",
-        )
+        video_path = st.session_state["video_path"]
+        host = st.context.headers.get("Host")
+        video_url = media_store.media_url(video_path, request_host=host)
+        if video_url:
+            # Range 요청을 지원하는 미디어 서버에서 바로 스트리밍
+            st.video(video_url)
+            st.link_button("📥 영상 다운로드 (MP4)", media_store.media_url(video_path, download=True, request_host=host))
+        else:
+            # 미디어 서버에 닿을 수 없을 때만: 다운로드 파일은 눌렀을 때 한 번만 읽는다
+            st.video(video_path)
+            if st.button("📥 영상 다운로드 준비 (MP4)", key="prepare_video_download"):
+                with open(video_path, "rb") as f:
+                    st.download_button(
+                        label="📥 영상 다운로드 (MP4)",
+                        data=f,
+                        file_name="imageking_output.mp4",
+                        mime="video/mp4",
+                    )
     elif st.session_state.get("video_error_msg"):
         st.markdown("---")
         st.markdown("#### ⚠️ 영상 생성 오류")
         st.error(st.session_state["video_error_msg"])
+
+# =========================
+# 스타일 스윕: 프롬프트 변형 × 비율 × 품질 을 한 번에
+# =========================
+SWEEP_SIZES = {
+    "정사각형 1:1": "1024x1024",
+    "가로형 3:2": "1536x1024",
+    "세로형 2:3": "1024x1536",
+}
+SWEEP_GRID_COLUMNS = 4
+
+
+def render_sweep_cell(container, result, with_actions: bool = False):
+    with container.container():
+        if result.image_id and image_store.exists(result.image_id):
+            thumb = image_store.thumb_path(result.image_id)
+            st.image(thumb if os.path.exists(thumb) else image_store.original_path(result.image_id), use_container_width=True)
+            if result.from_cache:
+                st.caption(f"{result.label}  \n⚡ 캐시 · $0")
+            else:
+                st.caption(f"{result.label}  \n⏱ {result.latency:.1f}s · ${result.cost:.3f}")
+            if with_actions and st.button("이 이미지 사용", key=f"sweep_use_{result.index}", use_container_width=True):
+                st.session_state["image_id"] = result.image_id
+                st.session_state["image_from_cache"] = result.from_cache
+                st.session_state["prompt_text"] = result.request.prompt
+                st.rerun()
+        else:
+            st.caption(f"{result.label}  \n❌ {result.error or '실패'}")
+
+
+with st.expander("🧪 스타일 스윕 (여러 변형 동시 생성)", expanded=False):
+    sweep_text = st.text_area(
+        "프롬프트 변형 (--- 만 있는 줄로 구분)",
+        height=200,
+        value=st.session_state.get("prompt_text", ""),
+        key="sweep_text",
+    )
+    col_s1, col_s2, col_s3 = st.columns([2, 1, 1])
+    sweep_ratio_labels = col_s1.multiselect("비율", list(SWEEP_SIZES.keys()), default=["정사각형 1:1"])
+    sweep_qualities = col_s2.multiselect("품질", ["low", "high"], default=["low"])
+    sweep_concurrency = col_s3.slider("동시 요청", min_value=1, max_value=8, value=image_sweep.SWEEP_CONCURRENCY)
+
+    label = st.session_state.get("image_model_label", list(IMAGE_MODELS.keys())[0])
+    sweep_cells = image_sweep.build_sweep(
+        image_sweep.split_variants(sweep_text),
+        [SWEEP_SIZES[r] for r in sweep_ratio_labels],
+        sweep_qualities,
+        model=IMAGE_MODELS.get(label, "gpt-image-1"),
+    )
+    max_cost = sum(image_sweep.estimate_cost(req) for _, req in sweep_cells)
+    st.caption(f"요청 {len(sweep_cells)}개 · 최대 예상 비용 ${max_cost:.2f} (캐시 적중분은 무료)")
+
+    clicked_sweep = st.button("🚀 스윕 실행", type="primary", disabled=not sweep_cells, use_container_width=True)
+
+    if clicked_sweep:
+        # 그리드 자리를 먼저 잡아두고, 끝나는 순서대로 채운다
+        slots = []
+        for row_start in range(0, len(sweep_cells), SWEEP_GRID_COLUMNS):
+            cols = st.columns(SWEEP_GRID_COLUMNS)
+            for offset, col in enumerate(cols[: len(sweep_cells) - row_start]):
+                slot = col.empty()
+                slot.caption(f"{sweep_cells[row_start + offset][0]}  \n⏳ 대기 중")
+                slots.append(slot)
+
+        progress = st.progress(0.0, text="스윕 실행 중...")
+        finished = []
+
+        def _on_result(result):
+            finished.append(result)
+            render_sweep_cell(slots[result.index], result)
+            progress.progress(len(finished) / len(sweep_cells), text=f"스윕 실행 중... {len(finished)}/{len(sweep_cells)}")
+
+        t0 = time.perf_counter()
+        results = asyncio.run(
+            image_sweep.run_sweep(
+                sweep_cells,
+                GPT_API_KEY,
+                concurrency=sweep_concurrency,
+                force_new=st.session_state.get("force_new_variant", False),
+                on_result=_on_result,
+            )
+        )
+        elapsed = time.perf_counter() - t0
+        progress.empty()
+        st.session_state["sweep_results"] = results
+
+        api_results = [r for r in results if not r.from_cache and r.image_id]
+        st.success(
+            f"✅ {len(results)}개 완료 · 전체 {elapsed:.1f}s "
+            f"(개별 요청 합계 {sum(r.latency for r in api_results):.1f}s) · "
+            f"비용 ${sum(r.cost for r in results):.3f} · 캐시 {sum(r.from_cache for r in results)}개"
+        )
+    elif st.session_state.get("sweep_results"):
+        results = st.session_state["sweep_results"]
+        for row_start in range(0, len(results), SWEEP_GRID_COLUMNS):
+            cols = st.columns(SWEEP_GRID_COLUMNS)
+            for col, result in zip(cols, results[row_start: row_start + SWEEP_GRID_COLUMNS]):
+                render_sweep_cell(col, result, with_actions=True)
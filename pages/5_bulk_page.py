@@ -1,21 +1,39 @@
 import os
-import io
-import base64
-import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 import streamlit as st
 from openai import OpenAI
 from dotenv import load_dotenv
 
-from PIL import Image
-import numpy as np  # ← 추가
-
-# imageio가 설치되지 않은 환경에서도 앱이 죽지 않게 예외 처리
-try:
-    import imageio.v2 as imageio
-except ImportError:
-    imageio = None
+import bulk_jobs
+import contact_sheet
+import image_cache
+import image_store
+import media_store
+import project_bundle
+from image_normalize import FIT_COVER, FIT_LETTERBOX, make_pool, normalize_image, normalize_many
+from image_jobs import (
+    AimdController,
+    BackgroundBatch,
+    ImageRequest,
+    call_with_retry,
+    get_shared_pool,
+    iter_scheduled,
+    run_image_request_cached,
+)
+from narration import (
+    VOICE_OPTIONS,
+    SceneDuration,
+    TtsRequest,
+    build_narration_track,
+    scene_duration,
+    synthesize,
+)
+from script_parser import parse_script_file as parse_script_upload, parse_script_text
+from transitions import TRANSITION_MODES, TRANSITION_NONE, render_slideshow
+from video_utils import PipelinedSlideshow, encode_slideshow, get_ffmpeg_exe, mux_audio, profile_for
 
 # =========================
 # .env 로 환경변수 로드 (로컬 개발용)
@@ -97,6 +115,18 @@ if not GPT_API_KEY:
 
 client = OpenAI(api_key=GPT_API_KEY)
 
+# 벌크 생성 동시성 (AIMD 로 시작값 → 최대값까지 자동 조절)
+BULK_INITIAL_CONCURRENCY = 4
+BULK_MAX_CONCURRENCY = 16
+BULK_MAX_ATTEMPTS = 4
+
+# 장면별 TTS 동시 요청 수
+NARRATION_WORKERS = 4
+
+# 초안 → 최종 2단계 생성 모드의 품질
+DRAFT_QUALITY = "low"
+FINAL_QUALITY = "high"
+
 # =========================
 # 이미지 / 영상 모델 프리셋
 # =========================
@@ -108,6 +138,12 @@ VIDEO_MODELS = {
     "이미지 시퀀스 → MP4 (로컬 합성)": "local_sequence_mp4",
 }
 
+# 크기가 다른 장면을 영상 캔버스에 맞추는 방식
+VIDEO_FIT_MODES = {
+    "레터박스 (전체 보이기)": FIT_LETTERBOX,
+    "꽉 채우기 (가장자리 자르기)": FIT_COVER,
+}
+
 # =========================
 # 스타일 프리셋 정의
 # =========================
@@ -140,6 +176,8 @@ STYLE_PRESETS = {
 # =========================
 st.session_state.setdefault("scenes", [])
 st.session_state.setdefault("raw_script", "")
+st.session_state.setdefault("bulk_job_id", None)
+st.session_state.setdefault("bulk_job_restored", False)
 
 st.session_state.setdefault("style_preset", "다큐 + 스틱맨 설명 캐릭터")
 st.session_state.setdefault("lock_character", True)
@@ -147,10 +185,21 @@ st.session_state.setdefault("lock_character", True)
 st.session_state.setdefault("image_model_label", "OpenAI gpt-image-1")
 st.session_state.setdefault("image_orientation", "정사각형 1:1 (1024x1024)")
 st.session_state.setdefault("image_quality", "low")
+st.session_state.setdefault("force_new_variant", False)
+st.session_state.setdefault("tiered_mode", False)
+st.session_state.setdefault("final_upgrade", None)
+st.session_state.setdefault("regen_jobs", {})
+st.session_state.setdefault("regen_done", set())
+st.session_state.setdefault("bundle_path", None)
 
 st.session_state.setdefault("video_model_label", "이미지 시퀀스 → MP4 (로컬 합성)")
 st.session_state.setdefault("seconds_per_scene", 3.0)
-st.session_state.setdefault("video_bytes", None)
+st.session_state.setdefault("pipeline_video", False)
+st.session_state.setdefault("video_fit_mode", "레터박스 (전체 보이기)")
+st.session_state.setdefault("video_transition", "없음 (정지 이미지)")
+st.session_state.setdefault("narration_enabled", False)
+st.session_state.setdefault("narration_voice", "alloy")
+st.session_state.setdefault("video_path", None)
 st.session_state.setdefault("video_error_msg", None)
 
 # =========================
@@ -163,38 +212,22 @@ def parse_script(text: str):
     Shot on ...
     2
     ...
-    이런 형식의 텍스트를 scenes 리스트로 파싱
+    이런 형식의 텍스트를 scenes 리스트로 파싱. (scenes, issues) 반환
     """
-    scenes = []
-    pattern = r'(\d+)\s*\n(.+?)(?=\n\d+\s*\n|\Z)'
-    matches = re.findall(pattern, text, flags=re.DOTALL)
-
-    for num, block in matches:
-        block = block.strip()
-        block = block.replace("\u2028", "\n")  # 특수 줄바꿈 치환
-
-        if "Shot on" in block:
-            ko_part, en_part = block.split("Shot on", 1)
-            korean = ko_part.strip()
-            english_prompt = "Shot on" + en_part.strip()
-        else:
-            korean = block.strip()
-            english_prompt = ""
-
-        scenes.append(
-            {
-                "id": int(num),
-                "korean": korean,
-                "prompt_en": english_prompt,
-                "image_b64": None,
-            }
-        )
-    return scenes
+    return parse_script_text(text)
+
+
+def parse_script_file(uploaded_file):
+    """업로드된 대본 파일을 통째로 읽지 않고 줄 단위로 파싱. (scenes, issues, 원문) 반환"""
+    return parse_script_upload(uploaded_file)
 
 
 def get_image_params():
     orientation = st.session_state.get("image_orientation", "정사각형 1:1 (1024x1024)")
     quality = st.session_state.get("image_quality", "low")
+    if st.session_state.get("tiered_mode"):
+        # 2단계 모드에서는 일괄 생성이 항상 빠른 초안 품질
+        quality = DRAFT_QUALITY
 
     if orientation.startswith("정사각형"):
         size = "1024x1024"
@@ -206,7 +239,7 @@ def get_image_params():
     return size, quality
 
 
-def build_full_prompt(base_prompt: str) -> str:
+def get_style_wrapper() -> str:
     style_name = st.session_state.get("style_preset", "다큐 + 스틱맨 설명 캐릭터")
     style_wrapper = STYLE_PRESETS.get(style_name, "")
 
@@ -216,95 +249,573 @@ def build_full_prompt(base_prompt: str) -> str:
             "\nThe main character is a recurring simple 2D stickman narrator with a white circular face "
             "and small black-dot eyes, always present somewhere in the scene, explaining or reacting to the situation.\n"
         )
+    return style_wrapper
 
-    if style_wrapper:
-        return style_wrapper + "\nScene:\n" + base_prompt
-    else:
-        return base_prompt
-
-
-def generate_image(prompt: str):
-    if not prompt:
-        return None
-
-    size, quality = get_image_params()
-    full_prompt = build_full_prompt(prompt)
 
+def build_image_request(prompt: str, quality: str | None = None) -> ImageRequest:
+    """session_state 는 여기(스크립트 스레드)에서만 읽는다. quality 를 주면 설정 대신 사용."""
+    size, default_quality = get_image_params()
+    quality = quality or default_quality
     image_model_label = st.session_state.get("image_model_label", "OpenAI gpt-image-1")
     model = IMAGE_MODELS.get(image_model_label, "gpt-image-1")
 
-    resp = client.images.generate(
+    return ImageRequest(
+        prompt=prompt or "",
+        style_wrapper=get_style_wrapper(),
         model=model,
-        prompt=full_prompt,
         size=size,
         quality=quality,
-        n=1,
     )
-    return resp.data[0].b64_json
 
 
-def bulk_generate_images(scenes, max_workers: int = 4):
-    def _task(idx):
-        prompt = scenes[idx]["prompt_en"]
-        b64 = generate_image(prompt)
-        return idx, b64
+def carry_over_images(old_scenes, new_scenes) -> list[int]:
+    """
+    수정된 대본(new_scenes)을 기존 장면과 비교해, 요청 키(정규화된 프롬프트 + 이미지 설정)가
+    같은 장면은 기존 이미지를 그대로 가져온다. 새로 생성해야 하는 장면 인덱스만 반환.
+    """
+    existing = {
+        s["image_key"]: s
+        for s in old_scenes
+        if s.get("image_key") and image_store.exists(s.get("image_id"))
+    }
 
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futures = [ex.submit(_task, i) for i in range(len(scenes))]
-        for fut in as_completed(futures):
-            idx, b64 = fut.result()
-            scenes[idx]["image_b64"] = b64
+    todo = []
+    for i, scene in enumerate(new_scenes):
+        key = build_image_request(scene["prompt_en"]).cache_key
+        if key in existing:
+            old = existing[key]
+            scene["image_id"] = old["image_id"]
+            scene["image_key"] = key
+            scene["status"] = bulk_jobs.STATUS_DONE
+            # 초안이 같으면 승인 여부와 최종본도 그대로 이어받는다
+            for field in ("approved", "final_image_id", "final_key"):
+                if old.get(field):
+                    scene[field] = old[field]
+        else:
+            todo.append(i)
+    return todo
+
+
+def best_image_id(scene: dict) -> str | None:
+    """최종(고품질)본이 있으면 그것을, 없으면 초안을 사용."""
+    final_id = scene.get("final_image_id")
+    if image_store.exists(final_id):
+        return final_id
+    return scene.get("image_id")
+
+
+def set_current_job(job_id: str):
+    """현재 작업을 세션과 주소(?job=)에 함께 기록. 새로고침/재접속 시 이 id 로만 복원한다."""
+    st.session_state["bulk_job_id"] = job_id
+    st.query_params["job"] = job_id
+
+
+def save_current_job():
+    job = bulk_jobs.load_job(st.session_state.get("bulk_job_id"))
+    if job and len(job["scenes"]) == len(st.session_state["scenes"]):
+        job["scenes"] = st.session_state["scenes"]
+        bulk_jobs.save_job(job)
+
+
+def start_final_upgrade(scenes) -> int:
+    """
+    승인된 장면 중 최종본이 없는 것을 고품질로 다시 생성하는 배치를 백그라운드로 시작.
+    캐시에 있는 것은 바로 반영하고, 백그라운드로 보낸 요청 수를 반환.
+    """
+    groups = {}
+    requests = {}
+    # 업그레이드 대상이 된 순간의 (초안 image_id, 프롬프트). 결과가 올 때 행이 그대로인지 확인용
+    snapshots = {}
+    for i, scene in enumerate(scenes):
+        if not scene.get("approved") or not scene.get("prompt_en"):
+            continue
+        request = build_image_request(scene["prompt_en"], quality=FINAL_QUALITY)
+        if scene.get("final_key") == request.cache_key and image_store.exists(scene.get("final_image_id")):
+            continue
+        cached_id = image_cache.lookup(request.cache_key)
+        if cached_id:
+            scene["final_image_id"] = cached_id
+            scene["final_key"] = request.cache_key
+            continue
+        groups.setdefault(request.cache_key, []).append(i)
+        requests[request.cache_key] = request
+        snapshots[i] = (scene.get("image_id"), scene["prompt_en"])
+
+    if groups:
+        batch = BackgroundBatch(
+            list(requests.items()),
+            partial(run_image_request_cached, api_key=GPT_API_KEY),
+            controller=AimdController(initial=BULK_INITIAL_CONCURRENCY, maximum=BULK_MAX_CONCURRENCY),
+            max_attempts=BULK_MAX_ATTEMPTS,
+        )
+        st.session_state["final_upgrade"] = {"batch": batch, "groups": groups, "snapshots": snapshots}
+    save_current_job()
+    return len(groups)
+
+
+def merge_final_upgrade(scenes):
+    """백그라운드 업그레이드에서 끝난 결과를 장면에 반영 (스크립트 스레드에서만 호출)."""
+    upgrade = st.session_state.get("final_upgrade")
+    if not upgrade:
+        return
+
+    # finished 를 먼저 읽어야 마지막 결과를 놓치지 않는다
+    finished = upgrade["batch"].finished
+    results = upgrade["batch"].drain()
+    for key, (image_id, err) in results.items():
+        for idx in upgrade["groups"].get(key, []):
+            if idx >= len(scenes):
+                continue
+            # 그 사이 재생성/대본 수정으로 행이 바뀌었으면 (또는 승인이 풀렸으면) 오래된 결과는 버린다
+            scene = scenes[idx]
+            if not scene.get("approved") or (scene.get("image_id"), scene.get("prompt_en")) != upgrade["snapshots"].get(idx):
+                continue
+            if err is None and image_id:
+                scenes[idx]["final_image_id"] = image_id
+                scenes[idx]["final_key"] = key
+                scenes[idx]["final_error"] = None
+            else:
+                scenes[idx]["final_error"] = f"{type(err).__name__}: {err}"[:300]
+    if results:
+        save_current_job()
+    if finished:
+        st.session_state["final_upgrade"] = None
+
+
+def queue_regeneration(scenes, idx: int):
+    """
+    행 재생성을 공유 작업 풀에 넣고 바로 돌아온다 (여러 행을 동시에 진행).
+    항상 새 변형을 만들고, 결과는 캐시에도 등록된다.
+    """
+    request = build_image_request(scenes[idx]["prompt_en"])
+    future = get_shared_pool().submit(
+        call_with_retry,
+        partial(run_image_request_cached, api_key=GPT_API_KEY),
+        request,
+        BULK_MAX_ATTEMPTS,
+    )
+    st.session_state["regen_jobs"][idx] = {
+        "future": future,
+        "key": request.cache_key,
+        "prompt": scenes[idx]["prompt_en"],
+    }
+    st.session_state["regen_done"].discard(idx)
+
+
+def merge_regenerations(scenes):
+    """끝난 행 재생성 결과를 장면에 반영 (스크립트 스레드에서만 호출)."""
+    jobs = st.session_state["regen_jobs"]
+    landed = [idx for idx, entry in jobs.items() if entry["future"].done()]
+    for idx in landed:
+        entry = jobs.pop(idx)
+        # 그 사이 대본이 바뀌었으면 결과는 캐시에만 남기고 버린다
+        if idx >= len(scenes) or scenes[idx]["prompt_en"] != entry["prompt"]:
+            continue
+        scene = scenes[idx]
+        try:
+            image_id = entry["future"].result()
+        except Exception as e:
+            scene["status"] = bulk_jobs.STATUS_FAILED
+            scene["error"] = f"{type(e).__name__}: {e}"[:300]
+            continue
+
+        scene["image_id"] = image_id
+        scene["image_key"] = entry["key"]
+        scene["status"] = bulk_jobs.STATUS_DONE
+        scene["error"] = None
+        # 새 초안은 다시 검토해야 하므로 승인/최종본 초기화
+        for field in ("approved", "final_image_id", "final_key", "final_error"):
+            scene.pop(field, None)
+        st.session_state.pop(f"approve_{scene['id']}", None)
+        st.session_state["regen_done"].add(idx)
+    if landed:
+        save_current_job()
+
+
+def bulk_generate_images(
+    scenes,
+    on_progress=None,
+    force_new: bool = False,
+    only=None,
+    job=None,
+    on_scene_done=None,
+):
+    """
+    장면별로 독립 재시도하며 병렬 생성. 완료되는 즉시 scenes 에 반영하므로
+    일부가 실패해도 이미 만들어진 이미지는 그대로 남는다.
+
+    워커에는 불변 ImageRequest 만 넘기므로 워커 스레드는 st.session_state 를 건드리지 않는다.
+    같은 요청은 배치 안에서 한 번만 보내고(중복 제거), 캐시에 있으면 아예 보내지 않는다.
+    only 에 인덱스 목록을 주면 그 장면들만 처리한다.
+    job(매니페스트)을 주면 장면이 끝날 때마다 체크포인트로 저장한다.
+    on_scene_done(idx) 는 장면 하나가 (성공/실패 상관없이) 확정될 때마다 호출된다.
+
+    (실패한 장면 id 리스트, 통계 dict) 반환.
+    """
+    controller = AimdController(
+        initial=BULK_INITIAL_CONCURRENCY,
+        maximum=BULK_MAX_CONCURRENCY,
+    )
+
+    # cache_key → 같은 요청을 공유하는 장면 인덱스들
+    groups = {}
+    requests = {}
+    targets = range(len(scenes)) if only is None else only
+    for i in targets:
+        request = build_image_request(scenes[i]["prompt_en"])
+        if not request.prompt:
+            continue
+        groups.setdefault(request.cache_key, []).append(i)
+        requests[request.cache_key] = request
+
+    stats = {"scenes": sum(len(v) for v in groups.values()), "cache_hits": 0, "deduped": 0, "api_calls": 0}
+    items = []
+    for key, idxs in groups.items():
+        stats["deduped"] += len(idxs) - 1
+        cached_id = None if force_new else image_cache.lookup(key)
+        if cached_id:
+            stats["cache_hits"] += 1
+            for idx in idxs:
+                scenes[idx]["image_id"] = cached_id
+                scenes[idx]["image_key"] = key
+                scenes[idx]["status"] = bulk_jobs.STATUS_DONE
+                scenes[idx]["error"] = None
+                if on_scene_done:
+                    on_scene_done(idx)
+            continue
+        items.append((key, requests[key]))
+
+    if job is not None:
+        bulk_jobs.save_job(job)
+
+    task = partial(run_image_request_cached, api_key=GPT_API_KEY)
+    failed = []
+
+    done_count = 0
+    for key, image_id, err, attempts in iter_scheduled(
+        items, task, controller=controller, max_attempts=BULK_MAX_ATTEMPTS
+    ):
+        done_count += 1
+        stats["api_calls"] += attempts
+        for idx in groups[key]:
+            if err is None:
+                scenes[idx]["image_id"] = image_id
+                scenes[idx]["image_key"] = key
+                scenes[idx]["status"] = bulk_jobs.STATUS_DONE
+                scenes[idx]["error"] = None
+            else:
+                scenes[idx]["status"] = bulk_jobs.STATUS_FAILED
+                scenes[idx]["error"] = f"{type(err).__name__}: {err}"[:300]
+                failed.append(scenes[idx]["id"])
+            if on_scene_done:
+                on_scene_done(idx)
+
+        if job is not None:
+            bulk_jobs.save_job(job)
+
+        if on_progress:
+            on_progress(done_count, len(items), controller.limit)
+
+    return failed, stats
+
+
+def show_video(path: str, file_name: str):
+    """
+    기본은 미디어 서버 URL 로 재생/다운로드 (Range 요청 지원, 세션 메모리 사용 없음).
+    브라우저가 미디어 서버에 닿을 수 없을 때만 Streamlit 미디어 엔드포인트로 재생하고,
+    다운로드 파일은 버튼을 눌렀을 때 한 번만 읽는다 (매 rerun 마다 MP4 전체를 올리지 않도록).
+    """
+    host = st.context.headers.get("Host")
+    url = media_store.media_url(path, request_host=host)
+    if url:
+        st.video(url)
+        st.link_button("📥 영상 다운로드 (MP4)", media_store.media_url(path, download=True, request_host=host))
+        return
+
+    st.video(path)
+    if st.button("📥 영상 다운로드 준비 (MP4)", key=f"prepare_{file_name}"):
+        with open(path, "rb") as f:
+            st.download_button(label="📥 영상 다운로드 (MP4)", data=f, file_name=file_name, mime="video/mp4")
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def render_contact_sheet(entries: tuple, columns: int) -> bytes:
+    """
+    콘택트 시트 PNG. image_id 가 내용 해시라서 (번호, 문장, image_id) 묶음이 같으면 결과도 같다.
+    다른 위젯 때문에 다시 실행될 때마다 새로 그리지 않도록 캐시한다.
+    """
+    sheet = contact_sheet.build_contact_sheet(list(entries), columns=columns)
+    return contact_sheet.to_png_bytes(sheet)
+
+
+def parse_size(size: str) -> tuple[int, int]:
+    w, h = size.split("x")
+    return int(w), int(h)
+
+
+def get_video_canvas() -> tuple[tuple[int, int], str]:
+    """영상 캔버스 = 현재 이미지 비율 설정. (캔버스 크기, 맞춤 모드) 반환"""
+    size, _ = get_image_params()
+    fit_label = st.session_state.get("video_fit_mode", "레터박스 (전체 보이기)")
+    return parse_size(size), VIDEO_FIT_MODES.get(fit_label, FIT_LETTERBOX)
+
+
+def get_transition_mode() -> str:
+    label = st.session_state.get("video_transition", "없음 (정지 이미지)")
+    return TRANSITION_MODES.get(label, TRANSITION_NONE)
+
+
+def encode_scenes(image_paths, durations, output_path: str, fps: int, transition: str):
+    """전환 효과가 없으면 concat demuxer, 있으면 전환 엔진(프레임 계산 → ffmpeg 파이프)."""
+    if transition == TRANSITION_NONE:
+        encode_slideshow(image_paths, durations, output_path, fps=fps)
+    else:
+        render_slideshow(image_paths, durations, output_path, fps=fps, mode=transition)
+
+
+def start_scene_narration(executor, scenes, indices, voice: str) -> dict:
+    """장면별 한국어 문장 TTS 를 executor 에 던져두고 {idx: Future} 반환."""
+    futures = {}
+    for i in indices:
+        text = (scenes[i].get("korean") or "").strip()
+        if text:
+            futures[i] = executor.submit(synthesize, TtsRequest(text=text, voice=voice), GPT_API_KEY)
+    return futures
+
+
+def finish_scene_narration(scenes, futures: dict):
+    """TTS 결과를 장면에 기록 (스크립트 스레드에서 호출)."""
+    for i, fut in futures.items():
+        try:
+            audio_id, seconds = fut.result()
+        except Exception as e:
+            scenes[i]["audio_id"] = None
+            scenes[i]["audio_seconds"] = None
+            scenes[i]["audio_error"] = f"{type(e).__name__}: {e}"[:300]
+            continue
+        scenes[i]["audio_id"] = audio_id
+        scenes[i]["audio_seconds"] = seconds
+        scenes[i]["audio_error"] = None
 
 
-def b64_to_bytes(b64_str: str):
-    return base64.b64decode(b64_str)
+def attach_narration(silent_path: str, audio_ids, durations, output_path: str):
+    with tempfile.TemporaryDirectory(prefix="narration_") as tmp_dir:
+        wav_path = os.path.join(tmp_dir, "narration.wav")
+        build_narration_track(audio_ids, durations, wav_path)
+        mux_audio(silent_path, wav_path, output_path, profile=profile_for(sum(durations)))
 
 
 def create_video_from_scenes(
     scenes,
     seconds_per_scene: float,
     fps: int = 30,
-) -> tuple[bytes | None, str | None]:
+    narration_voice: str | None = None,
+    transition: str = TRANSITION_NONE,
+) -> tuple[str | None, str | None]:
     """
-    성공 시 (video_bytes, None)
+    성공 시 (미디어 디렉터리의 MP4 경로, None)
     실패 시 (None, 에러메시지)
-    """
-    if imageio is None:
-        return None, "IMAGEIO_MISSING"
 
-    images = []
-    for scene in scenes:
-        if not scene.get("image_b64"):
-            continue
-        img_bytes = b64_to_bytes(scene["image_b64"])
-        img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-        images.append(img)
+    장면 이미지는 저장소의 원본 PNG 를 그대로 입력으로 쓰고,
+    장면 길이만큼의 프레임 복제는 ffmpeg concat demuxer 가 처리한다.
+    narration_voice 를 주면 장면별 TTS 를 병렬로 만들고, 장면 길이를 음성 길이에 맞춘 뒤 오디오를 합친다.
+    (일괄 생성 때 이미지와 함께 만들어 둔 음성은 synthesize 가 디스크에서 바로 돌려준다)
+    transition 이 있으면 장면 사이 크로스페이드 / 켄 번즈 줌을 넣는다 (장면 길이 합은 그대로).
+    """
+    if get_ffmpeg_exe() is None:
+        return None, "FFMPEG_MISSING"
 
-    if not images:
+    targets = [i for i, s in enumerate(scenes) if image_store.exists(best_image_id(s))]
+    if not targets:
         return None, "NO_IMAGES"
 
-    frames_per_scene = max(1, int(seconds_per_scene * fps))
-    output_path = "bulkking_output.mp4"
-
+    # 비율이 섞여 있어도 인코더에는 같은 크기의 프레임만 들어가도록 한 번씩 정규화
+    canvas, fit_mode = get_video_canvas()
     try:
-        writer = imageio.get_writer(output_path, fps=fps)  # imageio-ffmpeg 필요
+        image_paths = normalize_many([best_image_id(scenes[i]) for i in targets], canvas, fit_mode)
     except Exception as e:
-        return None, f"WRITER_ERROR: {e}"
+        return None, f"NORMALIZE_ERROR: {e}"
+    output_path = media_store.new_media_path("bulkking")
+
+    if narration_voice:
+        try:
+            with ThreadPoolExecutor(max_workers=NARRATION_WORKERS) as ex:
+                futures = start_scene_narration(ex, scenes, targets, narration_voice)
+            finish_scene_narration(scenes, futures)
+        except Exception as e:
+            return None, f"TTS_ERROR: {e}"
+        durations = [scene_duration(scenes[i].get("audio_seconds"), seconds_per_scene) for i in targets]
+    else:
+        durations = [float(seconds_per_scene)] * len(image_paths)
 
     try:
-        for img in images:
-            frame = np.asarray(img)   # ← 여기 수정 (imageio.asarray → numpy.asarray)
-            for _ in range(frames_per_scene):
-                writer.append_data(frame)
-        writer.close()
+        if narration_voice:
+            with tempfile.TemporaryDirectory(prefix="bulkking_") as tmp_dir:
+                silent_path = os.path.join(tmp_dir, "silent.mp4")
+                encode_scenes(image_paths, durations, silent_path, fps, transition)
+                attach_narration(
+                    silent_path,
+                    [scenes[i].get("audio_id") for i in targets],
+                    durations,
+                    output_path,
+                )
+        else:
+            encode_scenes(image_paths, durations, output_path, fps, transition)
     except Exception as e:
-        return None, f"WRITE_FRAME_ERROR: {e}"
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return None, f"ENCODE_ERROR: {e}"
+
+    media_store.prune("bulkking")
+    return output_path, None
+
+
+
+
+def run_bulk_generation(scenes, todo, force_new: bool, job, reused: int = 0):
+    """
+    진행률 표시 + 생성 + 결과 요약 (새 생성과 이어하기 공통).
+    파이프라인 모드면 장면이 순서대로 준비되는 즉시 영상 세그먼트 인코딩을 시작한다.
+    내레이션이 켜져 있으면 (두 모드 모두) TTS 를 이 실행 전용 풀에서 이미지 생성과 동시에 돌린다.
+    (공유 풀은 모든 세션의 재 생성 대기열이 쓰므로 긴 대본의 TTS 로 막지 않는다)
+    기본 모드에서는 결과를 장면에 기록해 두고, 나중에 영상을 만들 때 디스크의 음성을 그대로 쓴다.
+    """
+    seconds_per_scene = float(st.session_state.get("seconds_per_scene", 3.0))
+    narration_voice = (
+        st.session_state.get("narration_voice", "alloy")
+        if st.session_state.get("narration_enabled")
+        else None
+    )
+
+    pipeline = None
+    norm_pool = None
+    silent_path = None
+    tts_pool = None
+    tts_futures = {}
+    if narration_voice:
+        tts_pool = ThreadPoolExecutor(max_workers=NARRATION_WORKERS, thread_name_prefix="bulkking-tts")
+        tts_futures = start_scene_narration(tts_pool, scenes, range(len(scenes)), narration_voice)
+    # 전환 효과는 앞뒤 장면이 모두 있어야 계산되므로 파이프라인은 정지 이미지일 때만
+    use_pipeline = st.session_state.get("pipeline_video") and get_transition_mode() == TRANSITION_NONE
+    if use_pipeline and get_ffmpeg_exe() is not None:
+        canvas, fit_mode = get_video_canvas()
+        output_path = media_store.new_media_path("bulkking")
+        if narration_voice:
+            fd, silent_path = tempfile.mkstemp(prefix="bulkking_silent_", suffix=".mp4")
+            os.close(fd)
+        else:
+            silent_path = output_path
+        pipeline = PipelinedSlideshow(silent_path, canvas, fps=30)
+        norm_pool = make_pool()
+
+    def _submit_scene(idx):
+        if pipeline is None:
+            return
+        image_id = best_image_id(scenes[idx])
+        # 프레임 정규화는 프로세스 풀에서, 인코더 스레드가 Future 결과를 받아 사용
+        path = norm_pool.submit(normalize_image, image_id, canvas, fit_mode) if image_store.exists(image_id) else None
+        duration = SceneDuration(tts_futures.get(idx), seconds_per_scene) if narration_voice else seconds_per_scene
+        pipeline.submit(idx, path, duration)
+
+    # 이번에 생성하지 않는 장면(재사용/프롬프트 없음)은 바로 인코더로
+    todo_set = set(todo)
+    for i, scene in enumerate(scenes):
+        if i not in todo_set or not scene.get("prompt_en"):
+            _submit_scene(i)
+
+    progress = st.progress(0.0, text="이미지를 벌크로 생성 중입니다...")
+
+    def _on_progress(done, total, limit):
+        encoded = f" · 영상 인코딩 {pipeline.encoded_count()}/{len(scenes)}" if pipeline else ""
+        progress.progress(
+            done / total,
+            text=f"이미지 생성 중... {done}/{total} (동시 요청 {limit}){encoded}",
+        )
 
     try:
-        with open(output_path, "rb") as f:
-            return f.read(), None
-    except Exception as e:
-        return None, f"FILE_READ_ERROR: {e}"
+        failed_ids, gen_stats = bulk_generate_images(
+            scenes,
+            on_progress=_on_progress,
+            force_new=force_new,
+            only=todo,
+            job=job,
+            on_scene_done=_submit_scene,
+        )
+    except BaseException:
+        if pipeline is not None:
+            pipeline.cancel()
+            norm_pool.shutdown(wait=False, cancel_futures=True)
+        if tts_pool is not None:
+            tts_pool.shutdown(wait=False, cancel_futures=True)
+        if silent_path and silent_path != output_path and os.path.exists(silent_path):
+            os.remove(silent_path)
+        raise
+    progress.empty()
+    if tts_pool is not None:
+        # 더 넣을 작업은 없다. 남은 TTS 는 끝까지 돌고 스레드는 그 뒤 정리된다
+        tts_pool.shutdown(wait=False)
+
+    if narration_voice and pipeline is None:
+        # 이미지와 동시에 돌던 TTS 결과를 장면에 기록 (영상 만들기에서 다시 합성하지 않음)
+        with st.spinner("내레이션 음성을 마무리하는 중입니다..."):
+            finish_scene_narration(scenes, tts_futures)
+        if job is not None:
+            bulk_jobs.save_job(job)
+
+    st.caption(
+        f"장면 {len(scenes)}개 · 변경 없음(재사용) {reused} · 캐시 적중 {gen_stats['cache_hits']} · "
+        f"배치 내 중복 {gen_stats['deduped']} · API 호출 {gen_stats['api_calls']}"
+    )
+
+    if failed_ids:
+        st.warning(
+            f"⚠️ {len(failed_ids)}개 장면 생성에 실패했습니다: "
+            + ", ".join(str(x) for x in failed_ids)
+            + "\n\n**이어서 생성** 또는 해당 행의 **재 생성** 버튼으로 다시 시도해주세요."
+        )
+    else:
+        st.success("✅ 대본이 자동으로 분류되고 이미지가 생성되었습니다.")
+    st.session_state["video_path"] = None
+    st.session_state["video_error_msg"] = None
+
+    if pipeline is not None:
+        with st.spinner("남은 영상 세그먼트를 이어붙이는 중입니다..."):
+            try:
+                try:
+                    pipeline.finish(len(scenes))
+                finally:
+                    norm_pool.shutdown(wait=False)
+                if narration_voice:
+                    finish_scene_narration(scenes, tts_futures)
+                    encoded = sorted(pipeline.durations)
+                    try:
+                        attach_narration(
+                            silent_path,
+                            [scenes[i].get("audio_id") for i in encoded],
+                            [pipeline.durations[i] for i in encoded],
+                            output_path,
+                        )
+                    finally:
+                        os.remove(silent_path)
+                media_store.prune("bulkking")
+                st.session_state["video_path"] = output_path
+                st.success("🎬 영상도 함께 생성되었습니다.")
+            except Exception as e:
+                st.session_state["video_error_msg"] = f"파이프라인 영상 생성 중 오류가 발생했습니다.\n\n내부 오류 메시지: {e}"
+
+
+# =========================
+# 이전 작업 복원 (새 세션 / 브라우저 재접속)
+# =========================
+#   이 브라우저 주소(?job=...)에 기록된 작업만 복원한다. 다른 사용자의 최근 작업은 절대 불러오지 않음
+if not st.session_state["bulk_job_restored"]:
+    st.session_state["bulk_job_restored"] = True
+    if not st.session_state["scenes"]:
+        restored = bulk_jobs.load_job(st.query_params.get("job"))
+        if restored:
+            st.session_state["bulk_job_id"] = restored["job_id"]
+            st.session_state["scenes"] = restored["scenes"]
+            st.session_state["raw_script"] = restored.get("raw_script", "")
 
 # =========================
 # 사이드바
@@ -347,11 +858,32 @@ with st.sidebar:
             ),
         )
 
+        st.session_state["tiered_mode"] = st.checkbox(
+            "초안(low) → 승인 장면만 최종(high)",
+            value=st.session_state.get("tiered_mode", False),
+            help="모든 장면을 먼저 low 품질로 빠르게 만들어 검토하고, 승인한 장면만 백그라운드에서 high 로 다시 생성합니다. "
+            "영상은 장면마다 가장 좋은 품질의 이미지를 사용합니다.",
+        )
+
         st.session_state["image_quality"] = st.radio(
             "품질",
             ["low", "high"],
             index=["low", "high"].index(st.session_state.get("image_quality", "low")),
             horizontal=True,
+            disabled=st.session_state["tiered_mode"],
+        )
+
+        st.session_state["force_new_variant"] = st.checkbox(
+            "캐시 무시하고 새 변형 생성",
+            value=st.session_state.get("force_new_variant", False),
+            help="같은 프롬프트·모델·크기·품질로 만든 이미지가 있어도 다시 생성합니다.",
+        )
+
+        cache_stats = image_cache.get_stats()
+        st.caption(
+            f"이미지 캐시: {cache_stats['entries']}개 · "
+            f"누적 적중률 {cache_stats['hit_rate'] * 100:.0f}% "
+            f"({cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']})"
         )
 
     # === 영상 생성 옵션: disclosure 그룹 ===
@@ -372,6 +904,47 @@ with st.sidebar:
             step=0.5,
         )
 
+        fit_labels = list(VIDEO_FIT_MODES.keys())
+        st.session_state["video_fit_mode"] = st.radio(
+            "크기가 다른 장면 맞춤 방식",
+            fit_labels,
+            index=fit_labels.index(st.session_state.get("video_fit_mode", fit_labels[0]))
+            if st.session_state.get("video_fit_mode") in fit_labels
+            else 0,
+            help="영상 캔버스는 현재 이미지 비율 설정을 따릅니다.",
+        )
+
+        transition_labels = list(TRANSITION_MODES.keys())
+        st.session_state["video_transition"] = st.selectbox(
+            "장면 전환 효과",
+            transition_labels,
+            index=transition_labels.index(st.session_state.get("video_transition", transition_labels[0]))
+            if st.session_state.get("video_transition") in transition_labels
+            else 0,
+            help="켄 번즈는 프레임마다 계산이 필요해 정지 이미지보다 인코딩이 느립니다.",
+        )
+
+        st.session_state["pipeline_video"] = st.checkbox(
+            "이미지 생성과 동시에 영상 인코딩 (파이프라인)",
+            value=st.session_state.get("pipeline_video", False),
+            help="장면이 순서대로 준비되는 즉시 인코딩해서, 마지막 이미지가 나오면 곧바로 MP4 가 완성됩니다. "
+            "(장면 전환 효과를 쓰면 적용되지 않습니다)",
+        )
+
+        st.session_state["narration_enabled"] = st.checkbox(
+            "장면별 한국어 내레이션(TTS) 추가",
+            value=st.session_state.get("narration_enabled", False),
+            help="각 장면의 한국어 문장을 음성으로 만들고, 장면 길이를 음성 길이에 맞춥니다.",
+        )
+        if st.session_state["narration_enabled"]:
+            st.session_state["narration_voice"] = st.selectbox(
+                "🎙 TTS 목소리",
+                VOICE_OPTIONS,
+                index=VOICE_OPTIONS.index(st.session_state.get("narration_voice", "alloy"))
+                if st.session_state.get("narration_voice", "alloy") in VOICE_OPTIONS
+                else 0,
+            )
+
 # =========================
 # 메인 UI
 # =========================
@@ -399,6 +972,32 @@ raw_text = st.text_area(
     placeholder="1\n한국어 문장… Shot on ...\n\n2\n한국어 문장… Shot on ...",
 )
 
+uploaded_script = st.file_uploader(
+    "또는 대본 파일(.txt) 업로드",
+    type=["txt"],
+    help="업로드한 파일이 있으면 위 입력창 대신 파일 내용을 사용합니다.",
+)
+
+with st.expander("📂 프로젝트 번들(ZIP) 불러오기"):
+    uploaded_bundle = st.file_uploader(
+        "내보낸 프로젝트 ZIP",
+        type=["zip"],
+        help="번들 안의 이미지와 대본으로 프로젝트를 복원합니다. API 는 호출하지 않습니다.",
+    )
+    if uploaded_bundle is not None and st.button("불러오기", use_container_width=True):
+        try:
+            job = project_bundle.import_bundle(uploaded_bundle)
+        except Exception as e:
+            st.error(f"번들을 불러오지 못했습니다: {e}")
+        else:
+            set_current_job(job["job_id"])
+            st.session_state["scenes"] = job["scenes"]
+            st.session_state["raw_script"] = job.get("raw_script", "")
+            st.session_state["final_upgrade"] = None
+            st.session_state["regen_jobs"] = {}
+            st.session_state["regen_done"] = set()
+            st.rerun()
+
 col_btn1, col_btn2 = st.columns(2)
 with col_btn1:
     clicked_generate = st.button("이미지 생성", type="primary", use_container_width=True)
@@ -409,22 +1008,67 @@ with col_btn2:
 # 이미지 생성 버튼 동작
 # =========================
 if clicked_generate:
-    if not raw_text.strip():
+    if uploaded_script is None and not raw_text.strip():
         st.warning("대본을 먼저 입력해주세요.")
     else:
-        scenes = parse_script(raw_text)
+        if uploaded_script is not None:
+            scenes, parse_issues, raw_text = parse_script_file(uploaded_script)
+        else:
+            scenes, parse_issues = parse_script(raw_text)
+
+        if parse_issues:
+            with st.expander(f"⚠️ 대본 형식 확인 필요 ({len(parse_issues)}건)", expanded=not scenes):
+                for issue in parse_issues[:200]:
+                    st.markdown(f"- {issue.line_no}번째 줄: {issue.message}")
+                if len(parse_issues) > 200:
+                    st.caption(f"... 외 {len(parse_issues) - 200}건")
+
         if not scenes:
             st.error("대본 형식을 인식하지 못했습니다. 번호와 문장 형식을 다시 확인해주세요.")
         else:
+            force_new = st.session_state.get("force_new_variant", False)
+
+            # 바뀌지 않은 장면은 기존 이미지 재사용 → 바뀐/추가된 장면만 생성
+            if force_new:
+                todo = list(range(len(scenes)))
+            else:
+                todo = carry_over_images(st.session_state.get("scenes", []), scenes)
+            reused = len(scenes) - len(todo)
+
             st.session_state["raw_script"] = raw_text
             st.session_state["scenes"] = scenes
+            # 진행 중이던 업그레이드/재생성 결과는 캐시에만 남고, 새 장면 목록에는 반영하지 않는다
+            st.session_state["final_upgrade"] = None
+            st.session_state["regen_jobs"] = {}
+            st.session_state["regen_done"] = set()
+            job = bulk_jobs.new_job(raw_text, scenes)
+            set_current_job(job["job_id"])
+            run_bulk_generation(scenes, todo, force_new, job, reused=reused)
 
-            with st.spinner("이미지를 벌크로 생성 중입니다..."):
-                bulk_generate_images(st.session_state["scenes"], max_workers=4)
-
-            st.success("✅ 대본이 자동으로 분류되고 이미지가 생성되었습니다.")
-            st.session_state["video_bytes"] = None
-            st.session_state["video_error_msg"] = None
+# =========================
+# 중단된 작업 이어하기
+# =========================
+current_job = bulk_jobs.load_job(st.session_state.get("bulk_job_id"))
+if current_job and not clicked_generate:
+    remaining = bulk_jobs.remaining_indices(current_job)
+    if remaining:
+        summary = bulk_jobs.job_summary(current_job)
+        col_info, col_resume = st.columns([3, 1])
+        col_info.info(
+            f"⏸ 완료되지 않은 작업이 있습니다: 완료 {summary['done']}/{summary['total']}, "
+            f"실패 {summary['failed']}, 남은 장면 {len(remaining)}개"
+        )
+        if col_resume.button("⏯ 이어서 생성", use_container_width=True):
+            # 세션의 장면 리스트와 매니페스트를 같은 객체로 맞춘 뒤 남은 장면만 생성
+            st.session_state["scenes"] = current_job["scenes"]
+            st.session_state["raw_script"] = current_job.get("raw_script", "")
+            run_bulk_generation(
+                current_job["scenes"],
+                remaining,
+                force_new=False,
+                job=current_job,
+                reused=len(current_job["scenes"]) - len(remaining),
+            )
 
 scenes = st.session_state.get("scenes", [])
 
@@ -432,32 +1076,39 @@ scenes = st.session_state.get("scenes", [])
 # 영상 생성 버튼 동작
 # =========================
 if clicked_video:
-    if not scenes or not any(s.get("image_b64") for s in scenes):
+    if not scenes or not any(image_store.exists(best_image_id(s)) for s in scenes):
         st.warning("먼저 이미지를 생성한 후에 영상을 만들 수 있습니다.")
     else:
-        if imageio is None:
+        if get_ffmpeg_exe() is None:
             st.session_state["video_error_msg"] = (
-                "`imageio` 모듈이 없습니다. requirements.txt 에 `imageio` 와 `imageio-ffmpeg` 를 추가한 뒤 다시 배포해주세요."
+                "ffmpeg 을 찾을 수 없습니다. requirements.txt 에 `imageio-ffmpeg` 를 추가한 뒤 다시 배포해주세요."
             )
-            st.session_state["video_bytes"] = None
+            st.session_state["video_path"] = None
         else:
             video_model_label = st.session_state.get("video_model_label", "이미지 시퀀스 → MP4 (로컬 합성)")
             video_model = VIDEO_MODELS.get(video_model_label, "local_sequence_mp4")
 
             if video_model == "local_sequence_mp4":
                 seconds_per_scene = float(st.session_state.get("seconds_per_scene", 3.0))
+                narration_voice = (
+                    st.session_state.get("narration_voice", "alloy")
+                    if st.session_state.get("narration_enabled")
+                    else None
+                )
                 with st.spinner("영상을 생성하는 중입니다..."):
-                    video_bytes, err_msg = create_video_from_scenes(
+                    video_path, err_msg = create_video_from_scenes(
                         scenes,
                         seconds_per_scene=seconds_per_scene,
                         fps=30,
+                        narration_voice=narration_voice,
+                        transition=get_transition_mode(),
                     )
-                if video_bytes:
-                    st.session_state["video_bytes"] = video_bytes
+                if video_path:
+                    st.session_state["video_path"] = video_path
                     st.session_state["video_error_msg"] = None
                     st.success("🎬 영상이 생성되었습니다.")
                 else:
-                    st.session_state["video_bytes"] = None
+                    st.session_state["video_path"] = None
                     st.session_state["video_error_msg"] = (
                         "영상 생성 중 오류가 발생했습니다.\n\n"
                         "대부분은 `imageio-ffmpeg` 가 설치되지 않았거나 ffmpeg 플러그인을 찾지 못해서 생기는 문제입니다.\n"
@@ -466,72 +1117,204 @@ if clicked_video:
                     )
             else:
                 st.session_state["video_error_msg"] = "아직 구현되지 않은 영상 생성 모델입니다."
-                st.session_state["video_bytes"] = None
+                st.session_state["video_path"] = None
 
 # ==========================
 # 결과 테이블 (스크롤 컨테이너)
 # =========================
+@st.fragment(run_every=2)
+def final_upgrade_status():
+    """백그라운드 업그레이드 진행률. 끝나면 전체 rerun 으로 결과를 표에 반영."""
+    upgrade = st.session_state.get("final_upgrade")
+    if not upgrade:
+        return
+    done, total = upgrade["batch"].progress()
+    st.progress(done / total if total else 1.0, text=f"⬆️ 최종(high) 업그레이드 중... {done}/{total}")
+    if upgrade["batch"].finished:
+        st.rerun()
+
+
+@st.fragment(run_every=1)
+def regeneration_status():
+    """재생성 대기열 진행 상황. 결과가 하나라도 도착하면 전체 rerun 으로 표를 갱신."""
+    jobs = st.session_state["regen_jobs"]
+    if not jobs:
+        return
+    if any(entry["future"].done() for entry in jobs.values()):
+        st.rerun()
+    running = sum(1 for entry in jobs.values() if entry["future"].running())
+    st.caption(f"🔄 재생성 진행 중 {running}개 · 대기 {len(jobs) - running}개")
+
+
+merge_final_upgrade(scenes)
+merge_regenerations(scenes)
+
 if scenes:
     st.subheader("문장별 프롬프트 및 이미지")
 
-    with st.container():
-        st.markdown('<div class="results-container">', unsafe_allow_html=True)
-
-        header_cols = st.columns([0.5, 2, 2, 1, 0.9])
-        header_cols[0].markdown("**번호**")
-        header_cols[1].markdown("**원본문장**")
-        header_cols[2].markdown("**생성된 영어 프롬프트**")
-        header_cols[3].markdown("**이미지**")
-        header_cols[4].markdown("**조작**")
-
-        st.markdown("---")
-
-        for i, scene in enumerate(scenes):
-            cols = st.columns([0.5, 2, 2, 1, 0.9])
-
-            cols[0].write(scene["id"])
-
-            korean_html = scene["korean"].replace("\n", "<br>")
-            cols[1].markdown(
-                f'<div class="small-text-cell">{korean_html}</div>',
-                unsafe_allow_html=True,
-            )
-
-            prompt_html = scene["prompt_en"].replace("\n", "<br>")
-            cols[2].markdown(
-                f'<div class="small-text-cell">{prompt_html}</div>',
-                unsafe_allow_html=True,
-            )
+    if st.session_state.get("tiered_mode"):
+        approved = [s for s in scenes if s.get("approved")]
+        finals = sum(1 for s in approved if image_store.exists(s.get("final_image_id")))
+        col_tier, col_upgrade = st.columns([3, 1])
+        col_tier.caption(
+            f"승인 {len(approved)}/{len(scenes)} · 최종(high) 완료 {finals}/{len(approved)} — "
+            "표에서 마음에 드는 초안을 승인한 뒤 업그레이드하세요."
+        )
+        if col_upgrade.button(
+            "⬆️ 승인 장면 업그레이드",
+            use_container_width=True,
+            disabled=bool(st.session_state.get("final_upgrade")) or len(approved) == finals,
+        ):
+            started = start_final_upgrade(scenes)
+            if not started:
+                st.rerun()
+        final_upgrade_status()
 
-            if scene["image_b64"]:
-                img_bytes = b64_to_bytes(scene["image_b64"])
-                cols[3].image(img_bytes, use_column_width=True)
-            else:
-                cols[3].write("아직 이미지 없음")
+    regeneration_status()
 
-            if cols[4].button("재 생성", key=f"regen_{scene['id']}"):
-                with st.spinner(f"{scene['id']}번 이미지를 다시 생성 중..."):
-                    new_b64 = generate_image(scene["prompt_en"])
-                    st.session_state["scenes"][i]["image_b64"] = new_b64
-                st.rerun()
+    view_mode = st.radio(
+        "보기",
+        ["표", "콘택트 시트"],
+        horizontal=True,
+        key="results_view",
+        label_visibility="collapsed",
+    )
 
-        st.markdown("</div>", unsafe_allow_html=True)
+    if view_mode == "콘택트 시트":
+        # 모든 장면을 한 장의 이미지로 (페이지 단위)
+        col_cols, col_per, col_page = st.columns(3)
+        sheet_columns = col_cols.select_slider("열 수", options=[4, 5, 6, 8, 10], value=6)
+        per_page = col_per.select_slider("페이지당 장면 수", options=[24, 48, 96], value=48)
+        pages = contact_sheet.page_count(len(scenes), per_page)
+        page = col_page.number_input("페이지", min_value=1, max_value=pages, value=1, step=1)
+
+        page_scenes = scenes[(page - 1) * per_page: page * per_page]
+        sheet_png = render_contact_sheet(
+            tuple((s["id"], s.get("korean", ""), best_image_id(s)) for s in page_scenes),
+            sheet_columns,
+        )
+        st.image(sheet_png, use_column_width=True)
+        st.download_button(
+            label=f"📥 콘택트 시트 PNG ({page}/{pages} 페이지)",
+            data=sheet_png,
+            file_name=f"bulkking_storyboard_p{page}.png",
+            mime="image/png",
+        )
+    else:
+        with st.container():
+            st.markdown('<div class="results-container">', unsafe_allow_html=True)
+
+            header_cols = st.columns([0.5, 2, 2, 1, 0.9])
+            header_cols[0].markdown("**번호**")
+            header_cols[1].markdown("**원본문장**")
+            header_cols[2].markdown("**생성된 영어 프롬프트**")
+            header_cols[3].markdown("**이미지**")
+            header_cols[4].markdown("**조작**")
+
+            st.markdown("---")
+
+            for i, scene in enumerate(scenes):
+                cols = st.columns([0.5, 2, 2, 1, 0.9])
+
+                cols[0].write(scene["id"])
+
+                korean_html = scene["korean"].replace("\n", "<br>")
+                cols[1].markdown(
+                    f'<div class="small-text-cell">{korean_html}</div>',
+                    unsafe_allow_html=True,
+                )
+
+                prompt_html = scene["prompt_en"].replace("\n", "<br>")
+                cols[2].markdown(
+                    f'<div class="small-text-cell">{prompt_html}</div>',
+                    unsafe_allow_html=True,
+                )
+
+                image_id = best_image_id(scene)
+                if image_store.exists(image_id):
+                    # 표에는 미리 줄여둔 WebP 썸네일만 보낸다
+                    thumb = image_store.thumb_path(image_id)
+                    if not os.path.exists(thumb):
+                        thumb = image_store.original_path(image_id)
+                    cols[3].image(thumb, use_column_width=True)
+                    if st.session_state.get("tiered_mode"):
+                        if image_id == scene.get("final_image_id"):
+                            cols[3].caption("최종 (high)")
+                        elif scene.get("final_error"):
+                            cols[3].caption(f"초안 (low) · 업그레이드 실패: {scene['final_error']}")
+                        else:
+                            cols[3].caption("초안 (low)")
+                elif scene.get("error"):
+                    cols[3].caption(f"❌ 생성 실패: {scene['error']}")
+                else:
+                    cols[3].write("아직 이미지 없음")
+
+                if st.session_state.get("tiered_mode") and image_store.exists(scene.get("image_id")):
+                    approved_now = cols[4].checkbox("승인", value=bool(scene.get("approved")), key=f"approve_{scene['id']}")
+                    if approved_now != bool(scene.get("approved")):
+                        scene["approved"] = approved_now
+                        save_current_job()
+
+                regen = st.session_state["regen_jobs"].get(i)
+                if regen is not None:
+                    cols[3].caption("⏳ 재생성 중..." if regen["future"].running() else "⏳ 재생성 대기 중")
+                elif i in st.session_state["regen_done"]:
+                    cols[3].caption("✅ 새 이미지")
+                elif scene.get("error") and image_store.exists(image_id):
+                    cols[3].caption(f"❌ 재생성 실패: {scene['error']}")
+
+                if cols[4].button(
+                    "재 생성",
+                    key=f"regen_{scene['id']}_{i}",
+                    disabled=regen is not None or not scene.get("prompt_en"),
+                ):
+                    queue_regeneration(scenes, i)
+                    st.rerun()
+
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    # =========================
+    # 프로젝트 내보내기 (이미지 + 프롬프트 + 대본 → ZIP)
+    # =========================
+    with st.expander("📦 프로젝트 내보내기 (ZIP)"):
+        include_video = st.checkbox(
+            "마지막으로 만든 영상 포함",
+            value=False,
+            disabled=not media_store.exists(st.session_state.get("video_path")),
+        )
+        if st.button("ZIP 만들기", use_container_width=True):
+            job = bulk_jobs.load_job(st.session_state.get("bulk_job_id")) or {
+                "job_id": "unsaved",
+                "raw_script": st.session_state.get("raw_script", ""),
+                "scenes": scenes,
+            }
+            job["scenes"] = scenes
+            export_path = os.path.join(project_bundle.EXPORTS_DIR, f"bulkking_{job['job_id'][:8]}.zip")
+            with st.spinner("장면 이미지를 ZIP 으로 묶는 중입니다..."):
+                st.session_state["bundle_path"] = project_bundle.export_bundle(
+                    job,
+                    export_path,
+                    video_path=st.session_state.get("video_path") if include_video else None,
+                )
+
+        bundle_path = st.session_state.get("bundle_path")
+        if bundle_path and os.path.exists(bundle_path):
+            with open(bundle_path, "rb") as bundle_file:
+                st.download_button(
+                    label=f"📥 {os.path.basename(bundle_path)} 다운로드 ({os.path.getsize(bundle_path) / 1e6:.1f} MB)",
+                    data=bundle_file,
+                    file_name=os.path.basename(bundle_path),
+                    mime="application/zip",
+                )
 else:
     st.info("대본을 입력하고 **이미지 생성** 버튼을 눌러주세요.")
 
 # =========================
 # 생성된 영상 / 오류 표시
 # =========================
-if st.session_state.get("video_bytes"):
+if media_store.exists(st.session_state.get("video_path")):
     st.subheader("🎬 생성된 영상 미리보기")
-    st.video(st.session_state["video_bytes"])
-
-    st.download_button(
-        label="📥 영상 다운로드 (MP4)",
-        data=st.session_state["video_bytes"],
-        file_name="bulkking_output.mp4",
-        mime="video/mp4",
-    )
+    show_video(st.session_state["video_path"], "bulkking_output.mp4")
 elif st.session_state.get("video_error_msg"):
     st.subheader("⚠️ 영상 생성 오류")
     st.error(st.session_state["video_error_msg"])
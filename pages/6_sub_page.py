@@ -1,4 +1,5 @@
 import os
+from dataclasses import replace
 from typing import Optional
 
 import streamlit as st
@@ -14,6 +15,10 @@ from moviepy.editor import (
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont, ImageColor
 
+from video_utils import profile_for
+
+SUBKING_PRESET = "medium"
+
 # ====================================
 # 페이지 설정 (사이드바 항상 펼쳐두기!!)
 # ====================================
@@ -552,13 +557,15 @@ def create_video_with_subtitles(
     audio = AudioFileClip(audio_path)
     video = video.set_audio(audio)
 
+    # 공통 출력 프로파일: faststart (긴 영상은 fragmented) MP4
+    # preset 은 공통 프로파일(veryfast)이 아니라 예전과 같은 moviepy 기본값(medium) 유지
+    profile = replace(profile_for(duration), preset=SUBKING_PRESET)
     video.write_videofile(
         output_path,
         fps=30,
-        codec="libx264",
-        audio_codec="aac",
         verbose=False,
         logger=None,
+        **profile.moviepy_kwargs(),
     )
 
     return output_path
@@ -0,0 +1,144 @@
+import os
+from datetime import datetime
+
+import streamlit as st
+
+import contact_sheet
+import image_gallery
+import image_store
+
+st.set_page_config(page_title="imageking 갤러리", page_icon="🖼", layout="wide")
+
+st.markdown(
+    """
+    <style>
+    .main-title {
+        font-size: 2.3rem;
+        font-weight: 800;
+        margin-bottom: 0.2rem;
+    }
+    .main-subtitle {
+        font-size: 0.95rem;
+        color: #555;
+        margin-bottom: 1.5rem;
+    }
+    </style>
+    """,
+    unsafe_allow_html=True,
+)
+
+st.markdown(
+    """
+    <div>
+        <div class="main-title">imageking 갤러리</div>
+        <div class="main-subtitle">
+            지금까지 생성한 이미지를 다시 보고 비교합니다.<br>
+            API 를 다시 호출하지 않고 저장된 썸네일 / 원본만 불러옵니다.
+        </div>
+    </div>
+    """,
+    unsafe_allow_html=True,
+)
+
+GRID_COLUMNS = 6
+PER_PAGE_OPTIONS = [24, 48, 96]
+
+st.session_state.setdefault("gallery_page", 1)
+st.session_state.setdefault("gallery_selected", None)
+
+# =========================
+# 검색 / 페이지 선택
+# =========================
+col_search, col_per_page = st.columns([3, 1])
+with col_search:
+    search = st.text_input("프롬프트 검색", placeholder="프롬프트에 포함된 단어")
+with col_per_page:
+    per_page = st.selectbox("페이지당", PER_PAGE_OPTIONS, index=0)
+
+total = image_gallery.count(search)
+pages = contact_sheet.page_count(total, per_page)
+st.session_state["gallery_page"] = min(st.session_state["gallery_page"], pages)
+
+col_prev, col_page, col_next = st.columns([1, 2, 1])
+with col_prev:
+    if st.button("◀ 이전", use_container_width=True, disabled=st.session_state["gallery_page"] <= 1):
+        st.session_state["gallery_page"] -= 1
+        st.rerun()
+with col_page:
+    st.markdown(
+        f"<div style='text-align:center'>{st.session_state['gallery_page']} / {pages} 페이지 · 총 {total}장</div>",
+        unsafe_allow_html=True,
+    )
+with col_next:
+    if st.button("다음 ▶", use_container_width=True, disabled=st.session_state["gallery_page"] >= pages):
+        st.session_state["gallery_page"] += 1
+        st.rerun()
+
+
+def format_entry(entry: dict) -> str:
+    created = datetime.fromtimestamp(entry["created_at"]).strftime("%m-%d %H:%M")
+    latency = f" · {entry['latency']:.1f}s" if entry.get("latency") else ""
+    return f"{created} · {entry['size']} · {entry['quality']}{latency}"
+
+
+# =========================
+# 선택한 항목 원본 보기
+# =========================
+selected = image_gallery.get(st.session_state["gallery_selected"]) if st.session_state["gallery_selected"] else None
+if selected:
+    with st.container(border=True):
+        col_img, col_info = st.columns([2, 1])
+        with col_img:
+            if image_store.exists(selected["image_id"]):
+                st.image(image_store.original_path(selected["image_id"]), use_container_width=True)
+            else:
+                st.warning("원본 이미지 파일을 찾을 수 없습니다.")
+        with col_info:
+            st.caption(format_entry(selected) + f" · {selected['model']} · {selected['source']}")
+            st.text_area("프롬프트", selected["prompt"], height=200, disabled=True)
+
+            if st.button("🧪 imageking 에서 이어서 작업", use_container_width=True):
+                st.session_state["prompt_text"] = selected["prompt"]
+                st.session_state["image_id"] = selected["image_id"]
+                st.session_state["image_from_cache"] = True
+                st.switch_page("pages/4_image_page.py")
+
+            if image_store.exists(selected["image_id"]):
+                with open(image_store.original_path(selected["image_id"]), "rb") as f:
+                    st.download_button(
+                        "📥 원본 다운로드 (PNG)",
+                        data=f,
+                        file_name=f"imageking_{selected['id']}.png",
+                        mime="image/png",
+                        use_container_width=True,
+                    )
+
+            col_close, col_delete = st.columns(2)
+            if col_close.button("닫기", use_container_width=True):
+                st.session_state["gallery_selected"] = None
+                st.rerun()
+            if col_delete.button("🗑 기록 삭제", use_container_width=True):
+                image_gallery.delete(selected["id"])
+                st.session_state["gallery_selected"] = None
+                st.rerun()
+
+# =========================
+# 썸네일 그리드 (현재 페이지 것만 읽는다)
+# =========================
+entries = image_gallery.list_page(st.session_state["gallery_page"], per_page, search)
+if not entries:
+    st.info("아직 기록된 이미지가 없습니다. imageking 에서 이미지를 생성하면 여기에 쌓입니다.")
+
+for row_start in range(0, len(entries), GRID_COLUMNS):
+    cols = st.columns(GRID_COLUMNS)
+    for col, entry in zip(cols, entries[row_start:row_start + GRID_COLUMNS]):
+        with col:
+            thumb = image_gallery.thumbnail(entry)
+            if thumb and os.path.exists(thumb):
+                st.image(thumb, use_container_width=True)
+            else:
+                st.caption("(이미지 없음)")
+            st.caption(format_entry(entry))
+            if st.button("보기", key=f"gallery_view_{entry['id']}", use_container_width=True):
+                st.session_state["gallery_selected"] = entry["id"]
+                st.rerun()
@@ -0,0 +1,151 @@
+import csv
+import io
+import json
+import os
+import time
+import zipfile
+
+import bulk_jobs
+import image_store
+
+# =========================
+# 프로젝트 번들 (ZIP) 내보내기 / 가져오기
+#   manifest.json  : 대본 원문 + 장면 목록 (image_id / image_key / 승인 상태 등)
+#   script.txt     : 대본 원문
+#   prompts.csv    : 번호 · 한국어 문장 · 영어 프롬프트 · 이미지 파일명
+#   images/…png    : 장면 이미지 (초안 + 최종본)
+#   video/…mp4     : (선택) 마지막으로 만든 영상
+# 같은 파일이 일반 ZIP 다운로드이자, 다시 불러올 수 있는 프로젝트 번들이다.
+# =========================
+EXPORTS_DIR = os.path.join(".ikapp_media", "exports")
+
+BUNDLE_FORMAT = "ikapp-bulk-bundle"
+BUNDLE_VERSION = 1
+
+# 번들에 포함되는 장면별 이미지 필드 (image_key / final_key 와 짝)
+IMAGE_FIELDS = (("image_id", "image_key"), ("final_image_id", "final_key"))
+
+
+def _image_arcname(scene: dict, image_id: str) -> str:
+    return f"images/scene_{scene['id']:03d}_{image_id[:12]}.png"
+
+
+def image_arcnames(scenes: list) -> dict:
+    """image_id → 번들 안 경로. 여러 장면이 같은 이미지를 쓰면 처음 나온 장면 이름으로 한 번만 담는다."""
+    arcnames = {}
+    for scene in scenes:
+        for id_field, _ in IMAGE_FIELDS:
+            image_id = scene.get(id_field)
+            if image_store.is_valid_id(image_id) and image_id not in arcnames:
+                arcnames[image_id] = _image_arcname(scene, image_id)
+    return arcnames
+
+
+def _write_text(zf: zipfile.ZipFile, arcname: str, text: str):
+    zf.writestr(arcname, text.encode("utf-8"), compress_type=zipfile.ZIP_DEFLATED)
+
+
+def prompts_csv(scenes: list) -> str:
+    arcnames = image_arcnames(scenes)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["id", "korean", "prompt_en", "image", "final_image"])
+    for scene in scenes:
+        writer.writerow([
+            scene["id"],
+            scene.get("korean", ""),
+            scene.get("prompt_en", ""),
+            arcnames[scene["image_id"]] if image_store.exists(scene.get("image_id")) else "",
+            arcnames[scene["final_image_id"]] if image_store.exists(scene.get("final_image_id")) else "",
+        ])
+    return buf.getvalue()
+
+
+def export_bundle(job: dict, output_path: str, video_path: str | None = None) -> str:
+    """
+    job(매니페스트)을 ZIP 번들로 output_path 에 기록.
+    이미지/영상은 zf.write 로 파일에서 조금씩 읽어 기록하므로 전체를 메모리에 올리지 않는다.
+    PNG / MP4 는 이미 압축된 형식이라 ZIP_STORED 로 그대로 담는다.
+    """
+    scenes = job.get("scenes", [])
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "exported_at": time.time(),
+        "raw_script": job.get("raw_script", ""),
+        "scenes": scenes,
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+            _write_text(zf, "manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+            _write_text(zf, "script.txt", job.get("raw_script", ""))
+            _write_text(zf, "prompts.csv", prompts_csv(scenes))
+
+            for image_id, arcname in image_arcnames(scenes).items():
+                if image_store.exists(image_id):
+                    zf.write(image_store.original_path(image_id), arcname)
+
+            if video_path and os.path.exists(video_path):
+                zf.write(video_path, f"video/{os.path.basename(video_path)}")
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+
+def _check_manifest(manifest) -> list:
+    if not isinstance(manifest, dict) or manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError("BUNDLE_UNKNOWN_FORMAT")
+    version = manifest.get("version", 0)
+    if not isinstance(version, int):
+        raise ValueError("BUNDLE_BAD_MANIFEST")
+    if version > BUNDLE_VERSION:
+        raise ValueError("BUNDLE_NEWER_VERSION")
+    scenes = manifest.get("scenes", [])
+    if not isinstance(manifest.get("raw_script", ""), str) or not isinstance(scenes, list):
+        raise ValueError("BUNDLE_BAD_MANIFEST")
+    for scene in scenes:
+        if not isinstance(scene, dict) or type(scene.get("id")) is not int:
+            raise ValueError("BUNDLE_BAD_MANIFEST")
+    return scenes
+
+
+def import_bundle(file) -> dict:
+    """
+    번들(ZIP 경로 또는 파일 객체)에서 이미지를 저장소로 옮기고 새 job 을 만들어 반환.
+    manifest 의 image_id 는 믿지 않는다: 64자 hex 가 아니면 버리고,
+    나머지도 번들 안 파일을 put_bytes 로 저장해 내용 해시로 다시 정한다 (저장소에 이미 있어도 마찬가지).
+    image_key / final_key 도 검증할 수 없으므로 공용 이미지 캐시에는 등록하지 않는다.
+    """
+    with zipfile.ZipFile(file) as zf:
+        try:
+            manifest = json.loads(zf.read("manifest.json").decode("utf-8"))
+        except KeyError:
+            raise ValueError("BUNDLE_MISSING_MANIFEST")
+        scenes = _check_manifest(manifest)
+
+        names = set(zf.namelist())
+        arcnames = image_arcnames(scenes)
+        stored = {}
+        for scene in scenes:
+            for id_field, _ in IMAGE_FIELDS:
+                image_id = scene.get(id_field)
+                if not image_id:
+                    continue
+                arcname = arcnames.get(image_id) if image_store.is_valid_id(image_id) else None
+                if arcname not in names:
+                    scene[id_field] = None
+                    continue
+                if image_id not in stored:
+                    # 이미지 한 장씩만 메모리에 올린다
+                    stored[image_id] = image_store.put_bytes(zf.read(arcname))
+                scene[id_field] = stored[image_id]
+
+            if not scene.get("image_id"):
+                scene["status"] = bulk_jobs.STATUS_PENDING
+
+    return bulk_jobs.new_job(manifest.get("raw_script", ""), scenes)
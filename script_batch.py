@@ -0,0 +1,158 @@
+import asyncio
+import csv
+import io
+import json
+import time
+from dataclasses import asdict, dataclass
+
+import chat_cache
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+# =========================
+# scriptking 일괄 생성 (주제 여러 개를 asyncio 로 동시에)
+# =========================
+BATCH_CONCURRENCY = 4
+BATCH_MAX_TOKENS = 600
+
+TOPIC_COLUMNS = ("주제", "topic", "Topic")
+
+
+def build_user_text(topic: str) -> str:
+    return f"다음 주제에 맞는 다큐멘터리 내레이션을 작성해줘.\n\n주제: {topic}"
+
+
+def _dedupe(topics) -> list[str]:
+    seen, out = set(), []
+    for t in topics:
+        t = (t or "").strip()
+        if t and t not in seen:
+            seen.add(t)
+            out.append(t)
+    return out
+
+
+def parse_topics(text: str) -> list[str]:
+    """붙여넣은 목록: 한 줄에 주제 하나 (빈 줄 / 중복 제외)."""
+    return _dedupe((text or "").splitlines())
+
+
+def parse_topics_csv(data: bytes) -> list[str]:
+    """'주제' / 'topic' 열이 있으면 그 열, 없으면 첫 번째 열."""
+    text = data.decode("utf-8-sig", errors="ignore")
+    rows = list(csv.reader(io.StringIO(text)))
+    if not rows:
+        return []
+    header = [h.strip() for h in rows[0]]
+    col = next((header.index(name) for name in TOPIC_COLUMNS if name in header), None)
+    if col is None:
+        return _dedupe(row[0] for row in rows if row)
+    return _dedupe(row[col] for row in rows[1:] if len(row) > col)
+
+
+@dataclass
+class BatchResult:
+    index: int
+    topic: str
+    text: str = ""
+    latency: float = 0.0
+    tokens: int = 0
+    from_cache: bool = False
+    error: str | None = None
+
+
+async def _run_topic(index, topic, client, semaphore, model, system_text, max_tokens, force_new) -> BatchResult:
+    result = BatchResult(index=index, topic=topic)
+    user_text = build_user_text(topic)
+    cache_key = chat_cache.make_key(model, system_text, user_text, max_tokens)
+
+    if not force_new:
+        cached = chat_cache.lookup(cache_key)
+        if cached:
+            result.text = cached
+            result.from_cache = True
+            return result
+
+    async with semaphore:
+        t0 = time.perf_counter()
+        try:
+            res = await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_text},
+                    {"role": "user", "content": user_text},
+                ],
+                max_tokens=max_tokens,
+            )
+            # 응답 모양이 이상해도(choices 가 비었거나 등) 이 주제만 실패로 남기고 나머지는 계속
+            text = res.choices[0].message.content or ""
+            tokens = getattr(res.usage, "completion_tokens", 0) or 0
+        except Exception as e:
+            result.latency = time.perf_counter() - t0
+            result.error = f"{type(e).__name__}: {e}"[:300]
+            return result
+        result.latency = time.perf_counter() - t0
+
+    result.text = text
+    result.tokens = tokens
+    chat_cache.put(cache_key, model, result.text)
+    return result
+
+
+async def run_batch(
+    topics: list[str],
+    api_key: str,
+    model: str,
+    system_text: str,
+    max_tokens: int = BATCH_MAX_TOKENS,
+    concurrency: int = BATCH_CONCURRENCY,
+    force_new: bool = False,
+    on_result=None,
+) -> list[BatchResult]:
+    """
+    topics 를 같은 지침으로 동시에 생성 (동시 요청 수는 세마포어로 제한, 429 등은 SDK 재시도).
+    on_result(BatchResult) 는 끝나는 순서대로, 이 코루틴을 돌리는 스레드에서 호출된다.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    client = openai.AsyncOpenAI(api_key=api_key, max_retries=3)
+    results = []
+    try:
+        tasks = [
+            asyncio.create_task(
+                _run_topic(i, topic, client, semaphore, model, system_text, max_tokens, force_new)
+            )
+            for i, topic in enumerate(topics)
+        ]
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            results.append(result)
+            if on_result:
+                on_result(result)
+    finally:
+        await client.close()
+
+    results.sort(key=lambda r: r.index)
+    return results
+
+
+# =========================
+# 내보내기
+# =========================
+EXPORT_FIELDS = ["index", "topic", "text", "latency", "tokens", "from_cache", "error"]
+
+
+def to_csv_bytes(results: list[BatchResult]) -> bytes:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for r in results:
+        writer.writerow(asdict(r))
+    # 엑셀에서 한글이 깨지지 않도록 BOM
+    return buf.getvalue().encode("utf-8-sig")
+
+
+def to_jsonl_bytes(results: list[BatchResult]) -> bytes:
+    return "".join(json.dumps(asdict(r), ensure_ascii=False) + "\n" for r in results).encode("utf-8")
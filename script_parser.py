@@ -0,0 +1,138 @@
+import io
+from dataclasses import dataclass
+
+
+# =========================
+# 벌크 대본 파서 (줄 단위 · 한 번만 훑음)
+#
+#   1
+#   한국어문장…
+#   Shot on ...
+#   2
+#   ...
+# =========================
+@dataclass(frozen=True)
+class ParseIssue:
+    line_no: int
+    message: str
+
+
+def make_scene(num: int, block: str) -> dict:
+    block = block.strip()
+    block = block.replace("\u2028", "\n")  # 특수 줄바꿈 치환
+
+    if "Shot on" in block:
+        ko_part, en_part = block.split("Shot on", 1)
+        korean = ko_part.strip()
+        english_prompt = "Shot on" + en_part.strip()
+    else:
+        korean = block.strip()
+        english_prompt = ""
+
+    return {
+        "id": num,
+        "korean": korean,
+        "prompt_en": english_prompt,
+        "image_id": None,
+        "image_key": None,
+        "error": None,
+    }
+
+
+def _is_header(stripped: str) -> bool:
+    # "12" 처럼 숫자만 있는 줄이 장면 번호
+    return stripped.isascii() and stripped.isdigit()
+
+
+def iter_scenes(lines, issues: list | None = None):
+    """
+    줄 iterable(파일 객체, StringIO 등)을 받아 장면 dict 를 하나씩 yield.
+    전체 텍스트를 메모리에 올리거나 앞을 다시 훑지 않는다.
+    issues 리스트를 주면 잘못된 블록을 ParseIssue(줄번호, 메시지)로 채운다.
+    """
+    current_num = None
+    header_line = 0
+    prev_num = None
+    buf = []
+    in_orphan = False
+
+    def _finish():
+        block = "\n".join(buf)
+        if not block.strip():
+            if issues is not None:
+                issues.append(ParseIssue(header_line, f"{current_num}번 장면에 내용이 없습니다."))
+            return None
+        scene = make_scene(current_num, block)
+        if not scene["prompt_en"] and issues is not None:
+            issues.append(ParseIssue(header_line, f"{current_num}번 장면에 'Shot on' 영어 프롬프트가 없습니다."))
+        return scene
+
+    for line_no, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        stripped = line.strip()
+
+        if _is_header(stripped):
+            if current_num is not None:
+                scene = _finish()
+                if scene:
+                    yield scene
+
+            num = int(stripped)
+            if prev_num is not None and num != prev_num + 1 and issues is not None:
+                issues.append(ParseIssue(line_no, f"장면 번호가 {prev_num} 다음에 {num} 으로 이어집니다."))
+            current_num, header_line, prev_num = num, line_no, num
+            buf = []
+            in_orphan = False
+            continue
+
+        if current_num is None:
+            # 첫 번호 앞의 텍스트는 버리되, 연속된 덩어리마다 한 번만 알림
+            if stripped and not in_orphan and issues is not None:
+                issues.append(ParseIssue(line_no, "장면 번호 없이 시작하는 텍스트는 무시됩니다."))
+            in_orphan = bool(stripped)
+            continue
+
+        buf.append(line)
+
+    if current_num is not None:
+        scene = _finish()
+        if scene:
+            yield scene
+
+
+def iter_text_lines(text: str):
+    # StringIO 는 "\n" 에서만 줄을 나누므로 \u2028 은 블록 안에 그대로 남는다
+    return io.StringIO(text, newline="\n")
+
+
+def iter_file_lines(binary_file, encoding: str = "utf-8-sig"):
+    """업로드 파일 같은 바이너리 스트림을 줄 단위로 디코딩."""
+    return io.TextIOWrapper(binary_file, encoding=encoding, errors="replace", newline="")
+
+
+def parse_script_text(text: str):
+    """(scenes, issues) 반환."""
+    issues = []
+    scenes = list(iter_scenes(iter_text_lines(text), issues))
+    return scenes, issues
+
+
+def parse_script_file(binary_file, encoding: str = "utf-8-sig"):
+    """
+    업로드 파일을 한 번만 읽으면서 파싱과 원문 수집을 같이 한다. (scenes, issues, 원문) 반환.
+    래퍼는 detach 해서, 래퍼가 정리될 때 업로드 파일까지 닫히지 않게 한다.
+    """
+    issues = []
+    raw_parts = []
+    wrapper = iter_file_lines(binary_file, encoding)
+
+    def _tee():
+        for line in wrapper:
+            raw_parts.append(line)
+            yield line
+
+    try:
+        scenes = list(iter_scenes(_tee(), issues))
+    finally:
+        wrapper.detach()
+    return scenes, issues, "".join(raw_parts)
@@ -0,0 +1,46 @@
+import json
+import os
+import uuid
+
+import pytest
+
+import bulk_jobs
+
+
+@pytest.fixture
+def jobs_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_jobs, "JOBS_DIR", str(tmp_path / "jobs"))
+    return tmp_path
+
+
+def _write(job_id: str, content: str):
+    os.makedirs(bulk_jobs.JOBS_DIR, exist_ok=True)
+    with open(os.path.join(bulk_jobs.JOBS_DIR, f"{job_id}.json"), "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def test_new_job_round_trip(jobs_dir):
+    job = bulk_jobs.new_job("script", [{"id": 1, "prompt_en": "a"}, {"id": 2, "image_id": "x"}])
+    assert bulk_jobs.load_job(job["job_id"]) == job
+    assert [s["status"] for s in job["scenes"]] == [bulk_jobs.STATUS_PENDING, bulk_jobs.STATUS_DONE]
+
+
+@pytest.mark.parametrize("job_id", ["../../evil", "../jobs/x", "", None, ["a"], str(uuid.uuid4()).upper()])
+def test_load_job_rejects_non_uuid_ids(jobs_dir, job_id):
+    (jobs_dir / "evil.json").write_text(json.dumps({"job_id": "x", "scenes": []}))
+    assert bulk_jobs.load_job(job_id) is None
+
+
+@pytest.mark.parametrize("manifest", [
+    [1, 2],
+    "text",
+    {"scenes": []},
+    {"job_id": "{id}", "scenes": "abc"},
+    {"job_id": "{id}", "scenes": [1]},
+    {"job_id": "{id}", "scenes": [{"korean": "id 없음"}]},
+    {"job_id": "{id}", "scenes": [], "raw_script": 3},
+])
+def test_load_job_rejects_malformed_manifest(jobs_dir, manifest):
+    job_id = str(uuid.uuid4())
+    _write(job_id, json.dumps(manifest).replace("{id}", job_id))
+    assert bulk_jobs.load_job(job_id) is None
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+
+import chat_cache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(chat_cache, "CHAT_CACHE_DB_PATH", str(tmp_path / "chat_cache.db"))
+    monkeypatch.setattr(chat_cache, "_conn", None)
+    yield chat_cache
+    if chat_cache._conn is not None:
+        chat_cache._conn.close()
+
+
+def _clock(monkeypatch):
+    # 같은 초 안에서도 last_used 순서가 정해지도록 시계를 한 칸씩 진행
+    ticks = iter(range(1, 10_000))
+    monkeypatch.setattr(chat_cache, "time", SimpleNamespace(time=lambda: float(next(ticks))))
+
+
+def test_key_depends_on_every_input():
+    base = chat_cache.make_key("m", "sys", "user", 100)
+    assert base == chat_cache.make_key("m", "sys", "user", 100)
+    assert len({
+        base,
+        chat_cache.make_key("m2", "sys", "user", 100),
+        chat_cache.make_key("m", "sys2", "user", 100),
+        chat_cache.make_key("m", "sys", "user2", 100),
+        chat_cache.make_key("m", "sys", "user", 101),
+    }) == 5
+
+
+def test_evicts_least_recently_used_entry(cache, monkeypatch):
+    _clock(monkeypatch)
+    monkeypatch.setattr(cache, "MAX_ENTRIES", 3)
+    for key in "abc":
+        cache.put(key, "m", f"text {key}")
+
+    # a 를 다시 쓰면 가장 오래 안 쓴 항목은 b
+    assert cache.lookup("a") == "text a"
+    cache.put("d", "m", "text d")
+
+    assert cache.lookup("b") is None
+    assert [cache.lookup(k) for k in "acd"] == ["text a", "text c", "text d"]
+    assert cache.get_stats()["entries"] == 3
+
+
+def test_evicts_by_total_size(cache, monkeypatch):
+    _clock(monkeypatch)
+    monkeypatch.setattr(cache, "MAX_BYTES", 25)
+    cache.put("a", "m", "x" * 10)
+    cache.put("b", "m", "y" * 10)
+    cache.put("c", "m", "z" * 10)
+
+    assert cache.lookup("a") is None
+    assert cache.get_stats()["bytes"] == 20
+
+
+def test_put_overwrites_and_skips_empty(cache):
+    cache.put("a", "m", "old")
+    cache.put("a", "m", "new")
+    cache.put("b", "m", "")
+    assert cache.lookup("a") == "new"
+    assert cache.lookup("b") is None
+    assert cache.get_stats()["entries"] == 1
@@ -0,0 +1,119 @@
+import threading
+import time
+
+from image_jobs import AimdController, iter_scheduled
+
+
+class FakeThrottle(Exception):
+    status_code = 429
+
+
+def test_aimd_additive_increase():
+    c = AimdController(initial=2, minimum=1, maximum=4)
+    # 한 번에 +1/limit 씩, 대략 limit 개 성공마다 +1
+    for _ in range(2):
+        c.on_success()
+    assert c.limit == 2
+    c.on_success()
+    assert c.limit == 3
+
+
+def test_aimd_multiplicative_decrease_and_pause():
+    c = AimdController(initial=8, minimum=1, maximum=16)
+    c.on_throttle(retry_after=0.5)
+    assert c.limit == 4
+    assert 0 < c.pause_remaining() <= 0.5
+    for _ in range(10):
+        c.on_throttle()
+    assert c.limit == 1
+
+
+def test_aimd_respects_maximum():
+    c = AimdController(initial=3, maximum=3)
+    for _ in range(20):
+        c.on_success()
+    assert c.limit == 3
+
+
+def test_scheduler_retries_throttled_items():
+    attempts = {}
+    lock = threading.Lock()
+
+    def fn(arg):
+        with lock:
+            attempts[arg] = attempts.get(arg, 0) + 1
+            n = attempts[arg]
+        if arg == "flaky" and n < 2:
+            raise FakeThrottle()
+        if arg == "broken":
+            raise ValueError("not retryable")
+        return arg.upper()
+
+    controller = AimdController(initial=2, maximum=2)
+    results = {key: (res, err, n) for key, res, err, n in iter_scheduled(
+        [("a", "ok"), ("b", "flaky"), ("c", "broken")], fn, controller, max_attempts=3
+    )}
+
+    assert results["a"][0] == "OK"
+    assert results["b"][0] == "FLAKY" and results["b"][2] == 2
+    assert isinstance(results["c"][1], ValueError) and results["c"][2] == 1
+
+
+def test_scheduler_does_not_busy_poll_while_slots_are_full():
+    calls = []
+    original_wait = iter_scheduled.__globals__["wait"]
+
+    def counting_wait(fs, timeout=None, return_when=None):
+        calls.append(timeout)
+        return original_wait(fs, timeout=timeout, return_when=return_when)
+
+    iter_scheduled.__globals__["wait"] = counting_wait
+    try:
+        items = [(i, 0.2) for i in range(3)]
+        list(iter_scheduled(items, time.sleep, AimdController(initial=1, maximum=1)))
+    finally:
+        iter_scheduled.__globals__["wait"] = original_wait
+
+    # 준비된 항목이 슬롯을 기다리는 동안에는 완료될 때까지 블록 (0.05s 간격 폴링 없음)
+    assert all(t is None for t in calls)
+    assert len(calls) <= 6
+
+
+def test_aimd_cuts_once_per_burst_of_throttles():
+    c = AimdController(initial=16, minimum=1, maximum=16)
+    sent = time.monotonic()
+    # 같은 시점에 나가 있던 8 개가 모두 429
+    for _ in range(8):
+        c.on_throttle(started_at=sent)
+    assert c.limit == 8
+
+    # 줄인 뒤에 보낸 요청이 다시 429 면 한 번 더
+    c.on_throttle(started_at=time.monotonic())
+    assert c.limit == 4
+
+
+def test_scheduler_halves_limit_once_for_concurrent_throttles():
+    barrier = threading.Barrier(4)
+    calls = {}
+    lock = threading.Lock()
+
+    def fn(arg):
+        with lock:
+            calls[arg] = calls.get(arg, 0) + 1
+            first = calls[arg] == 1
+        if first:
+            barrier.wait(timeout=5)
+            raise FakeThrottle()
+        return arg
+
+    class Recording(AimdController):
+        def on_throttle(self, *args):
+            super().on_throttle(*args)
+            limits.append(self.limit)
+
+    limits = []
+    controller = Recording(initial=4, minimum=1, maximum=4)
+    results = list(iter_scheduled([(i, i) for i in range(4)], fn, controller, max_attempts=2))
+    assert sorted(r[1] for r in results) == [0, 1, 2, 3]
+    # 4 번의 429 는 한 번의 혼잡 → 4 * 0.5 = 2 에서 멈춘다 (0.5**4 로 1 까지 떨어지지 않음)
+    assert limits == [2, 2, 2, 2]
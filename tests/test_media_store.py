@@ -0,0 +1,66 @@
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import media_store
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_store, "MEDIA_DIR", str(tmp_path / "media"))
+    monkeypatch.setattr(media_store, "_server", None)
+    monkeypatch.setenv("MEDIA_SERVER_PORT", "0")
+    monkeypatch.delenv("MEDIA_PUBLIC_URL", raising=False)
+    srv = media_store.ThreadingHTTPServer(("127.0.0.1", 0), media_store.MediaRequestHandler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    monkeypatch.setattr(media_store, "ensure_media_server", lambda: srv)
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _get(url, headers=None):
+    req = urllib.request.Request(url, headers=headers or {})
+    with urllib.request.urlopen(req, timeout=5) as r:
+        return r.status, dict(r.headers), r.read()
+
+
+def test_signed_url_serves_ranges_without_wildcard_cors(server):
+    path = media_store.publish_bytes(b"0123456789", "test")
+    url = media_store.media_url(path, request_host="localhost:8501")
+    status, headers, body = _get(url, {"Range": "bytes=2-5"})
+    assert (status, body) == (206, b"2345")
+    assert headers["Content-Range"] == "bytes 2-5/10"
+    assert "Access-Control-Allow-Origin" not in headers
+
+    status, headers, _ = _get(media_store.media_url(path, download=True, request_host="localhost"))
+    assert "attachment" in headers["Content-Disposition"]
+
+
+@pytest.mark.parametrize("suffix", ["", "?t=", "?t=deadbeef"])
+def test_unsigned_or_forged_url_is_forbidden(server, suffix):
+    path = media_store.publish_bytes(b"data", "test")
+    port = server.server_address[1]
+    with pytest.raises(urllib.error.HTTPError) as err:
+        _get(f"http://127.0.0.1:{port}/{os.path.basename(path)}{suffix}")
+    assert err.value.code == 403
+
+
+def test_loopback_server_is_not_offered_to_remote_browsers(server, monkeypatch):
+    path = media_store.publish_bytes(b"data", "test")
+    assert media_store.media_url(path, request_host="app.example.com") is None
+    assert media_store.media_url(path, request_host="localhost:8501").startswith("http://localhost:")
+
+    monkeypatch.setenv("MEDIA_PUBLIC_URL", "https://media.example.com/")
+    assert media_store.media_url(path, request_host="app.example.com").startswith("https://media.example.com/")
+
+
+def test_server_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(media_store, "_server", None)
+    monkeypatch.setenv("MEDIA_SERVER_PORT", "0")
+    assert media_store.ensure_media_server() is None
+    assert media_store.media_url("x.mp4") is None
@@ -0,0 +1,124 @@
+import csv
+import hashlib
+import io
+import json
+import zipfile
+
+import pytest
+from PIL import Image
+
+import image_cache
+import image_store
+import project_bundle
+
+
+def _png(color) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (8, 8), color).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def media_dir(tmp_path, monkeypatch):
+    # 저장 경로가 상대 경로(.ikapp_media/...)라서 작업 디렉터리만 옮긴다
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(image_cache, "_conn", None)
+    return tmp_path
+
+
+def test_shared_image_is_stored_once_and_listed_by_stored_name(media_dir):
+    shared = image_store.put_bytes(_png("red"))
+    other = image_store.put_bytes(_png("blue"))
+    scenes = [
+        {"id": 1, "korean": "가", "prompt_en": "a", "image_id": shared},
+        {"id": 2, "korean": "나", "prompt_en": "b", "image_id": shared},
+        {"id": 3, "korean": "다", "prompt_en": "c", "image_id": other, "final_image_id": shared},
+    ]
+    path = project_bundle.export_bundle({"raw_script": "script", "scenes": scenes}, str(media_dir / "b.zip"))
+
+    with zipfile.ZipFile(path) as zf:
+        images = sorted(n for n in zf.namelist() if n.startswith("images/"))
+        rows = list(csv.DictReader(io.StringIO(zf.read("prompts.csv").decode("utf-8"))))
+
+    assert len(images) == 2
+    listed = {r["image"] for r in rows} | {r["final_image"] for r in rows if r["final_image"]}
+    assert listed == set(images)
+    assert rows[0]["image"] == rows[1]["image"] == rows[2]["final_image"]
+
+
+def test_round_trip_restores_shared_images(media_dir, tmp_path_factory):
+    shared = image_store.put_bytes(_png("green"))
+    scenes = [
+        {"id": 1, "korean": "가", "prompt_en": "a", "image_id": shared},
+        {"id": 2, "korean": "나", "prompt_en": "b", "image_id": shared},
+    ]
+    path = project_bundle.export_bundle({"raw_script": "script", "scenes": scenes}, str(media_dir / "b.zip"))
+
+    # 빈 저장소에서 다시 가져오기
+    monkeypatch_dir = tmp_path_factory.mktemp("import")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(monkeypatch_dir)
+        mp.setattr(image_cache, "_conn", None)
+        job = project_bundle.import_bundle(path)
+        assert [s["image_id"] for s in job["scenes"]] == [shared, shared]
+        assert image_store.exists(shared)
+
+
+def _bundle(path, scenes, files):
+    manifest = {"format": project_bundle.BUNDLE_FORMAT, "version": 1, "raw_script": "", "scenes": scenes}
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("manifest.json", json.dumps(manifest))
+        for name, data in files.items():
+            zf.writestr(name, data)
+    return str(path)
+
+
+def test_import_rejects_path_like_ids_and_does_not_touch_the_cache(media_dir, monkeypatch):
+    outside = media_dir / "secret.png"
+    outside.write_bytes(_png("red"))
+    registered = []
+    monkeypatch.setattr(image_cache, "put_if_absent", lambda *a: registered.append(a))
+    monkeypatch.setattr(image_cache, "put", lambda *a: registered.append(a))
+
+    scenes = [
+        {"id": 1, "image_id": "../../secret", "image_key": "popular"},
+        {"id": 2, "image_id": "A" * 64, "final_image_id": ["x"], "final_key": "popular"},
+    ]
+    job = project_bundle.import_bundle(_bundle(media_dir / "evil.zip", scenes, {}))
+
+    assert [s["image_id"] for s in job["scenes"]] == [None, None]
+    assert job["scenes"][1]["final_image_id"] is None
+    assert all(s["status"] == "pending" for s in job["scenes"])
+    assert registered == []
+
+
+def test_import_derives_id_from_bundle_bytes(media_dir):
+    # manifest 는 저장소에 이미 있는 다른 이미지의 id 를 주장하지만 파일 내용은 다르다
+    existing = image_store.put_bytes(_png("red"))
+    forged = _png("blue")
+    scenes = [{"id": 1, "image_id": existing}]
+    arcname = project_bundle.image_arcnames(scenes)[existing]
+    job = project_bundle.import_bundle(_bundle(media_dir / "b.zip", scenes, {arcname: forged}))
+
+    assert job["scenes"][0]["image_id"] == hashlib.sha256(forged).hexdigest()
+
+
+@pytest.mark.parametrize("manifest", [
+    [],
+    {"format": "ikapp-bulk-bundle", "version": "1"},
+    {"format": "ikapp-bulk-bundle", "version": 1, "scenes": {}},
+    {"format": "ikapp-bulk-bundle", "version": 1, "scenes": [{"id": "1"}]},
+    {"format": "ikapp-bulk-bundle", "version": 1, "scenes": [], "raw_script": 1},
+])
+def test_import_rejects_malformed_manifest(media_dir, manifest):
+    path = media_dir / "bad.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("manifest.json", json.dumps(manifest))
+    with pytest.raises(ValueError, match="BUNDLE_"):
+        project_bundle.import_bundle(str(path))
+
+
+def test_store_rejects_invalid_ids():
+    assert not image_store.exists("../../secret")
+    with pytest.raises(ValueError):
+        image_store.original_path("../x")
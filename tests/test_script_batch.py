@@ -0,0 +1,121 @@
+import asyncio
+import csv
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import chat_cache
+import script_batch
+from script_batch import BatchResult, parse_topics, parse_topics_csv, to_csv_bytes, to_jsonl_bytes
+
+
+def test_parse_topics_skips_blank_and_duplicate_lines():
+    assert parse_topics("  고구려  \n\n발해\n고구려\n") == ["고구려", "발해"]
+
+
+def test_parse_topics_csv_uses_topic_column_and_strips_bom():
+    data = "번호,주제\n1,고구려\n2,발해\n3,고구려\n4,\n".encode("utf-8-sig")
+    assert parse_topics_csv(data) == ["고구려", "발해"]
+
+
+def test_parse_topics_csv_english_header():
+    assert parse_topics_csv(b"id,topic\n1,Rome\n2,Carthage\n") == ["Rome", "Carthage"]
+
+
+def test_parse_topics_csv_falls_back_to_first_column():
+    # 알려진 열 이름이 없으면 첫 줄도 주제로 본다
+    data = "고구려,메모\n발해,x\n\n".encode("utf-8")
+    assert parse_topics_csv(data) == ["고구려", "발해"]
+    assert parse_topics_csv(b"") == []
+
+
+RESULTS = [
+    BatchResult(index=0, topic="고구려", text="첫 줄\n둘째 줄, \"따옴표\"", latency=1.25, tokens=42),
+    BatchResult(index=1, topic="발해", from_cache=True, text="캐시"),
+    BatchResult(index=2, topic="신라", error="RateLimitError: 429"),
+]
+
+
+def test_csv_export_round_trip():
+    data = to_csv_bytes(RESULTS)
+    assert data.startswith(b"\xef\xbb\xbf")
+    rows = list(csv.DictReader(io.StringIO(data.decode("utf-8-sig"))))
+    assert list(rows[0]) == script_batch.EXPORT_FIELDS
+    assert [r["topic"] for r in rows] == ["고구려", "발해", "신라"]
+    assert rows[0]["text"] == RESULTS[0].text
+    assert rows[1]["from_cache"] == "True"
+    assert rows[2]["error"] == "RateLimitError: 429"
+
+
+def test_jsonl_export_round_trip():
+    lines = to_jsonl_bytes(RESULTS).decode("utf-8").splitlines()
+    assert [BatchResult(**json.loads(line)) for line in lines] == RESULTS
+
+
+class _FakeCompletions:
+    def __init__(self, fail_topics):
+        self.fail_topics = fail_topics
+        self.calls = 0
+
+    async def create(self, model, messages, max_tokens):
+        self.calls += 1
+        await asyncio.sleep(0)
+        user_text = messages[1]["content"]
+        if any(t in user_text for t in self.fail_topics):
+            raise RuntimeError("boom")
+        if "백제" in user_text:
+            return SimpleNamespace(choices=[], usage=None)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"답: {user_text[-2:]}"))],
+            usage=SimpleNamespace(completion_tokens=7),
+        )
+
+
+class _FakeAsyncOpenAI:
+    completions = None
+
+    def __init__(self, api_key, max_retries):
+        self.chat = SimpleNamespace(completions=self.completions)
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_openai(tmp_path, monkeypatch):
+    monkeypatch.setattr(chat_cache, "CHAT_CACHE_DB_PATH", str(tmp_path / "chat_cache.db"))
+    monkeypatch.setattr(chat_cache, "_conn", None)
+    completions = _FakeCompletions(fail_topics=["신라"])
+    monkeypatch.setattr(_FakeAsyncOpenAI, "completions", completions)
+    monkeypatch.setattr(script_batch, "openai", SimpleNamespace(AsyncOpenAI=_FakeAsyncOpenAI))
+    yield completions
+    chat_cache._conn.close()
+
+
+def test_run_batch_orders_results_and_uses_cache(fake_openai):
+    topics = ["고구려", "발해", "신라"]
+    seen = []
+    results = asyncio.run(script_batch.run_batch(topics, "key", "m", "sys", concurrency=2, on_result=seen.append))
+
+    assert [r.topic for r in results] == topics
+    assert sorted(r.index for r in seen) == [0, 1, 2]
+    assert results[0].text == "답: 구려" and results[0].tokens == 7
+    assert results[2].error == "RuntimeError: boom"
+    assert fake_openai.calls == 3
+
+    # 성공한 주제는 캐시에서, 실패한 주제만 다시 호출
+    again = asyncio.run(script_batch.run_batch(topics, "key", "m", "sys"))
+    assert [r.from_cache for r in again] == [True, True, False]
+    assert fake_openai.calls == 4
+
+
+def test_malformed_response_fails_only_that_topic(fake_openai):
+    topics = ["고구려", "백제", "발해"]
+    results = asyncio.run(script_batch.run_batch(topics, "key", "m", "sys"))
+
+    assert [r.topic for r in results] == topics
+    assert results[1].error.startswith("IndexError") and results[1].text == ""
+    assert results[0].text and results[2].text and not results[0].error
+    assert chat_cache.lookup(chat_cache.make_key("m", "sys", script_batch.build_user_text("백제"), script_batch.BATCH_MAX_TOKENS)) is None
@@ -0,0 +1,26 @@
+import gc
+import io
+
+from script_parser import parse_script_file, parse_script_text
+
+SCRIPT = "1\n첫 번째 문장\nShot on 35mm film\n2\n두 번째 문장\r\nShot on digital\n"
+
+
+def test_parse_text():
+    scenes, issues = parse_script_text(SCRIPT)
+    assert [s["id"] for s in scenes] == [1, 2]
+    assert not issues
+
+
+def test_parse_upload_stream_keeps_file_open():
+    upload = io.BytesIO(("﻿" + SCRIPT).encode("utf-8"))
+    scenes, issues, raw = parse_script_file(upload)
+    gc.collect()
+
+    # 래퍼가 정리된 뒤에도 업로드 파일은 열려 있어야 한다 (다시 읽기 / seek 가능)
+    assert not upload.closed
+    upload.seek(0)
+
+    assert [s["id"] for s in scenes] == [1, 2]
+    assert raw == SCRIPT
+    assert scenes == parse_script_text(SCRIPT)[0]
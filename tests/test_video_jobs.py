@@ -0,0 +1,117 @@
+import base64
+import io
+import json
+import os
+import uuid
+
+import pytest
+
+import video_jobs
+from video_jobs import read_video_response
+
+VIDEO = os.urandom(100_003)
+
+
+def _response(b64: str, escape_slashes: bool = False) -> bytes:
+    body = json.dumps({"created": 1, "data": [{"b64_json": b64}], "tail": "x"})
+    if escape_slashes:
+        # 일부 서버는 "/" 를 "\/" 로 이스케이프한다
+        body = body.replace("/", "\\/")
+    return body.encode("utf-8")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 4096, 1 << 20])
+@pytest.mark.parametrize("escape_slashes", [False, True])
+def test_streaming_decode_matches_payload(chunk_size, escape_slashes):
+    raw = _response(base64.b64encode(VIDEO).decode("ascii"), escape_slashes)
+    out = io.BytesIO()
+    assert read_video_response(io.BytesIO(raw), out, chunk_size) is None
+    assert out.getvalue() == VIDEO
+
+
+def test_job_id_response_is_parsed():
+    raw = b'{"id": "video_123", "status": "queued"}'
+    assert read_video_response(io.BytesIO(raw), io.BytesIO(), 5) == {"id": "video_123", "status": "queued"}
+
+
+def test_empty_payload_is_an_error():
+    out = io.BytesIO()
+    with pytest.raises(ValueError, match="VIDEO_B64_NOT_FOUND"):
+        read_video_response(io.BytesIO(_response("")), out, 8)
+    assert out.getvalue() == b""
+
+
+def test_truncated_payload_is_an_error():
+    raw = _response(base64.b64encode(VIDEO).decode("ascii"))
+    cut = raw[: len(raw) // 2]
+    with pytest.raises(ValueError, match="VIDEO_B64_TRUNCATED"):
+        read_video_response(io.BytesIO(cut), io.BytesIO(), 1024)
+
+
+@pytest.fixture
+def jobs_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_jobs, "VIDEO_JOBS_DIR", str(tmp_path / "video_jobs"))
+    return tmp_path
+
+
+@pytest.mark.parametrize("job_id", ["../../evil", "../video_jobs/x", "", None, 123, "{%s}" % uuid.uuid4()])
+def test_load_job_rejects_non_uuid_ids(jobs_dir, job_id):
+    (jobs_dir / "evil.json").write_text(json.dumps({"job_id": "x", "status": "queued"}))
+    assert video_jobs.load_job(job_id) is None
+    assert not video_jobs.is_valid_job_id(job_id)
+
+
+@pytest.mark.parametrize("content", ["[1, 2]", '"text"', '{"status": "queued"}', '{"job_id": "%s"}', "{not json"])
+def test_load_job_rejects_malformed_manifest(jobs_dir, content):
+    job_id = str(uuid.uuid4())
+    os.makedirs(video_jobs.VIDEO_JOBS_DIR)
+    with open(os.path.join(video_jobs.VIDEO_JOBS_DIR, f"{job_id}.json"), "w") as f:
+        f.write(content.replace("%s", job_id))
+    assert video_jobs.load_job(job_id) is None
+
+
+def test_new_job_round_trip(jobs_dir):
+    job = video_jobs.new_job({"prompt": "p"}, base_url="http://127.0.0.1:1/v1")
+    assert video_jobs.load_job(job["job_id"]) == job
+    assert [j["job_id"] for j in video_jobs.list_active_jobs()] == [job["job_id"]]
+
+
+def test_submit_retry_after_timeout_reuses_the_remote_job(jobs_dir, monkeypatch):
+    benchmarks = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+    monkeypatch.syspath_prepend(benchmarks)
+    from fake_video_api import FakeVideoApi, base_url, start_server
+
+    api = FakeVideoApi(VIDEO, render_seconds=0)
+    server = start_server(api)
+    try:
+        job = video_jobs.new_job({"prompt": "p"}, base_url=base_url(server))
+
+        # 서버는 요청을 받았지만 응답을 기다리다 타임아웃 난 경우
+        real_read = video_jobs.read_video_response
+        calls = []
+
+        def timeout_once(resp, out_file, *args):
+            calls.append(1)
+            if len(calls) == 1:
+                raise TimeoutError("timed out")
+            return real_read(resp, out_file, *args)
+
+        monkeypatch.setattr(video_jobs, "read_video_response", timeout_once)
+        job = video_jobs.advance_job(job["job_id"], "key")
+        assert job["status"] == video_jobs.STATUS_SUBMITTING and job["errors"] == 1
+
+        job = video_jobs.advance_job(job["job_id"], "key")
+        assert job["status"] == video_jobs.STATUS_QUEUED
+        assert list(api.jobs) == [job["remote_id"]]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_submit_without_idempotency_key_is_not_resent(jobs_dir):
+    job = video_jobs.new_job({"prompt": "p"}, base_url="http://127.0.0.1:1/v1")
+    del job["idempotency_key"]
+    video_jobs.save_job(job)
+    job = video_jobs.advance_job(job["job_id"], "key")
+    assert job["status"] == video_jobs.STATUS_FAILED
+    assert "VIDEO_SUBMIT_NOT_RETRYABLE" in job["error"]
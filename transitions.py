@@ -0,0 +1,187 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from video_utils import RawVideoWriter, profile_for
+
+# =========================
+# 장면 전환 엔진 (크로스페이드 / 켄 번즈)
+#   프레임은 미리 잡아둔 (batch, H, W, 3) 버퍼에 배치 단위로 채우고,
+#   크로스페이드는 배치 전체를 NumPy 정수 연산 한 번으로 섞은 뒤 그대로 ffmpeg 파이프로 보낸다
+# =========================
+TRANSITION_NONE = "none"
+TRANSITION_CROSSFADE = "crossfade"
+TRANSITION_KENBURNS = "kenburns"
+TRANSITION_KENBURNS_FADE = "kenburns_fade"
+
+TRANSITION_MODES = {
+    "없음 (정지 이미지)": TRANSITION_NONE,
+    "크로스페이드": TRANSITION_CROSSFADE,
+    "켄 번즈 (천천히 줌)": TRANSITION_KENBURNS,
+    "켄 번즈 + 크로스페이드": TRANSITION_KENBURNS_FADE,
+}
+
+
+# 블렌딩 가중치는 0~128 정수 (int16 에서 (b-a)*w 가 넘치지 않는 범위)
+LERP_SHIFT = 7
+LERP_ONE = 1 << LERP_SHIFT
+
+
+def load_frame(path: str) -> np.ndarray:
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def zoom_schedule(n_frames: int, zoom: float, zoom_in: bool = True) -> np.ndarray:
+    """장면 안에서 프레임별 배율 (1.0 → 1+zoom, 또는 반대로)."""
+    t = np.linspace(0.0, 1.0, max(1, n_frames), dtype=np.float32)
+    if not zoom_in:
+        t = t[::-1]
+    return 1.0 + zoom * t
+
+
+class ZoomRenderer:
+    """
+    한 장면 이미지를 여러 배율로 (가운데 기준) 확대한 프레임을 배치 단위로 out 버퍼에 채운다.
+    리샘플링 자체는 PIL 의 C bilinear(box 지정) 한 번으로 처리 — NumPy 로 세로/가로 gather + 보간을
+    나눠 하는 것보다 빠르다. PIL 은 resize 중 GIL 을 놓으므로 코어가 여럿이면 배치 안의 프레임을 병렬로 계산.
+    """
+
+    def __init__(self, size: tuple[int, int], batch: int = 4):
+        self.size = size
+        self.batch = batch
+        self.frame = None
+        self._image = None
+        workers = min(batch, os.cpu_count() or 1)
+        self._pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def set_frame(self, frame: np.ndarray):
+        self.frame = frame
+        self._image = Image.fromarray(frame)
+
+    def _render_one(self, zoom: float, out: np.ndarray):
+        w, h = self.size
+        bw, bh = w / zoom, h / zoom
+        box = ((w - bw) / 2, (h - bh) / 2, (w + bw) / 2, (h + bh) / 2)
+        out[...] = np.asarray(self._image.resize(self.size, Image.Resampling.BILINEAR, box=box))
+
+    def render(self, zooms: np.ndarray, out: np.ndarray):
+        """zooms: (B,), out: (B, H, W, 3) uint8 버퍼에 결과를 채운다."""
+        b = len(zooms)
+        if np.all(zooms == 1.0):
+            out[:b] = self.frame
+            return out[:b]
+
+        if self._pool is not None and b > 1:
+            list(self._pool.map(self._render_one, zooms.tolist(), out[:b]))
+        else:
+            for k, zoom in enumerate(zooms.tolist()):
+                self._render_one(zoom, out[k])
+        return out[:b]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+def blend_batch(frames: np.ndarray, target: np.ndarray, alphas: np.ndarray, scratch: np.ndarray):
+    """
+    frames(B,H,W,3 uint8) 를 target(H,W,3 int16) 쪽으로 alphas(B,) 만큼 섞는다 (in-place).
+    scratch 는 (B,H,W,3) int16 미리 잡아둔 버퍼.
+    """
+    n = len(alphas)
+    weight = np.round(alphas * LERP_ONE).astype(np.int16).reshape(-1, 1, 1, 1)
+    diff = scratch[:n]
+    np.subtract(target[None], frames, out=diff)
+    diff *= weight
+    diff >>= LERP_SHIFT
+    diff += frames
+    frames[...] = diff
+    return frames
+
+
+def render_slideshow(
+    image_paths: list[str],
+    durations: list[float],
+    output_path: str,
+    fps: int = 30,
+    mode: str = TRANSITION_CROSSFADE,
+    transition_seconds: float = 0.5,
+    zoom: float = 0.08,
+    batch: int = 4,
+    writer=None,
+) -> dict:
+    """
+    이미지(모두 같은 크기로 정규화된 상태)를 전환 효과를 넣어 MP4 로 렌더링.
+    장면 길이 합은 그대로 유지되므로 내레이션 오디오와 싱크가 맞는다.
+    {frames, seconds, fps} 통계 반환.
+    """
+    if not image_paths:
+        raise ValueError("NO_IMAGES")
+    if len(image_paths) != len(durations):
+        raise ValueError("DURATION_COUNT_MISMATCH")
+
+    kenburns = mode in (TRANSITION_KENBURNS, TRANSITION_KENBURNS_FADE)
+    crossfade = mode in (TRANSITION_CROSSFADE, TRANSITION_KENBURNS_FADE)
+
+    frames_per_scene = [max(1, int(round(d * fps))) for d in durations]
+    first = load_frame(image_paths[0])
+    h, w = first.shape[:2]
+
+    buf = np.empty((batch, h, w, 3), dtype=np.uint8)
+    scratch = np.empty((batch, h, w, 3), dtype=np.int16)
+    renderer = ZoomRenderer((w, h), batch=batch)
+
+    def start_zoom(index: int) -> np.ndarray:
+        # 짝수 장면은 줌 인, 홀수 장면은 줌 아웃
+        n = frames_per_scene[index]
+        if not kenburns:
+            return np.ones(n, np.float32)
+        return zoom_schedule(n, zoom, zoom_in=(index % 2 == 0))
+
+    own_writer = writer is None
+    if own_writer:
+        writer = RawVideoWriter(output_path, (w, h), fps=fps, profile=profile_for(sum(durations)))
+
+    t0 = time.perf_counter()
+    total = 0
+    try:
+        current = first
+        for i, n in enumerate(frames_per_scene):
+            zooms = start_zoom(i)
+
+            nxt = load_frame(image_paths[i + 1]) if i + 1 < len(image_paths) else None
+            fade_n = 0
+            if crossfade and nxt is not None:
+                fade_n = min(int(round(transition_seconds * fps)), n // 2, frames_per_scene[i + 1] // 2)
+            fade_start = n - fade_n
+
+            if fade_n:
+                # 다음 장면의 첫 프레임(켄 번즈면 시작 배율 적용)으로 섞는다
+                renderer.set_frame(nxt)
+                target = renderer.render(start_zoom(i + 1)[:1], buf)[0].astype(np.int16)
+
+            renderer.set_frame(current)
+            for start in range(0, n, batch):
+                stop = min(n, start + batch)
+                frames = renderer.render(zooms[start:stop], buf)
+
+                if fade_n and stop > fade_start:
+                    s = max(start, fade_start)
+                    k = np.arange(s, stop) - fade_start + 1
+                    blend_batch(frames[s - start:], target, k.astype(np.float32) / (fade_n + 1), scratch)
+
+                writer.write_batch(frames)
+                total += stop - start
+
+            current = nxt
+    finally:
+        renderer.close()
+        if own_writer:
+            writer.close()
+
+    elapsed = time.perf_counter() - t0
+    return {"frames": total, "seconds": elapsed, "fps": total / elapsed if elapsed else 0.0}
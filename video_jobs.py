@@ -0,0 +1,434 @@
+import binascii
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from uuid import UUID, uuid4
+
+import media_store
+from video_utils import make_streamable
+
+# =========================
+# 영상 생성 작업 (백그라운드 제출 + 폴링 + 결과 다운로드)
+#
+#   POST {base}/videos/generations            → {"id", "status"} 또는 즉시 {"data": [{"b64_json"}]}
+#   GET  {base}/videos/generations/{id}       → {"status": queued|in_progress|completed|failed, "error"?}
+#   GET  {base}/videos/generations/{id}/content → MP4 바이트
+#
+# 작업 상태는 JSON 파일로 남기므로 rerun / 재접속 / 서버 재시작 후에도 이어서 폴링한다.
+# =========================
+VIDEO_JOBS_DIR = os.path.join(".ikapp_media", "video_jobs")
+VIDEO_API_BASE = os.getenv("VIDEO_API_BASE", "https://api.openai.com/v1")
+
+STATUS_SUBMITTING = "submitting"
+STATUS_QUEUED = "queued"
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_DOWNLOADING = "downloading"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+ACTIVE_STATUSES = (STATUS_SUBMITTING, STATUS_QUEUED, STATUS_IN_PROGRESS, STATUS_DOWNLOADING)
+ALL_STATUSES = ACTIVE_STATUSES + (STATUS_COMPLETED, STATUS_FAILED)
+
+POLL_BASE_SECONDS = 2.0
+POLL_CAP_SECONDS = 60.0
+MAX_TRANSIENT_ERRORS = 8
+
+JOB_RETENTION_SECONDS = 14 * 24 * 3600
+
+SUBMIT_TIMEOUT = 300
+POLL_TIMEOUT = 30
+DOWNLOAD_CHUNK = 1024 * 1024
+
+
+# =========================
+# 작업 파일 (bulk_jobs 와 같은 방식: 임시파일 → rename)
+# =========================
+def is_valid_job_id(job_id) -> bool:
+    """new_job 이 만든 uuid4 문자열만 허용 (URL 로 들어온 값이 경로가 되지 않도록)."""
+    try:
+        return isinstance(job_id, str) and str(UUID(job_id)) == job_id
+    except ValueError:
+        return False
+
+
+def _job_path(job_id: str) -> str:
+    if not is_valid_job_id(job_id):
+        raise ValueError(f"INVALID_JOB_ID: {str(job_id)[:64]}")
+    return os.path.join(VIDEO_JOBS_DIR, f"{job_id}.json")
+
+
+def save_job(job: dict):
+    os.makedirs(VIDEO_JOBS_DIR, exist_ok=True)
+    job["updated_at"] = time.time()
+    fd, tmp_path = tempfile.mkstemp(dir=VIDEO_JOBS_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, _job_path(job["job_id"]))
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_job(job_id: str | None) -> dict | None:
+    """올바른 id 이고 작업 파일 모양(job_id / status 가 있는 dict)일 때만 반환."""
+    if not is_valid_job_id(job_id) or not os.path.exists(_job_path(job_id)):
+        return None
+    try:
+        with open(_job_path(job_id), "r", encoding="utf-8") as f:
+            job = json.load(f)
+    except Exception:
+        return None
+    if not isinstance(job, dict) or job.get("job_id") != job_id or job.get("status") not in ALL_STATUSES:
+        return None
+    return job
+
+
+def list_active_jobs() -> list[dict]:
+    """진행 중인 작업 전부 (개수 제한 없음 — 러너가 하나도 빠뜨리지 않도록)."""
+    if not os.path.isdir(VIDEO_JOBS_DIR):
+        return []
+    jobs = [load_job(name[:-5]) for name in os.listdir(VIDEO_JOBS_DIR) if name.endswith(".json")]
+    return [j for j in jobs if is_active(j)]
+
+
+def prune_jobs(max_age: float = JOB_RETENTION_SECONDS):
+    """오래전에 끝난 작업 파일 삭제 (진행 중인 작업은 남긴다)."""
+    if not os.path.isdir(VIDEO_JOBS_DIR):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(VIDEO_JOBS_DIR):
+        path = os.path.join(VIDEO_JOBS_DIR, name)
+        try:
+            if os.path.getmtime(path) >= cutoff:
+                continue
+            if name.endswith(".json") and is_active(load_job(name[:-5])):
+                continue
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def new_job(payload: dict, base_url: str | None = None) -> dict:
+    now = time.time()
+    job = {
+        "job_id": str(uuid4()),
+        "created_at": now,
+        "updated_at": now,
+        "base_url": (base_url or VIDEO_API_BASE).rstrip("/"),
+        "payload": payload,
+        # 제출 재시도(타임아웃 / 재시작)가 같은 생성 요청으로 묶이도록 처음부터 저장해 둔다
+        "idempotency_key": str(uuid4()),
+        "remote_id": None,
+        "status": STATUS_SUBMITTING,
+        "polls": 0,
+        "errors": 0,
+        "next_poll_at": now,
+        "video_path": None,
+        "error": None,
+    }
+    save_job(job)
+    prune_jobs()
+    return job
+
+
+def is_active(job: dict | None) -> bool:
+    return bool(job) and job.get("status") in ACTIVE_STATUSES
+
+
+# =========================
+# HTTP
+# =========================
+def _request(
+    method: str,
+    url: str,
+    api_key: str,
+    body: dict | None = None,
+    timeout: int = POLL_TIMEOUT,
+    idempotency_key: str | None = None,
+):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    if idempotency_key:
+        headers["Idempotency-Key"] = idempotency_key
+    req = urllib.request.Request(url, data=data, headers=headers, method=method)
+    return urllib.request.urlopen(req, timeout=timeout)
+
+
+def _retry_after(err: urllib.error.HTTPError) -> float | None:
+    value = err.headers.get("retry-after") if err.headers else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def is_transient(err: Exception) -> bool:
+    if isinstance(err, urllib.error.HTTPError):
+        return err.code == 429 or err.code >= 500
+    return isinstance(err, (urllib.error.URLError, TimeoutError, ConnectionError))
+
+
+def poll_delay(polls: int) -> float:
+    """2s, 4s, 8s ... 최대 60s, ±25% 지터 (여러 작업이 같은 순간에 몰리지 않게)."""
+    delay = min(POLL_CAP_SECONDS, POLL_BASE_SECONDS * (2 ** polls))
+    return delay * random.uniform(0.75, 1.25)
+
+
+def _error_detail(err: Exception) -> str:
+    if isinstance(err, urllib.error.HTTPError):
+        try:
+            detail = err.read().decode("utf-8", errors="ignore")
+        except Exception:
+            detail = str(err)
+        return f"HTTPError {err.code}: {detail[:500]}"
+    return f"{type(err).__name__}: {err}"[:500]
+
+
+def _finish_with_file(job: dict, tmp_path: str):
+    path = media_store.publish_file(tmp_path, "imageking")
+    job["video_path"] = make_streamable(path)
+    job["status"] = STATUS_COMPLETED
+    job["error"] = None
+
+
+# =========================
+# 응답 스트리밍 디코딩
+#   응답 문자열 → dict → b64 문자열 → bytes 를 한꺼번에 들고 있지 않도록,
+#   "b64_json" 값만 청크 단위로 base64 디코딩해서 바로 파일에 쓴다 (메모리는 청크 크기 정도로 일정)
+# =========================
+RESPONSE_CHUNK = 64 * 1024
+_B64_FIELD_RE = re.compile(rb'"b64_json"\s*:\s*"')
+
+
+def _unescape_b64(raw: bytes) -> bytes:
+    # base64 문자열에 나올 수 있는 JSON 이스케이프는 \/ 와 줄바꿈(\n, \r) 정도
+    return raw.replace(b"\\/", b"/").replace(b"\\n", b"").replace(b"\\r", b"")
+
+
+def read_video_response(resp, out_file, chunk_size: int = RESPONSE_CHUNK) -> dict | None:
+    """
+    resp 를 조금씩 읽어서 "b64_json" 값이 나오면 out_file 에 디코딩해 쓰고 None 반환.
+    그런 필드가 없으면 (작업 id 응답 등 작은 JSON) 파싱한 dict 를 반환.
+    값이 비어 있어 한 바이트도 쓰지 못하면 VIDEO_B64_NOT_FOUND (빈 MP4 로 완료 처리하지 않도록).
+    """
+    head = b""
+    while True:
+        chunk = resp.read(chunk_size)
+        if not chunk:
+            return json.loads(head.decode("utf-8")) if head.strip() else {}
+        head += chunk
+        m = _B64_FIELD_RE.search(head)
+        if m:
+            pending = head[m.end():]
+            break
+
+    carry = b""
+    written = 0
+    while True:
+        end = pending.find(b'"')
+        segment = pending if end < 0 else pending[:end]
+
+        # 청크 경계에 걸친 이스케이프(\)는 다음 청크와 합쳐서 처리
+        keep = b""
+        if end < 0 and segment.endswith(b"\\"):
+            segment, keep = segment[:-1], b"\\"
+
+        data = carry + _unescape_b64(segment)
+        usable = len(data) - len(data) % 4
+        if usable:
+            decoded = binascii.a2b_base64(data[:usable])
+            out_file.write(decoded)
+            written += len(decoded)
+        carry = data[usable:]
+
+        if end >= 0:
+            if carry:
+                raise ValueError("VIDEO_B64_TRUNCATED")
+            if not written:
+                raise ValueError("VIDEO_B64_NOT_FOUND: empty b64_json")
+            # 나머지 응답은 읽어서 버린다 (연결 재사용 / 깨끗한 종료용)
+            while resp.read(chunk_size):
+                pass
+            return None
+
+        chunk = resp.read(chunk_size)
+        if not chunk:
+            raise ValueError("VIDEO_B64_TRUNCATED")
+        pending = keep + chunk
+
+
+# =========================
+# 작업 한 단계 진행 (워커 스레드에서 실행)
+# =========================
+def _submit(job: dict, api_key: str):
+    """
+    생성 요청은 유료라서 같은 작업을 두 번 만들면 안 된다.
+    타임아웃이나 재시작 뒤 다시 보내더라도 작업 파일에 저장된 같은 Idempotency-Key 를 쓴다.
+    키가 없는 예전 작업 파일은 다시 보내지 않고 실패로 처리한다.
+    """
+    key = job.get("idempotency_key")
+    if not key:
+        raise ValueError("VIDEO_SUBMIT_NOT_RETRYABLE: no idempotency key")
+    fd, tmp_path = tempfile.mkstemp(suffix=".mp4")
+    try:
+        with os.fdopen(fd, "wb") as f, _request(
+            "POST", f"{job['base_url']}/videos/generations", api_key, job["payload"], SUBMIT_TIMEOUT, key
+        ) as r:
+            data = read_video_response(r, f)
+
+        if data is None:
+            # 동기식 응답: b64_json 이 이미 파일로 풀려 있다
+            _finish_with_file(job, tmp_path)
+            return
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    if not isinstance(data, dict) or not data.get("id"):
+        raise ValueError(f"VIDEO_JOB_ID_NOT_FOUND: {str(data)[:300]}")
+    job["remote_id"] = data["id"]
+    job["status"] = data.get("status") if data.get("status") in ACTIVE_STATUSES else STATUS_QUEUED
+
+
+def _poll(job: dict, api_key: str):
+    url = f"{job['base_url']}/videos/generations/{job['remote_id']}"
+    with _request("GET", url, api_key) as r:
+        data = json.loads(r.read().decode("utf-8"))
+
+    status = data.get("status")
+    if status == STATUS_COMPLETED:
+        job["status"] = STATUS_DOWNLOADING
+        job["polls"] = 0
+    elif status == STATUS_FAILED:
+        job["status"] = STATUS_FAILED
+        job["error"] = str(data.get("error") or "VIDEO_JOB_FAILED")[:500]
+    else:
+        job["status"] = STATUS_IN_PROGRESS if status == STATUS_IN_PROGRESS else STATUS_QUEUED
+        job["progress"] = data.get("progress")
+
+
+def _download(job: dict, api_key: str):
+    """결과를 청크 단위로 임시파일에 받은 뒤 미디어 디렉터리로 옮긴다 (실패하면 다음 폴링에서 처음부터)."""
+    url = f"{job['base_url']}/videos/generations/{job['remote_id']}/content"
+    fd, tmp_path = tempfile.mkstemp(suffix=".mp4")
+    try:
+        with os.fdopen(fd, "wb") as f, _request("GET", url, api_key, timeout=SUBMIT_TIMEOUT) as r:
+            while True:
+                chunk = r.read(DOWNLOAD_CHUNK)
+                if not chunk:
+                    break
+                f.write(chunk)
+        _finish_with_file(job, tmp_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def advance_job(job_id: str, api_key: str) -> dict | None:
+    """작업을 한 단계 진행하고 저장. 일시적 오류면 백오프 후 같은 단계를 다시 시도한다."""
+    job = load_job(job_id)
+    if not is_active(job):
+        return job
+
+    step = {
+        STATUS_SUBMITTING: _submit,
+        STATUS_QUEUED: _poll,
+        STATUS_IN_PROGRESS: _poll,
+        STATUS_DOWNLOADING: _download,
+    }[job["status"]]
+
+    try:
+        step(job, api_key)
+        job["polls"] = job.get("polls", 0) + 1
+        job["next_poll_at"] = time.time() + poll_delay(job["polls"] - 1)
+    except Exception as e:
+        if is_transient(e) and job.get("errors", 0) < MAX_TRANSIENT_ERRORS:
+            job["errors"] = job.get("errors", 0) + 1
+            retry_after = _retry_after(e) if isinstance(e, urllib.error.HTTPError) else None
+            job["next_poll_at"] = time.time() + (retry_after or poll_delay(job["errors"]))
+            job["error"] = _error_detail(e)
+        else:
+            job["status"] = STATUS_FAILED
+            job["error"] = _error_detail(e)
+
+    save_job(job)
+    return job
+
+
+# =========================
+# 백그라운드 러너 (프로세스당 하나)
+# =========================
+class VideoJobRunner:
+    """
+    디스크에 남아 있는 진행 중 작업을 주기적으로 훑어서, 때가 된 작업만 워커 풀에서 한 단계씩 진행.
+    페이지(스크립트 스레드)는 작업 파일만 읽으므로 멈추지 않는다.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.api_key = ""
+        self._wake = threading.Event()
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="video-jobs")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def _step(self, job_id: str):
+        try:
+            advance_job(job_id, self.api_key)
+        finally:
+            with self._lock:
+                self._inflight.discard(job_id)
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            now = time.time()
+            wake_at = now + POLL_CAP_SECONDS
+            if self.api_key:
+                for job in list_active_jobs():
+                    with self._lock:
+                        if job["job_id"] in self._inflight:
+                            continue
+                        due = job.get("next_poll_at", 0) <= now
+                        if due:
+                            self._inflight.add(job["job_id"])
+                    if due:
+                        self._pool.submit(self._step, job["job_id"])
+                    else:
+                        wake_at = min(wake_at, job["next_poll_at"])
+            self._wake.wait(timeout=max(0.1, wake_at - time.time()))
+            self._wake.clear()
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def ensure_runner(api_key: str) -> VideoJobRunner:
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = VideoJobRunner()
+        _runner.api_key = api_key
+        _runner.wake()
+        return _runner
+
+
+def submit_video_job(payload: dict, api_key: str, base_url: str | None = None) -> dict:
+    """작업을 기록하고 바로 반환. 실제 요청은 러너가 백그라운드에서 보낸다."""
+    job = new_job(payload, base_url)
+    ensure_runner(api_key)
+    return job
@@ -0,0 +1,412 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass
+
+# imageio-ffmpeg 이 있으면 번들된 ffmpeg 바이너리를 우선 사용
+try:
+    import imageio_ffmpeg
+except ImportError:
+    imageio_ffmpeg = None
+
+
+# =========================
+# ffmpeg 실행 파일 찾기
+# =========================
+def get_ffmpeg_exe() -> str | None:
+    if imageio_ffmpeg is not None:
+        try:
+            return imageio_ffmpeg.get_ffmpeg_exe()
+        except Exception:
+            pass
+    return shutil.which("ffmpeg")
+
+
+def run_ffmpeg(args: list[str]):
+    """ffmpeg 을 실행하고, 실패하면 stderr 끝부분을 담아 RuntimeError 를 던진다."""
+    exe = get_ffmpeg_exe()
+    if not exe:
+        raise RuntimeError("FFMPEG_MISSING")
+
+    proc = subprocess.run(
+        [exe, "-hide_banner", "-loglevel", "error", "-y", *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    if proc.returncode != 0:
+        detail = proc.stderr.decode("utf-8", errors="ignore").strip()
+        raise RuntimeError(f"FFMPEG_ERROR ({proc.returncode}): {detail[-500:]}")
+
+
+# =========================
+# 공통 출력 프로파일 (bulkking / imageking / SubKing 모든 MP4 출력이 사용)
+#   faststart  : moov 를 파일 앞으로 옮겨서 앞부분 몇백 KB 만 받아도 재생 시작
+#   fragmented : 긴 영상은 moof 조각 단위로 기록 (moov 재배치용 두 번째 패스가 없음)
+# =========================
+FASTSTART_MOVFLAGS = "+faststart"
+FRAGMENTED_MOVFLAGS = "+frag_keyframe+empty_moov+default_base_moof"
+
+# 이 길이(초)를 넘는 출력은 fragmented MP4 로
+FRAGMENT_MIN_SECONDS = 600.0
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    video_codec: str = "libx264"
+    preset: str = "veryfast"
+    pix_fmt: str = "yuv420p"
+    audio_codec: str = "aac"
+    audio_bitrate: str = "128k"
+    fragmented: bool = False
+
+    @property
+    def movflags(self) -> str:
+        return FRAGMENTED_MOVFLAGS if self.fragmented else FASTSTART_MOVFLAGS
+
+    def video_args(self, tune: str | None = None) -> list[str]:
+        args = ["-c:v", self.video_codec, "-preset", self.preset]
+        if tune:
+            args += ["-tune", tune]
+        return args + ["-pix_fmt", self.pix_fmt]
+
+    def audio_args(self) -> list[str]:
+        return ["-c:a", self.audio_codec, "-b:a", self.audio_bitrate]
+
+    def container_args(self) -> list[str]:
+        """최종 MP4 출력에만 붙인다 (중간 세그먼트에는 불필요)."""
+        return ["-movflags", self.movflags]
+
+    def moviepy_kwargs(self) -> dict:
+        """moviepy write_videofile 용 인자."""
+        return {
+            "codec": self.video_codec,
+            "preset": self.preset,
+            "audio_codec": self.audio_codec,
+            "audio_bitrate": self.audio_bitrate,
+            "ffmpeg_params": self.container_args(),
+        }
+
+
+DEFAULT_PROFILE = OutputProfile()
+FRAGMENTED_PROFILE = OutputProfile(fragmented=True)
+
+
+def profile_for(duration_seconds: float | None = None) -> OutputProfile:
+    if duration_seconds and duration_seconds > FRAGMENT_MIN_SECONDS:
+        return FRAGMENTED_PROFILE
+    return DEFAULT_PROFILE
+
+
+def remux_for_streaming(input_path: str, output_path: str, profile: OutputProfile = DEFAULT_PROFILE):
+    """재인코딩 없이 컨테이너만 다시 써서 faststart / fragmented 로 만든다 (외부에서 받은 MP4 용)."""
+    run_ffmpeg(["-i", input_path, "-map", "0", "-c", "copy", *profile.container_args(), output_path])
+    return output_path
+
+
+def make_streamable(path: str, profile: OutputProfile = DEFAULT_PROFILE) -> str:
+    """path 를 제자리에서 faststart 로 바꾼다. ffmpeg 이 없거나 실패하면 원본을 그대로 둔다."""
+    if get_ffmpeg_exe() is None:
+        return path
+    tmp_path = path + ".remux.mp4"
+    try:
+        remux_for_streaming(path, tmp_path, profile)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+# =========================
+# 정지 이미지 슬라이드쇼 인코딩
+# =========================
+def _concat_escape(path: str) -> str:
+    # concat 목록 파일은 작은따옴표로 감싸므로 내부 ' 만 이스케이프
+    return path.replace("'", "'\\''")
+
+
+def write_concat_list(list_path: str, image_paths: list[str], durations: list[float]):
+    """
+    ffconcat 목록 파일 작성.
+    마지막 이미지는 한 번 더 적어야 ffmpeg 이 마지막 duration 을 지켜준다.
+    """
+    lines = ["ffconcat version 1.0"]
+    for path, dur in zip(image_paths, durations):
+        lines.append(f"file '{_concat_escape(os.path.abspath(path))}'")
+        lines.append(f"duration {max(0.04, float(dur)):.3f}")
+    lines.append(f"file '{_concat_escape(os.path.abspath(image_paths[-1]))}'")
+
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def encode_slideshow(
+    image_paths: list[str],
+    durations: list[float],
+    output_path: str,
+    fps: int = 30,
+    profile: OutputProfile | None = None,
+):
+    """
+    이미지마다 한 번만 디코딩하고, 장면 길이만큼의 프레임 복제는 ffmpeg 내부(fps 필터)에서 처리.
+    파이썬 → ffmpeg 파이프로 같은 프레임을 수천 장 밀어 넣지 않는다.
+    """
+    if not image_paths:
+        raise ValueError("NO_IMAGES")
+    if len(image_paths) != len(durations):
+        raise ValueError("DURATION_COUNT_MISMATCH")
+
+    profile = profile or profile_for(sum(durations))
+    with tempfile.TemporaryDirectory(prefix="slideshow_") as tmp_dir:
+        list_path = os.path.join(tmp_dir, "scenes.ffconcat")
+        write_concat_list(list_path, image_paths, durations)
+
+        run_ffmpeg(
+            [
+                "-f", "concat",
+                "-safe", "0",
+                "-i", list_path,
+                # yuv420p 는 가로/세로가 짝수여야 하므로 맞춰준 뒤 출력 fps 로 프레임 복제
+                "-vf", f"scale=trunc(iw/2)*2:trunc(ih/2)*2,fps={int(fps)},format=yuv420p",
+                *profile.video_args(tune="stillimage"),
+                *profile.container_args(),
+                output_path,
+            ]
+        )
+
+    return output_path
+
+
+def mux_audio(video_path: str, audio_path: str, output_path: str, profile: OutputProfile = DEFAULT_PROFILE):
+    """영상 스트림은 그대로 복사하고 오디오만 AAC 로 인코딩해서 합친다."""
+    run_ffmpeg(
+        [
+            "-i", video_path,
+            "-i", audio_path,
+            "-map", "0:v:0",
+            "-map", "1:a:0",
+            "-c:v", "copy",
+            *profile.audio_args(),
+            "-shortest",
+            *profile.container_args(),
+            output_path,
+        ]
+    )
+    return output_path
+
+
+# =========================
+# 파이프라인 슬라이드쇼 (이미지 생성과 인코딩을 겹쳐서 진행)
+# =========================
+def fit_filter(width: int, height: int) -> str:
+    """캔버스 크기에 맞춰 비율 유지 축소 + 레터박스."""
+    return (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1"
+    )
+
+
+def encode_still_segment(
+    image_path: str,
+    duration: float,
+    output_path: str,
+    size: tuple[int, int],
+    fps: int = 30,
+    profile: OutputProfile = DEFAULT_PROFILE,
+):
+    """정지 이미지 한 장을 duration 초짜리 MP4 세그먼트로 인코딩 (인코딩 설정은 모든 세그먼트 동일)."""
+    width, height = size
+    run_ffmpeg(
+        [
+            "-loop", "1",
+            "-framerate", str(int(fps)),
+            "-t", f"{max(0.04, float(duration)):.3f}",
+            "-i", image_path,
+            "-vf", fit_filter(width, height) + ",format=yuv420p",
+            *profile.video_args(tune="stillimage"),
+            "-r", str(int(fps)),
+            "-f", "mp4",
+            output_path,
+        ]
+    )
+
+
+class PipelinedSlideshow:
+    """
+    장면이 준비되는 대로 submit() 하면, 백그라운드 스레드가
+    "자기 자신과 앞의 모든 장면이 준비된" 장면부터 순서대로 세그먼트를 인코딩한다.
+    finish() 는 남은 세그먼트를 기다린 뒤 스트림 복사(-c copy)로 이어붙이기만 하므로
+    마지막 이미지가 도착하고 곧바로 MP4 가 완성된다.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        size: tuple[int, int],
+        fps: int = 30,
+        profile: OutputProfile = DEFAULT_PROFILE,
+    ):
+        self.output_path = output_path
+        self.size = size
+        self.fps = fps
+        self.profile = profile
+        self._work_dir = tempfile.mkdtemp(prefix="pipeline_")
+        self._ready = {}          # index -> (image_path | None, duration)
+        self._segments = []       # 인코딩 끝난 세그먼트 경로 (순서대로)
+        self.durations = {}       # index -> 실제 인코딩된 길이(초)
+        self._next = 0
+        self._total = None
+        self._error = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, index: int, image_path: str | None, duration):
+        """
+        image_path 가 None 이면 그 장면은 건너뛴다 (이미지 없음/실패).
+        image_path / duration 은 값 또는 Future(예: 프레임 정규화, TTS 작업) —
+        Future 면 인코더 스레드가 결과를 기다린다.
+        """
+        with self._cond:
+            self._ready[index] = (image_path, duration)
+            self._cond.notify_all()
+
+    def encoded_count(self) -> int:
+        with self._cond:
+            return self._next
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._next not in self._ready and self._total is None:
+                    self._cond.wait()
+                if self._total is not None and self._next >= self._total:
+                    return
+                index = self._next
+                # finish() 이후에도 submit 되지 않은 장면은 건너뜀
+                image_path, duration = self._ready.pop(index, (None, 0.0))
+
+            if image_path:
+                seg_path = os.path.join(self._work_dir, f"seg_{index:05d}.mp4")
+                try:
+                    if hasattr(image_path, "result"):
+                        image_path = image_path.result()
+                    if hasattr(duration, "result"):
+                        duration = duration.result()
+                    self.durations[index] = duration
+                    encode_still_segment(image_path, duration, seg_path, self.size, fps=self.fps, profile=self.profile)
+                except Exception as e:
+                    self._error = e
+                    return
+                self._segments.append(seg_path)
+
+            with self._cond:
+                self._next = index + 1
+                self._cond.notify_all()
+
+    def cancel(self):
+        """스크립트 실행이 중간에 끊겼을 때 백그라운드 스레드와 임시 폴더 정리."""
+        with self._cond:
+            self._total = 0
+            self._cond.notify_all()
+        self._thread.join()
+        shutil.rmtree(self._work_dir, ignore_errors=True)
+
+    def finish(self, total: int) -> str:
+        with self._cond:
+            self._total = total
+            self._cond.notify_all()
+        self._thread.join()
+
+        try:
+            if self._error is not None:
+                raise self._error
+            if not self._segments:
+                raise ValueError("NO_IMAGES")
+
+            list_path = os.path.join(self._work_dir, "segments.ffconcat")
+            with open(list_path, "w", encoding="utf-8") as f:
+                f.write("ffconcat version 1.0\n")
+                for seg in self._segments:
+                    f.write(f"file '{_concat_escape(seg)}'\n")
+
+            # 전체 길이는 이어붙일 때 알 수 있으므로 컨테이너 형식도 여기서 결정
+            profile = self.profile
+            if not profile.fragmented and sum(self.durations.values()) > FRAGMENT_MIN_SECONDS:
+                profile = FRAGMENTED_PROFILE
+            run_ffmpeg(
+                [
+                    "-f", "concat", "-safe", "0", "-i", list_path,
+                    "-c", "copy",
+                    *profile.container_args(),
+                    self.output_path,
+                ]
+            )
+            return self.output_path
+        finally:
+            shutil.rmtree(self._work_dir, ignore_errors=True)
+
+
+# =========================
+# 원시 프레임 파이프 인코딩 (전환 효과처럼 프레임마다 내용이 바뀌는 경우)
+# =========================
+class RawVideoWriter:
+    """(N, H, W, 3) uint8 프레임 배치를 rgb24 그대로 ffmpeg stdin 으로 흘려보낸다."""
+
+    def __init__(
+        self,
+        output_path: str,
+        size: tuple[int, int],
+        fps: int = 30,
+        profile: OutputProfile = DEFAULT_PROFILE,
+    ):
+        exe = get_ffmpeg_exe()
+        if not exe:
+            raise RuntimeError("FFMPEG_MISSING")
+
+        width, height = size
+        self.output_path = output_path
+        self._stderr = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen(
+            [
+                exe, "-hide_banner", "-loglevel", "error", "-y",
+                "-f", "rawvideo",
+                "-pix_fmt", "rgb24",
+                "-s", f"{width}x{height}",
+                "-r", str(int(fps)),
+                "-i", "-",
+                "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2,format=yuv420p",
+                *profile.video_args(),
+                *profile.container_args(),
+                output_path,
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=self._stderr,
+        )
+
+    def write_batch(self, frames):
+        # C 연속 배열이면 버퍼 프로토콜로 복사 없이 파이프에 기록
+        try:
+            self._proc.stdin.write(memoryview(frames).cast("B"))
+        except BrokenPipeError:
+            self.close()
+
+    def close(self):
+        if self._stderr.closed:
+            return self.output_path
+        if self._proc.stdin and not self._proc.stdin.closed:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        code = self._proc.wait()
+        if code != 0:
+            self._stderr.seek(0)
+            detail = self._stderr.read().decode("utf-8", errors="ignore").strip()
+            self._stderr.close()
+            raise RuntimeError(f"FFMPEG_ERROR ({code}): {detail[-500:]}")
+        self._stderr.close()
+        return self.output_path